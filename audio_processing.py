@@ -1,14 +1,74 @@
 import math
+from functools import lru_cache
+from typing import Any
+
 import numpy as np
 
+try:
+    from scipy.signal import butter, lfilter, lfiltic, sosfilt, sosfilt_zi
+except ImportError:
+    butter = None  # type: ignore[assignment]
+    lfilter = None  # type: ignore[assignment]
+    lfiltic = None  # type: ignore[assignment]
+    sosfilt = None  # type: ignore[assignment]
+    sosfilt_zi = None  # type: ignore[assignment]
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None  # type: ignore[assignment]
+
 INT16_MAX = 32768.0
 
 
-def get_rms(audio_data: np.ndarray) -> float:
-    if len(audio_data) == 0:
+def get_rms(audio_data: np.ndarray, scratch: np.ndarray | None = None) -> float:
+    n = len(audio_data)
+    if n == 0:
+        return 0.0
+    if _sum_squares_kernel is not None and audio_data.dtype == np.int16:
+        # The numba loop reads the int16 chunk once with no float32 cast.
+        return math.sqrt(_sum_squares_kernel(audio_data) / n)
+    if scratch is not None and scratch.shape[0] >= n:
+        # Cast into a caller-owned float32 buffer instead of allocating one
+        # per chunk in the recording loops.
+        x = scratch[:n]
+        x[...] = audio_data
+    else:
+        x = audio_data.astype(np.float32)
+    # np.dot sums the squares in one BLAS pass without an x * x temporary;
+    # see benchmark_rms.py for why this beats numpy-rms at every chunk size.
+    return float(np.sqrt(np.dot(x, x) / n))
+
+
+def _int16_sum_squares(x: np.ndarray) -> int:
+    # Exact sum of squares straight off the int16 samples; int64 is needed
+    # because a full-scale 1024-sample chunk already sums to ~1.1e12.
+    acc = 0
+    for i in range(x.shape[0]):
+        v = np.int64(x[i])
+        acc += v * v
+    return acc
+
+
+if njit is not None:
+    _sum_squares_kernel: Any = njit(cache=True, fastmath=True)(_int16_sum_squares)
+    # Compile at import so the first recorded chunk does not pay the JIT latency.
+    _sum_squares_kernel(np.zeros(2, dtype=np.int16))
+else:
+    _sum_squares_kernel = None
+
+
+def fast_percentile(values, q: float) -> float:
+    # Same linear interpolation as np.percentile, but selects the two
+    # neighbouring order statistics with an O(n) partition instead of a sort.
+    arr = np.asarray(values, dtype=np.float64)
+    if arr.size == 0:
         return 0.0
-    x = audio_data.astype(np.float32)
-    return float(np.sqrt(np.mean(x * x)))
+    pos = (arr.size - 1) * (q / 100.0)
+    lo = int(pos)
+    hi = min(lo + 1, arr.size - 1)
+    part = np.partition(arr, (lo, hi))
+    return float(part[lo] + (part[hi] - part[lo]) * (pos - lo))
 
 
 def bytes_to_int16(audio_bytes: bytes) -> np.ndarray:
@@ -18,13 +78,33 @@ def bytes_to_int16(audio_bytes: bytes) -> np.ndarray:
 
 
 def int16_to_bytes(audio_data: np.ndarray) -> bytes:
+    if audio_data.dtype == np.int16:
+        return audio_data.tobytes()
+    if audio_data.dtype == np.float32:
+        # Clip straight into the int16 output: the caller's array is left
+        # untouched and no float32 temporary is allocated.
+        out = np.empty(audio_data.shape, dtype=np.int16)
+        np.clip(audio_data, -32768.0, 32767.0, out=out, casting="unsafe")
+        return out.tobytes()
     clipped = np.clip(audio_data, -32768, 32767).astype(np.int16)
     return clipped.tobytes()
 
 
+@lru_cache(maxsize=8)
+def _butter_highpass_sos(order: int, cutoff_hz: float, sample_rate: int):
+    sos = butter(order, cutoff_hz, btype="highpass", fs=sample_rate, output="sos")
+    return sos, sosfilt_zi(sos)
+
+
 def highpass_filter(
-    audio_data: np.ndarray, sample_rate: int, cutoff_hz: float
+    audio_data: np.ndarray,
+    sample_rate: int,
+    cutoff_hz: float,
+    order: int = 1,
+    inplace: bool = False,
 ) -> np.ndarray:
+    # inplace=True lets the first-order filter overwrite a float32 input the
+    # caller owns; other paths (and non-float32 input) still allocate.
     if cutoff_hz <= 0:
         return audio_data.astype(np.float32)
 
@@ -37,39 +117,89 @@ def highpass_filter(
     if len(x) == 0:
         return np.array([], dtype=np.float32)
 
-    dt = 1.0 / float(sample_rate)
-    rc = 1.0 / (2.0 * math.pi * float(cutoff_hz))
-    alpha = rc / (rc + dt)
+    if order > 1 and sosfilt is not None:
+        # Butterworth as a cascade of second-order sections; the state is
+        # scaled to x[0] so a DC offset does not produce a start-up click.
+        sos, zi = _butter_highpass_sos(int(order), float(cutoff_hz), int(sample_rate))
+        y, _ = sosfilt(sos, x, zi=zi * x[0])
+        return y.astype(np.float32, copy=False)
+
+    alpha = _highpass_alpha(sample_rate, cutoff_hz)
+    # Seed the state with x[-1] = x[0] so the first output sample is 0.
+    out = x if inplace and x is audio_data else None
+    y_arr, _, _ = _first_order_highpass(x, alpha, float(x[0]), 0.0, out=out)
+    return y_arr
 
-    try:
-        import scipy.signal
 
+def _highpass_alpha(sample_rate: int, cutoff_hz: float) -> float:
+    dt = 1.0 / float(sample_rate)
+    rc = 1.0 / (2.0 * math.pi * float(cutoff_hz))
+    return rc / (rc + dt)
+
+
+def _first_order_highpass(
+    x: np.ndarray,
+    alpha: float,
+    prev_x: float,
+    prev_y: float,
+    out: np.ndarray | None = None,
+) -> tuple[np.ndarray, float, float]:
+    # y[n] = alpha * (y[n-1] + x[n] - x[n-1]); returns the filtered float32
+    # block plus the (x[-1], y[-1]) state needed to continue with the next one.
+    # The numba kernel writes into `out` (which may be x itself); the scipy
+    # and pure-Python paths always return a new array.
+    if _hp_kernel is not None:
+        y_arr = np.empty_like(x) if out is None else out
+        prev_x, prev_y = _hp_kernel(x, alpha, y_arr, prev_x, prev_y)
+        return y_arr, prev_x, prev_y
+
+    if lfilter is not None:
         b = [alpha, -alpha]
         a = [1.0, -alpha]
+        zi = lfiltic(b, a, y=[prev_y], x=[prev_x])
+        y, _ = lfilter(b, a, x, zi=zi)
+        return y.astype(np.float32, copy=False), float(x[-1]), float(y[-1])
 
-        # Use precise initial conditions to match the python loop behavior exactly
-        zi = scipy.signal.lfiltic(b, a, y=[], x=[x[0]])
-        y, _ = scipy.signal.lfilter(b, a, x, zi=zi)
+    return _highpass_reference(x, alpha, prev_x, prev_y)
 
-        return y.astype(np.float32)
-    except ImportError:
-        pass
 
-    # Use python list for slightly faster scalar iteration in pure python
-    # This avoids numpy overhead for scalar assignment in loop
+def _hp_recurrence(
+    x: np.ndarray, alpha: float, y: np.ndarray, prev_x: float, prev_y: float
+) -> tuple[float, float]:
+    # x[i] is read before y[i] is written, so y may alias x.
+    for i in range(x.shape[0]):
+        cur_x = x[i]
+        cur_y = alpha * (prev_y + cur_x - prev_x)
+        y[i] = cur_y
+        prev_y = cur_y
+        prev_x = cur_x
+    return prev_x, prev_y
+
+
+if njit is not None:
+    _hp_kernel: Any = njit(cache=True, fastmath=True)(_hp_recurrence)
+    # Compile at import so the first recording does not pay the JIT latency.
+    _hp_kernel(
+        np.zeros(2, dtype=np.float32), 0.5, np.empty(2, dtype=np.float32), 0.0, 0.0
+    )
+else:
+    _hp_kernel = None
+
+
+def _highpass_reference(
+    x: np.ndarray, alpha: float, prev_x: float, prev_y: float
+) -> tuple[np.ndarray, float, float]:
+    # Pure-Python recurrence, only used when neither numba nor scipy is available.
     x_list = x.tolist()
     y_arr = np.zeros(len(x_list), dtype=np.float32)
 
-    prev_y = 0.0
-    prev_x = x_list[0] if len(x_list) > 0 else 0.0
-
     for i, cur_x in enumerate(x_list):
         cur_y = alpha * (prev_y + cur_x - prev_x)
         y_arr[i] = cur_y
         prev_y = cur_y
         prev_x = cur_x
 
-    return y_arr
+    return y_arr, prev_x, prev_y
 
 
 def normalize_to_dbfs(audio_data: np.ndarray, target_dbfs: float) -> np.ndarray:
@@ -81,7 +211,11 @@ def normalize_to_dbfs(audio_data: np.ndarray, target_dbfs: float) -> np.ndarray:
     if len(x) == 0:
         return x
 
-    rms = np.sqrt(np.mean(x * x))
+    rms = float(np.sqrt(np.dot(x, x) / len(x)))
+    return _apply_dbfs_gain(x, rms, target_dbfs)
+
+
+def _apply_dbfs_gain(x: np.ndarray, rms: float, target_dbfs: float) -> np.ndarray:
     if rms < 1e-6:
         return x
 
@@ -114,8 +248,12 @@ def suppress_noise(audio_data: np.ndarray, sample_rate: int) -> np.ndarray:
 
     threshold = max(40.0, floor * 1.5)
 
-    # In-place modification
-    x[np.abs(x) < threshold] = 0.0
+    # In-place modification: build a bool keep-mask from two-sided compares
+    # (no float32 |x| temporary) and apply it with a single multiply instead
+    # of a masked scatter.
+    keep = np.greater_equal(x, threshold)
+    keep |= x <= -threshold
+    x *= keep
     return x
 
 
@@ -125,16 +263,28 @@ def preprocess_audio_bytes(
     highpass_hz: float,
     normalize_target_dbfs: float,
     noise_suppression: bool,
+    highpass_order: int = 1,
 ) -> bytes:
-    # 1. Convert to int16
+    # 1. View the raw bytes as int16 (no copy)
     int16_data = bytes_to_int16(audio_bytes)
 
-    # 2. Convert to float32 immediately
+    # 2. Convert to float32 immediately; this is the only copy of the input
     float_data = int16_data.astype(np.float32)
 
-    # 3. Process in float32 domain
-    # highpass_filter returns a NEW float32 array
-    processed = highpass_filter(float_data, sample_rate, highpass_hz)
+    # 3. Process in float32 domain. The stages are deliberately not run in
+    # int16/Q15: rounding the highpass output to int16 before the
+    # normalisation gain would amplify the quantisation error by the same
+    # gain (often +20 dB on quiet takes), and the only saving would be the
+    # 2-byte vs 4-byte sample width on a single intermediate buffer.
+    # float_data is ours, so the highpass may overwrite it instead of
+    # allocating a second buffer. When the filter is disabled it is skipped
+    # outright rather than copying float_data again.
+    if highpass_hz > 0:
+        processed = highpass_filter(
+            float_data, sample_rate, highpass_hz, order=highpass_order, inplace=True
+        )
+    else:
+        processed = float_data
 
     if noise_suppression:
         # suppress_noise modifies in-place or returns reference
@@ -143,10 +293,86 @@ def preprocess_audio_bytes(
     # normalize_to_dbfs modifies in-place or returns reference
     processed = normalize_to_dbfs(processed, normalize_target_dbfs)
 
-    # 4. Convert back to int16 bytes
+    # 4. Convert back to int16 bytes (clips `processed` in place)
     return int16_to_bytes(processed)
 
 
+class StreamingPreprocessor:
+    """Run the preprocessing pipeline incrementally while audio is captured.
+
+    The highpass stage is applied to each chunk as it arrives, carrying the
+    filter state across chunks. Noise gating and loudness normalisation need
+    the whole take, so they run in finish(), which returns the same int16
+    bytes as preprocess_audio_bytes() on the concatenated input.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        highpass_hz: float,
+        normalize_target_dbfs: float,
+        noise_suppression: bool,
+        highpass_order: int = 1,
+    ):
+        self.sample_rate = sample_rate
+        self.normalize_target_dbfs = normalize_target_dbfs
+        self.noise_suppression = noise_suppression
+        self._blocks: list[np.ndarray] = []
+        self._sum_sq = 0.0
+        self._num_samples = 0
+        self._sos: Any = None
+        self._sos_zi: Any = None
+        self._sos_state: Any = None
+        self._alpha: float | None = None
+        self._hp_state: tuple[float, float] | None = None
+        if highpass_hz > 0:
+            if highpass_order > 1 and sosfilt is not None:
+                self._sos, self._sos_zi = _butter_highpass_sos(
+                    int(highpass_order), float(highpass_hz), int(sample_rate)
+                )
+            else:
+                self._alpha = _highpass_alpha(sample_rate, highpass_hz)
+
+    def process_chunk(self, samples: np.ndarray) -> None:
+        if len(samples) == 0:
+            return
+        x = samples.astype(np.float32)
+        if self._sos is not None:
+            if self._sos_state is None:
+                self._sos_state = self._sos_zi * x[0]
+            y, self._sos_state = sosfilt(self._sos, x, zi=self._sos_state)
+            x = y.astype(np.float32, copy=False)
+        elif self._alpha is not None:
+            prev_x, prev_y = self._hp_state or (float(x[0]), 0.0)
+            # x is a fresh cast of the chunk, so it is filtered in place.
+            x, prev_x, prev_y = _first_order_highpass(
+                x, self._alpha, prev_x, prev_y, out=x
+            )
+            self._hp_state = (prev_x, prev_y)
+        if not self.noise_suppression:
+            # Without gating the take's loudness is known up front, so the
+            # final normalisation only has to apply a single gain.
+            self._sum_sq += float(np.dot(x, x))
+        self._num_samples += len(x)
+        self._blocks.append(x)
+
+    def finish(self) -> bytes:
+        if not self._blocks:
+            return b""
+        if len(self._blocks) == 1:
+            x = self._blocks[0]
+        else:
+            x = np.concatenate(self._blocks)
+        self._blocks = []
+        if self.noise_suppression:
+            x = suppress_noise(x, self.sample_rate)
+            x = normalize_to_dbfs(x, self.normalize_target_dbfs)
+        else:
+            rms = math.sqrt(self._sum_sq / self._num_samples)
+            x = _apply_dbfs_gain(x, rms, self.normalize_target_dbfs)
+        return int16_to_bytes(x)
+
+
 def calibrate_silence_threshold(
     stream,
     sample_rate: int,
@@ -159,16 +385,18 @@ def calibrate_silence_threshold(
     if calibration_seconds <= 0:
         return int(fallback_threshold)
     total_chunks = max(1, int((calibration_seconds * sample_rate) / chunk_size))
-    values = []
+    values = np.empty(total_chunks, dtype=np.float32)
+    scratch = np.empty(chunk_size, dtype=np.float32)
+    count = 0
     for _ in range(total_chunks):
         try:
             chunk = stream.read(chunk_size, exception_on_overflow=False)
-            rms = get_rms(np.frombuffer(chunk, dtype=np.int16))
-            values.append(rms)
+            values[count] = get_rms(np.frombuffer(chunk, dtype=np.int16), scratch)
+            count += 1
         except Exception:
             break
-    if not values:
+    if count == 0:
         return int(fallback_threshold)
-    ambient = float(np.percentile(values, 90))
+    ambient = fast_percentile(values[:count], 90)
     adaptive = int(max(min_threshold, ambient * adaptive_multiplier))
     return int(max(fallback_threshold, adaptive))
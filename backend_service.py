@@ -4,15 +4,20 @@ import threading
 import time
 import traceback
 import uuid
+from dataclasses import dataclass
 from typing import Any
 
 import keyboard
 import numpy as np
 import pyaudio
-import pyautogui
 import pyperclip
 
-from audio_processing import get_rms, preprocess_audio_bytes
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+from audio_processing import StreamingPreprocessor, fast_percentile, get_rms
 from config_manager import load_config, save_config
 from stt_service import STTService
 
@@ -24,22 +29,68 @@ else:
 SAMPLE_RATE = 16000
 CHANNELS = 1
 CHUNK = 1024
+# As in voice_paste_gui: larger reads while speech continues, smaller ones
+# through trailing silence.
+SPEECH_CHUNK = 2048
+TAIL_CHUNK = 512
 FORMAT = pyaudio.paInt16
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class AudioCfg:
+    highpass_hz: float
+    highpass_order: int
+    normalize_target_dbfs: float
+    noise_suppression: bool
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "AudioCfg":
+        audio = config["audio"]
+        return cls(
+            highpass_hz=float(audio.get("highpass_hz", 80)),
+            highpass_order=int(audio.get("highpass_order", 1)),
+            normalize_target_dbfs=float(audio.get("normalize_target_dbfs", -20.0)),
+            noise_suppression=bool(audio.get("noise_suppression", False)),
+        )
 
 
 def _deep_merge(base: dict[str, Any], patch: dict[str, Any]) -> dict[str, Any]:
-    out = dict(base)
+    # Copy-on-write: a dict is only copied once a key under it actually
+    # changes, so a patch that repeats current values returns base itself and
+    # untouched subtrees are shared with base by reference.
+    out: dict[str, Any] | None = None
     for key, value in patch.items():
-        if isinstance(value, dict) and isinstance(out.get(key), dict):
-            out[key] = _deep_merge(out[key], value)
-        else:
-            out[key] = value
-    return out
+        current = base.get(key, _MISSING)
+        if isinstance(value, dict) and isinstance(current, dict):
+            value = _deep_merge(current, value)
+            if value is current:
+                continue
+        elif type(value) is type(current) and value == current:
+            continue
+        if out is None:
+            out = {**base}
+        out[key] = value
+    return base if out is None else out
+
+
+_MODIFIER_KEYS = ("ctrl", "shift", "alt")
+
+
+def _wait_for_modifier_release(timeout: float) -> None:
+    # Same as voice_paste: only wait while the hotkey's modifiers are held,
+    # giving up after paste_delay, instead of always sleeping it out.
+    deadline = time.monotonic() + timeout
+    while any(keyboard.is_pressed(key) for key in _MODIFIER_KEYS):
+        if time.monotonic() >= deadline:
+            return
+        time.sleep(0.01)
 
 
 class BackendService:
     def __init__(self):
         self.config = load_config()
+        self.audio_cfg = AudioCfg.from_config(self.config)
         self.stt = STTService(self.config, sample_rate=SAMPLE_RATE, channels=CHANNELS)
         self.write_lock = threading.Lock()
         self.state_lock = threading.Lock()
@@ -47,24 +98,37 @@ class BackendService:
         self.is_listening = False
         self.listener_thread: threading.Thread | None = None
         self.running = True
+        self._rms_scratch = np.empty(SPEECH_CHUNK, dtype=np.float32)
+        self._pa: Any = None
+        self._stream: Any = None
 
     def run(self) -> None:
+        # The first decode pays the model backend's start-up; do it while the
+        # UI connects instead of on the first take.
+        threading.Thread(target=self.stt.warm_up, daemon=True).start()
         self.emit("status_changed", {"status": "ready"})
-        while self.running:
-            line = sys.stdin.readline()
-            if not line:
-                break
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                payload = json.loads(line)
-            except Exception as exc:
-                self.emit("runtime_error", {"message": f"Invalid JSON: {exc}"})
-                continue
-            threading.Thread(
-                target=self._handle_request, args=(payload,), daemon=True
-            ).start()
+        # Read raw bytes lines when stdin has a binary buffer: both parsers
+        # accept UTF-8 bytes, so the text decode step is skipped.
+        stdin = getattr(sys.stdin, "buffer", sys.stdin)
+        loads = orjson.loads if orjson is not None else json.loads
+        try:
+            while self.running:
+                line = stdin.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    payload = loads(line)
+                except Exception as exc:
+                    self.emit("runtime_error", {"message": f"Invalid JSON: {exc}"})
+                    continue
+                threading.Thread(
+                    target=self._handle_request, args=(payload,), daemon=True
+                ).start()
+        finally:
+            self._close_input_stream()
 
     def _handle_request(self, payload: dict[str, Any]) -> None:
         req_id = payload.get("id")
@@ -114,9 +178,19 @@ class BackendService:
             raise ValueError("patch must be an object")
 
         merged = _deep_merge(self.config, patch)
+        if merged is self.config:
+            # Nothing changed: skip the save, reload and STT refresh.
+            self.emit("status_changed", {"status": "ready"})
+            return self.config
         save_config(merged)
         self.config = load_config()
+        self.audio_cfg = AudioCfg.from_config(self.config)
+        previous_model = self.stt.loaded_model
         self.stt.reload(self.config)
+        if self.stt.loaded_model != previous_model:
+            # Switched models: pay the new one's first decode now, not on the
+            # next take.
+            threading.Thread(target=self.stt.warm_up, daemon=True).start()
         self.emit("status_changed", {"status": "ready"})
         return self.config
 
@@ -127,7 +201,15 @@ class BackendService:
             if self.config.get("beep_on_ready", True):
                 self._safe_beep(850, 120)
 
-            audio_bytes, duration = self._record_audio(self.config)
+            audio_cfg = self.audio_cfg
+            preprocessor = StreamingPreprocessor(
+                sample_rate=SAMPLE_RATE,
+                highpass_hz=audio_cfg.highpass_hz,
+                normalize_target_dbfs=audio_cfg.normalize_target_dbfs,
+                noise_suppression=audio_cfg.noise_suppression,
+                highpass_order=audio_cfg.highpass_order,
+            )
+            _, duration = self._record_audio(self.config, preprocessor)
             if duration < max(0.12, float(self.config.get("min_record_seconds", 0.12))):
                 self.emit(
                     "runtime_error",
@@ -140,17 +222,8 @@ class BackendService:
             self.emit(
                 "status_changed", {"status": "transcribing", "trace_id": trace_id}
             )
-            processed = preprocess_audio_bytes(
-                audio_bytes=audio_bytes,
-                sample_rate=SAMPLE_RATE,
-                highpass_hz=float(self.config["audio"].get("highpass_hz", 80)),
-                normalize_target_dbfs=float(
-                    self.config["audio"].get("normalize_target_dbfs", -20.0)
-                ),
-                noise_suppression=bool(
-                    self.config["audio"].get("noise_suppression", False)
-                ),
-            )
+            # The highpass already ran chunk by chunk during capture.
+            processed = preprocessor.finish()
 
             result = self.stt.transcribe_audio_bytes(processed, self.config)
             if not result.text:
@@ -233,21 +306,28 @@ class BackendService:
                 self.stop_requested.clear()
             self.emit("status_changed", {"status": "ready", "trace_id": trace_id})
 
-    def _record_audio(self, cfg: dict[str, Any]) -> tuple[bytes, float]:
-        p = pyaudio.PyAudio()
-        stream = p.open(
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=SAMPLE_RATE,
-            input=True,
-            frames_per_buffer=CHUNK,
-        )
+    def _record_audio(
+        self,
+        cfg: dict[str, Any],
+        preprocessor: StreamingPreprocessor | None = None,
+    ) -> tuple[bytes, float]:
+        stream = self._start_input_stream()
 
-        frames: list[bytes] = []
-        silence_counter = 0
+        # Counted in samples because the read size adapts to speech below.
+        silence_samples = 0
         start_time = time.time()
-        max_silence_frames = int((cfg["silence_duration"] * SAMPLE_RATE) / CHUNK)
-        max_chunks = int((cfg["max_record_seconds"] * SAMPLE_RATE) / CHUNK)
+        max_silence_samples = (
+            int((cfg["silence_duration"] * SAMPLE_RATE) / CHUNK) * CHUNK
+        )
+        max_samples = int((cfg["max_record_seconds"] * SAMPLE_RATE) / CHUNK) * CHUNK
+        # With a preprocessor the chunks are only streamed into it and the raw
+        # take is not kept. Otherwise they are copied into one preallocated
+        # int16 buffer, as in the GUI and CLI recorders, instead of growing a
+        # bytearray.
+        take = take_bytes = None
+        if preprocessor is None:
+            take = np.empty(max_samples, dtype=np.int16)
+            take_bytes = memoryview(take).cast("B")
 
         fallback_threshold = int(cfg.get("silence_threshold", 500))
         min_threshold = int(cfg["audio"].get("min_silence_threshold", 200))
@@ -264,61 +344,150 @@ class BackendService:
         )
 
         calibrated_threshold = fallback_threshold
+        # Only chunks near the fallback threshold count as ambient noise.
+        calibration_ceiling = fallback_threshold * 1.2
+        # No threshold lets a chunk below this count as speech; see below.
+        calibration_floor = min(min_threshold, fallback_threshold)
         calibration_values: list[float] = []
         has_speech = False
+        speech_run = 0
+        read_size = CHUNK
+        captured = 0
+        idx = 0
+        rms_scratch = self._rms_scratch
+        # Bound once, as in voice_paste_gui: the loop runs for the whole take.
+        read = stream.read
+        is_set = self.stop_requested.is_set
+        frombuffer = np.frombuffer
 
         try:
-            for idx in range(max_chunks):
-                if self.stop_requested.is_set():
+            while captured < max_samples:
+                if is_set():
                     break
 
-                chunk = stream.read(CHUNK, exception_on_overflow=False)
-                frames.append(chunk)
-                rms = get_rms(np.frombuffer(chunk, dtype=np.int16))
+                chunk = read(
+                    min(read_size, max_samples - captured),
+                    exception_on_overflow=False,
+                )
+                if take is None:
+                    samples = frombuffer(chunk, dtype=np.int16)
+                    preprocessor.process_chunk(samples)
+                else:
+                    end = captured + len(chunk) // 2
+                    take_bytes[captured * 2 : end * 2] = chunk
+                    samples = take[captured:end]
+                captured += len(samples)
+                # A SPEECH_CHUNK read is judged as two CHUNK halves below.
+                head = samples[:CHUNK]
+                rms = get_rms(head, rms_scratch)
 
                 if idx < calibration_chunks and not has_speech:
-                    if rms < fallback_threshold * 1.2:
+                    if rms < calibration_ceiling:
                         calibration_values.append(rms)
-                    if calibration_values:
-                        ambient = float(np.percentile(calibration_values, 90))
+                    # The percentile is only needed where the threshold decides a
+                    # chunk: one loud enough to be speech, which ends calibration
+                    # early, and the chunk that closes the window. Quieter chunks are
+                    # silence under any threshold, so skipping them changes nothing.
+                    if calibration_values and (
+                        rms >= calibration_floor or idx == calibration_chunks - 1
+                    ):
+                        ambient = fast_percentile(calibration_values, 90)
                         calibrated_threshold = int(
                             max(min_threshold, ambient * adaptive_multiplier)
                         )
-
-                if rms > calibrated_threshold:
-                    silence_counter = 0
-                    has_speech = True
-                else:
-                    silence_counter += 1
-
-                if has_speech and silence_counter >= max_silence_frames:
+                idx += 1
+
+                # A SPEECH_CHUNK read that straddles the end of speech must
+                # not read as speech as a whole: its quiet second half starts
+                # the silence count and the drop to TAIL_CHUNK, as a CHUNK
+                # read would have.
+                halves = [(rms, len(head))]
+                if len(samples) > CHUNK:
+                    tail = samples[CHUNK:]
+                    halves.append((get_rms(tail, rms_scratch), len(tail)))
+                for rms, n in halves:
+                    if rms > calibrated_threshold:
+                        silence_samples = 0
+                        has_speech = True
+                        speech_run += 1
+                        if speech_run >= 3:
+                            read_size = SPEECH_CHUNK
+                    else:
+                        silence_samples += n
+                        speech_run = 0
+                        if has_speech:
+                            read_size = TAIL_CHUNK
+
+                if has_speech and silence_samples >= max_silence_samples:
                     break
         finally:
             stream.stop_stream()
-            stream.close()
-            p.terminate()
 
-        return b"".join(frames), (time.time() - start_time)
+        raw = take[:captured].tobytes() if take is not None else b""
+        return raw, (time.time() - start_time)
+
+    def _input_stream(self) -> Any:
+        """Return the shared, stopped input stream, opening PortAudio on first use."""
+        if self._stream is None:
+            if self._pa is None:
+                self._pa = pyaudio.PyAudio()
+            self._stream = self._pa.open(
+                format=FORMAT,
+                channels=CHANNELS,
+                rate=SAMPLE_RATE,
+                input=True,
+                frames_per_buffer=CHUNK,
+                start=False,
+            )
+        return self._stream
+
+    def _start_input_stream(self) -> Any:
+        # As in voice_paste: PortAudio and the device are opened once per
+        # process, and a stream that no longer starts is reopened once.
+        stream = self._input_stream()
+        try:
+            stream.start_stream()
+        except Exception:
+            stream.close()
+            self._stream = None
+            stream = self._input_stream()
+            stream.start_stream()
+        return stream
+
+    def _close_input_stream(self) -> None:
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._pa is not None:
+            self._pa.terminate()
+            self._pa = None
 
     def _paste_text(self, text: str, cfg: dict[str, Any]) -> tuple[bool, str]:
         try:
             pyperclip.copy(text)
-            time.sleep(float(cfg.get("paste_delay", 0.5)))
+            _wait_for_modifier_release(float(cfg.get("paste_delay", 0.5)))
         except Exception as exc:
             return False, f"Clipboard error: {exc}"
 
         try:
-            pyautogui.hotkey("ctrl", "v")
+            keyboard.send("ctrl+v")
             if cfg.get("auto_enter"):
                 time.sleep(0.08)
-                pyautogui.press("enter")
+                keyboard.send("enter")
             return True, ""
         except Exception as exc:
             try:
-                keyboard.send("ctrl+v")
+                # Imported only when keyboard.send fails: pyautogui pulls in
+                # pyscreeze and PIL, which startup would otherwise pay for.
+                import pyautogui
+
+                # The paste path times its own gaps; PAUSE would add 0.1 s
+                # after each call.
+                pyautogui.PAUSE = 0
+                pyautogui.hotkey("ctrl", "v")
                 if cfg.get("auto_enter"):
-                    keyboard.send("enter")
-                return True, f"PyAutoGUI failed, keyboard fallback used: {exc}"
+                    pyautogui.press("enter")
+                return True, f"keyboard failed, PyAutoGUI fallback used: {exc}"
             except Exception as fallback_exc:
                 return False, f"Paste failed: {exc}; fallback failed: {fallback_exc}"
 
@@ -351,6 +520,16 @@ class BackendService:
         self._write(payload)
 
     def _write(self, payload: dict[str, Any]) -> None:
+        if orjson is not None:
+            # orjson encodes straight to UTF-8 bytes, so the line goes to the
+            # binary stdout in a single write without a str round-trip.
+            data = orjson.dumps(payload) + b"\n"
+            with self.write_lock:
+                # Flush pending text output (e.g. prints) to keep line order.
+                sys.stdout.flush()
+                sys.stdout.buffer.write(data)
+                sys.stdout.buffer.flush()
+            return
         line = json.dumps(payload, ensure_ascii=False)
         with self.write_lock:
             sys.stdout.write(line + "\n")
@@ -0,0 +1,88 @@
+import math
+import timeit
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+EXP_LUT = tuple(math.exp(-i / 32) for i in range(257))
+
+
+def exp_confidence(avg_logprob: float, no_speech_prob: float) -> float:
+    # Current stt_service._confidence_score.
+    lp_conf = math.exp(avg_logprob) if avg_logprob < 0.0 else 1.0
+    if no_speech_prob < 0.0:
+        no_speech_prob = 0.0
+    elif no_speech_prob > 1.0:
+        no_speech_prob = 1.0
+    return 0.6 * lp_conf + 0.4 * (1.0 - no_speech_prob)
+
+
+def lut_confidence(avg_logprob: float, no_speech_prob: float) -> float:
+    # exp() over [-8, 0] from a 1/32-step table with linear interpolation.
+    lp = min(0.0, max(-8.0, avg_logprob))
+    idx = -lp * 32
+    i = int(idx)
+    frac = idx - i
+    e = EXP_LUT[i] * (1 - frac) + EXP_LUT[min(i + 1, 256)] * frac
+    sp = 1.0 - min(1.0, max(0.0, no_speech_prob))
+    return 0.6 * e + 0.4 * sp
+
+
+def numpy_confidence_batch(
+    avg_logprobs: np.ndarray, no_speech_probs: np.ndarray
+) -> np.ndarray:
+    # Vectorised per-segment scores; the clip at 0 matches the scalar branch.
+    lp_conf = np.exp(np.clip(avg_logprobs, -20.0, 0.0))
+    return 0.6 * lp_conf + 0.4 * (1.0 - np.clip(no_speech_probs, 0.0, 1.0))
+
+
+def _confidence_loop(avg_logprobs: np.ndarray, no_speech_probs: np.ndarray):
+    out = np.empty(avg_logprobs.shape[0])
+    for i in range(avg_logprobs.shape[0]):
+        lp = avg_logprobs[i]
+        lp_conf = math.exp(lp) if lp < 0.0 else 1.0
+        ns = min(1.0, max(0.0, no_speech_probs[i]))
+        out[i] = 0.6 * lp_conf + 0.4 * (1.0 - ns)
+    return out
+
+
+numba_confidence_batch = njit(cache=True)(_confidence_loop) if njit else None
+
+
+if __name__ == "__main__":
+    n = 200000
+    samples = [(-i / 100, (i % 11) / 10) for i in range(800)]
+    worst = max(abs(exp_confidence(*s) - lut_confidence(*s)) for s in samples)
+
+    t_exp = timeit.timeit("exp_confidence(-0.37, 0.1)", globals=globals(), number=n)
+    t_lut = timeit.timeit("lut_confidence(-0.37, 0.1)", globals=globals(), number=n)
+
+    print(f"math.exp confidence: {t_exp:.4f} s")
+    print(f"LUT confidence: {t_lut:.4f} s")
+    print(f"LUT max abs error: {worst:.2e}")
+
+    # Batched scoring at a typical per-utterance segment count. The service
+    # only scores the averaged stats once per decode pass, so this is the
+    # ceiling of what a per-segment batch path could win.
+    rng = np.random.default_rng(0)
+    for segs in (8, 64):
+        lps = rng.uniform(-3.0, 0.0, segs)
+        nss = rng.uniform(0.0, 1.0, segs)
+        pairs = list(zip(lps.tolist(), nss.tolist()))
+        expected = [exp_confidence(lp, ns) for lp, ns in pairs]
+        assert np.allclose(numpy_confidence_batch(lps, nss), expected)
+        reps = 20000
+        t_py = timeit.timeit(
+            lambda: [exp_confidence(lp, ns) for lp, ns in pairs], number=reps
+        )
+        t_np = timeit.timeit(lambda: numpy_confidence_batch(lps, nss), number=reps)
+        print(f"{segs} segments, Python loop: {t_py:.4f} s")
+        print(f"{segs} segments, NumPy batch: {t_np:.4f} s")
+        if numba_confidence_batch is not None:
+            assert np.allclose(numba_confidence_batch(lps, nss), expected)
+            t_nb = timeit.timeit(lambda: numba_confidence_batch(lps, nss), number=reps)
+            print(f"{segs} segments, numba batch: {t_nb:.4f} s")
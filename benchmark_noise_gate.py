@@ -0,0 +1,78 @@
+import timeit
+
+import numpy as np
+
+rng = np.random.default_rng(0)
+audio = rng.normal(0, 2000, size=16000 * 10).astype(np.float32)
+threshold = 1500.0
+
+
+def abs_mask_gate(x: np.ndarray) -> np.ndarray:
+    # Previous suppress_noise tail: |x| buffer reused as the keep-mask.
+    mask = np.abs(x)
+    np.greater_equal(mask, threshold, out=mask)
+    x *= mask
+    return x
+
+
+def two_sided_gate(x: np.ndarray) -> np.ndarray:
+    # Current suppress_noise tail: compare against +thr and -thr directly.
+    keep = np.greater_equal(x, threshold)
+    keep |= x <= -threshold
+    x *= keep
+    return x
+
+
+def scratch_gate(x: np.ndarray, keep: np.ndarray, low: np.ndarray) -> np.ndarray:
+    # abs-free variant writing into preallocated bool scratch buffers.
+    np.greater_equal(x, threshold, out=keep)
+    np.less_equal(x, -threshold, out=low)
+    np.logical_or(keep, low, out=keep)
+    x *= keep
+    return x
+
+
+def copyto_gate(x: np.ndarray) -> np.ndarray:
+    # Masked write of zeros instead of a multiply by the keep-mask.
+    drop = np.less(x, threshold)
+    drop &= x > -threshold
+    np.copyto(x, 0.0, where=drop)
+    return x
+
+
+def squared_gate(x: np.ndarray) -> np.ndarray:
+    # Power comparison: x*x >= thr**2 is equivalent to |x| >= thr for thr >= 0.
+    keep = np.square(x)
+    np.greater_equal(keep, threshold * threshold, out=keep)
+    x *= keep
+    return x
+
+
+if __name__ == "__main__":
+    n = 200
+    keep_buf = np.empty(audio.shape, dtype=bool)
+    low_buf = np.empty(audio.shape, dtype=bool)
+
+    expected = abs_mask_gate(audio.copy())
+    assert np.array_equal(two_sided_gate(audio.copy()), expected)
+    assert np.array_equal(scratch_gate(audio.copy(), keep_buf, low_buf), expected)
+    assert np.array_equal(copyto_gate(audio.copy()), expected)
+    assert np.array_equal(squared_gate(audio.copy()), expected)
+
+    def best_of(gate, *args) -> float:
+        # Copies are made up front so only the gate itself is timed.
+        copies = iter([audio.copy() for _ in range(n)])
+        runs = timeit.repeat(lambda: gate(next(copies), *args), number=n // 5, repeat=5)
+        return min(runs)
+
+    t_abs = best_of(abs_mask_gate)
+    t_two = best_of(two_sided_gate)
+    t_scratch = best_of(scratch_gate, keep_buf, low_buf)
+    t_copyto = best_of(copyto_gate)
+    t_squared = best_of(squared_gate)
+
+    print(f"abs mask gate: {t_abs:.4f} s")
+    print(f"two-sided gate: {t_two:.4f} s")
+    print(f"two-sided gate (scratch): {t_scratch:.4f} s")
+    print(f"copyto gate: {t_copyto:.4f} s")
+    print(f"squared gate: {t_squared:.4f} s")
@@ -0,0 +1,98 @@
+import timeit
+
+import numpy as np
+
+from audio_processing import int16_to_bytes
+from stt_service import _pcm16_to_whisper_audio
+
+rng = np.random.default_rng(0)
+# What StreamingPreprocessor.finish() holds for a 10 s take before packing.
+processed = rng.normal(0, 3000, 16000 * 10).astype(np.float32)
+
+
+def bytes_handoff(x: np.ndarray) -> np.ndarray:
+    # Current path: finish() packs int16 bytes, STTService unpacks to float32.
+    return _pcm16_to_whisper_audio(int16_to_bytes(x), 16000, 1)
+
+
+def float_handoff(x: np.ndarray) -> np.ndarray:
+    # Fused alternative: clip and scale the float32 buffer in place.
+    np.clip(x, -32768.0, 32767.0, out=x)
+    x *= np.float32(1.0 / 32768.0)
+    return x
+
+
+CHUNK = 1024
+chunk_bytes = rng.integers(-3000, 3000, CHUNK, dtype=np.int16).tobytes()
+
+
+def frombuffer_intake(take: np.ndarray, offset: int) -> np.ndarray:
+    # Current recorder: wrap the PyAudio bytes, then copy into the take.
+    audio_data = np.frombuffer(chunk_bytes, dtype=np.int16)
+    take[offset : offset + CHUNK] = audio_data
+    return audio_data
+
+
+def memoryview_intake(take_bytes: memoryview, take: np.ndarray, offset: int):
+    # Copy the bytes straight into the take, then hand a row view to get_rms.
+    take_bytes[offset * 2 : (offset + CHUNK) * 2] = chunk_bytes
+    return take[offset : offset + CHUNK]
+
+
+SCALE = np.float32(1.0 / 32768.0)
+
+
+def cast_then_scale(samples: np.ndarray) -> np.ndarray:
+    # Current _pcm16_to_whisper_audio mono path: astype copy, in-place scale.
+    audio = samples.astype(np.float32)
+    audio *= SCALE
+    return audio
+
+
+def fused_cast_scale(samples: np.ndarray) -> np.ndarray:
+    # One ufunc call that casts and scales into a fresh float32 array.
+    return np.multiply(samples, SCALE, dtype=np.float32)
+
+
+if __name__ == "__main__":
+    n = 200
+    expected = bytes_handoff(processed.copy())
+    # The fused path skips int16 rounding, so it differs by under one LSB.
+    assert np.allclose(float_handoff(processed.copy()), expected, atol=1.0 / 32768)
+
+    def best_of(fn) -> float:
+        # Copies are made up front so only the handoff itself is timed.
+        copies = iter([processed.copy() for _ in range(n)])
+        return min(timeit.repeat(lambda: fn(next(copies)), number=n // 5, repeat=5))
+
+    t_bytes = best_of(bytes_handoff)
+    t_float = best_of(float_handoff)
+    print(f"10 s take, int16 bytes handoff: {t_bytes / (n // 5) * 1e3:.3f} ms")
+    print(f"10 s take, float32 handoff: {t_float / (n // 5) * 1e3:.3f} ms")
+
+    take = np.empty(CHUNK * 64, dtype=np.int16)
+    take_bytes = memoryview(take).cast("B")
+    assert np.array_equal(
+        frombuffer_intake(take, 0), memoryview_intake(take_bytes, take, CHUNK)
+    )
+    reps = 100000
+    t_fb = min(
+        timeit.repeat(lambda: frombuffer_intake(take, CHUNK), number=reps, repeat=3)
+    )
+    t_mv = min(
+        timeit.repeat(
+            lambda: memoryview_intake(take_bytes, take, CHUNK), number=reps, repeat=3
+        )
+    )
+    print(f"per chunk, frombuffer + copy: {t_fb / reps * 1e6:.3f} us")
+    print(f"per chunk, memoryview copy + row view: {t_mv / reps * 1e6:.3f} us")
+
+    # The fused ufunc goes through NumPy's buffered casting loop, which only
+    # pays off on long takes; at 1-10 s the plain cast plus scale is faster.
+    for seconds in (1, 10, 60):
+        pcm = rng.integers(-3000, 3000, 16000 * seconds, dtype=np.int16)
+        assert np.array_equal(cast_then_scale(pcm), fused_cast_scale(pcm))
+        t_two = min(timeit.repeat(lambda: cast_then_scale(pcm), number=50, repeat=7))
+        t_one = min(timeit.repeat(lambda: fused_cast_scale(pcm), number=50, repeat=7))
+        print(f"{seconds} s take, astype + scale: {t_two / 50 * 1e6:.1f} us")
+        print(f"{seconds} s take, fused multiply: {t_one / 50 * 1e6:.1f} us")
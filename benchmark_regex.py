@@ -1,6 +1,11 @@
 import timeit
 import re
 
+try:
+    import re2
+except ImportError:
+    re2 = None
+
 text = (
     "Bu bir test cümlesidir. Ip le mantasyon gibi kelimeler içerebilir. A B C D E F G H I J K L M N O P Q R S T U V W X Y Z a b c d e f g h i j k l m n o p q r s t u v w x y z 1 2 3 4 5 6 7 8 9 0 çğıöşüÇĞİÖŞÜ"
     * 10
@@ -34,13 +39,15 @@ SPLIT_HINT_PATTERN = re.compile(r"\b[iı]p\s+le\s+mantasyon\b")
 def optimized_looks_fragmented(text: str) -> bool:
     if not text:
         return True
-    tokens = TOKEN_PATTERN.findall(text.lower())
+    lower_text = text.lower()
+    tokens = TOKEN_PATTERN.findall(lower_text)
     if len(tokens) < 4:
         return False
     short_tokens = sum(1 for token in tokens if len(token) <= 2)
     short_ratio = short_tokens / max(1, len(tokens))
-    split_hint = bool(SPLIT_HINT_PATTERN.search(text.lower()))
-    return short_ratio >= 0.35 or split_hint
+    if short_ratio >= 0.35:
+        return True
+    return bool(SPLIT_HINT_PATTERN.search(lower_text))
 
 
 def optimized_fragment_ratio(text: str) -> float:
@@ -51,6 +58,115 @@ def optimized_fragment_ratio(text: str) -> float:
     return short_tokens / max(1, len(tokens))
 
 
+RE2_TOKEN_PATTERN = re2.compile(TOKEN_PATTERN.pattern) if re2 is not None else None
+
+
+def re2_fragment_ratio(text: str) -> float:
+    tokens = RE2_TOKEN_PATTERN.findall((text or "").lower())
+    if not tokens:
+        return 1.0
+    short_tokens = sum(1 for token in tokens if len(token) <= 2)
+    return short_tokens / max(1, len(tokens))
+
+
+ASCII_TOKEN_BYTES = re.compile(rb"[a-zA-Z0-9]+")
+ascii_text = (
+    "This is a test sentence with api endpoint deployment and a b c words. " * 20
+)
+
+
+def ascii_bytes_fragment_ratio(text: str) -> float:
+    # Pure-ASCII input goes through a bytes pattern; anything else falls back.
+    lower_text = (text or "").lower()
+    if lower_text.isascii():
+        tokens = ASCII_TOKEN_BYTES.findall(lower_text.encode("ascii"))
+    else:
+        tokens = TOKEN_PATTERN.findall(lower_text)
+    if not tokens:
+        return 1.0
+    short_tokens = sum(1 for token in tokens if len(token) <= 2)
+    return short_tokens / max(1, len(tokens))
+
+
+def finditer_fragment_ratio(text: str) -> float:
+    # Counts match spans instead of materialising the token list.
+    total = short = 0
+    for m in TOKEN_PATTERN.finditer((text or "").lower()):
+        total += 1
+        if m.end() - m.start() <= 2:
+            short += 1
+    if not total:
+        return 1.0
+    return short / total
+
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def word_finditer_fragment_ratio(text: str) -> float:
+    # Generic \w+ scanner: also counts accented and non-Latin letters, so its
+    # ratio differs from TOKEN_PATTERN on text like "naïve café".
+    total = short = 0
+    for m in WORD_PATTERN.finditer(text or ""):
+        total += 1
+        if m.end() - m.start() <= 2:
+            short += 1
+    if not total:
+        return 1.0
+    return short / total
+
+
+class _TokenMask(dict):
+    # Anything not listed below is a token separator.
+    def __missing__(self, key):
+        return " "
+
+
+TOKEN_MASK = _TokenMask(
+    {ord(c): "1" for c in "abcdefghijklmnopqrstuvwxyz0123456789çğıöşü"}
+)
+
+
+def _token_run_lengths(lower_text: str) -> list:
+    # Map token characters to "1" and everything else to a space, then only
+    # the run lengths are inspected; no token strings are kept around.
+    return [len(run) for run in lower_text.translate(TOKEN_MASK).split()]
+
+
+def translate_looks_fragmented(text: str) -> bool:
+    if not text:
+        return True
+    lower_text = text.lower()
+    lengths = _token_run_lengths(lower_text)
+    if len(lengths) < 4:
+        return False
+    short_tokens = sum(1 for n in lengths if n <= 2)
+    short_ratio = short_tokens / max(1, len(lengths))
+    if short_ratio >= 0.35:
+        return True
+    return bool(SPLIT_HINT_PATTERN.search(lower_text))
+
+
+def translate_fragment_ratio(text: str) -> float:
+    lengths = _token_run_lengths((text or "").lower())
+    if not lengths:
+        return 1.0
+    short_tokens = sum(1 for n in lengths if n <= 2)
+    return short_tokens / max(1, len(lengths))
+
+
+WS_PATTERN = re.compile(r"\s+")
+
+
+def split_join_whitespace(text: str) -> str:
+    # What _post_process_text does today.
+    return " ".join(text.split())
+
+
+def regex_whitespace(text: str) -> str:
+    return WS_PATTERN.sub(" ", text).strip()
+
+
 if __name__ == "__main__":
     n = 10000
     t_orig_lf = timeit.timeit(
@@ -67,12 +183,68 @@ if __name__ == "__main__":
         "optimized_fragment_ratio(text)", globals=globals(), number=n
     )
 
+    t_tr_lf = timeit.timeit(
+        "translate_looks_fragmented(text)", globals=globals(), number=n
+    )
+    t_tr_fr = timeit.timeit(
+        "translate_fragment_ratio(text)", globals=globals(), number=n
+    )
+
     print(f"Original _looks_fragmented: {t_orig_lf:.4f} s")
     print(f"Optimized _looks_fragmented: {t_opt_lf:.4f} s")
     if t_orig_lf > 0:
         print(f"Improvement: {((t_orig_lf - t_opt_lf) / t_orig_lf) * 100:.2f}%")
 
+    print(f"Translate _looks_fragmented: {t_tr_lf:.4f} s")
+
     print(f"Original _fragment_ratio: {t_orig_fr:.4f} s")
     print(f"Optimized _fragment_ratio: {t_opt_fr:.4f} s")
     if t_orig_fr > 0:
         print(f"Improvement: {((t_orig_fr - t_opt_fr) / t_orig_fr) * 100:.2f}%")
+    print(f"Translate _fragment_ratio: {t_tr_fr:.4f} s")
+
+    assert finditer_fragment_ratio(text) == original_fragment_ratio(text)
+    t_it_fr = timeit.timeit(
+        "finditer_fragment_ratio(text)", globals=globals(), number=n
+    )
+    print(f"Finditer _fragment_ratio: {t_it_fr:.4f} s")
+
+    # Not asserted equal: the ratios drift apart on non-ASCII input.
+    print(
+        f"Ratio (token set vs \\w+): {original_fragment_ratio(text):.4f}"
+        f" vs {word_finditer_fragment_ratio(text):.4f}"
+    )
+    t_word_fr = timeit.timeit(
+        "word_finditer_fragment_ratio(text)", globals=globals(), number=n
+    )
+    print(f"Word finditer _fragment_ratio: {t_word_fr:.4f} s")
+
+    assert ascii_bytes_fragment_ratio(ascii_text) == original_fragment_ratio(
+        ascii_text
+    )
+    t_ascii_str = timeit.timeit(
+        "original_fragment_ratio(ascii_text)", globals=globals(), number=n
+    )
+    t_ascii_bytes = timeit.timeit(
+        "ascii_bytes_fragment_ratio(ascii_text)", globals=globals(), number=n
+    )
+    print(f"ASCII text, str pattern: {t_ascii_str:.4f} s")
+    print(f"ASCII text, bytes pattern: {t_ascii_bytes:.4f} s")
+
+    if RE2_TOKEN_PATTERN is not None:
+        assert re2_fragment_ratio(text) == original_fragment_ratio(text)
+        t_re2_fr = timeit.timeit(
+            "re2_fragment_ratio(text)", globals=globals(), number=n
+        )
+        print(f"RE2 _fragment_ratio: {t_re2_fr:.4f} s")
+
+    # str.split() scans whitespace in C with no regex engine in between, so
+    # the single substitution is the slower of the two despite skipping the
+    # token list.
+    assert regex_whitespace(text) == split_join_whitespace(text)
+    t_split_ws = timeit.timeit(
+        "split_join_whitespace(text)", globals=globals(), number=n
+    )
+    t_regex_ws = timeit.timeit("regex_whitespace(text)", globals=globals(), number=n)
+    print(f"Whitespace collapse, split/join: {t_split_ws:.4f} s")
+    print(f"Whitespace collapse, \\s+ sub: {t_regex_ws:.4f} s")
@@ -0,0 +1,288 @@
+import timeit
+import warnings
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+with warnings.catch_warnings():
+    # audioop is deprecated in 3.11/3.12 and removed in 3.13.
+    warnings.simplefilter("ignore", DeprecationWarning)
+    try:
+        import audioop
+    except ImportError:
+        audioop = None
+
+try:
+    from numpy_rms import rms as rms_simd
+except ImportError:
+    rms_simd = None
+
+
+def dot_rms(x: np.ndarray) -> float:
+    # Current audio_processing.get_rms on a float32 chunk.
+    return float(np.sqrt(np.dot(x, x) / len(x)))
+
+
+def mean_square_rms(x: np.ndarray) -> float:
+    # Original implementation: float64 promotion plus a squared temporary.
+    return float(np.sqrt(np.mean(x.astype(np.float64) ** 2)))
+
+
+def int16_dot_rms(x: np.ndarray, scratch: np.ndarray) -> float:
+    # get_rms with its float32 scratch buffer on a raw int16 chunk.
+    y = scratch[: len(x)]
+    y[...] = x
+    return float(np.sqrt(np.dot(y, y) / len(x)))
+
+
+def int16_einsum_rms(x: np.ndarray) -> float:
+    # Sum of squares straight off int16 with a float64 accumulator. (np.vdot
+    # on int16 accumulates in int16 and wraps, so it is not a candidate.)
+    return float(np.sqrt(np.einsum("i,i->", x, x, dtype=np.float64) / len(x)))
+
+
+def int64_dot_rms(x: np.ndarray) -> float:
+    # Exact integer sum of squares. int32 is not enough: a full-scale chunk
+    # sums to 1024 * 32768**2 ~ 1.1e12 and wraps.
+    y = x.astype(np.int64)
+    return float(np.sqrt(np.dot(y, y) / len(x)))
+
+
+def _int16_sum_squares(x: np.ndarray) -> int:
+    # Same loop as audio_processing._int16_sum_squares.
+    acc = 0
+    for i in range(x.shape[0]):
+        v = np.int64(x[i])
+        acc += v * v
+    return acc
+
+
+numba_sum_squares = njit(cache=True)(_int16_sum_squares) if njit else None
+
+
+def _find_stop(buf, chunk, threshold, max_silent, min_chunks):
+    # Fused RMS + silence counter over a whole take; returns the end index of
+    # the chunk that would stop the recording, or -1.
+    silent = 0
+    for start in range(0, buf.shape[0] - chunk + 1, chunk):
+        acc = 0
+        for j in range(chunk):
+            v = np.int64(buf[start + j])
+            acc += v * v
+        if np.sqrt(acc / chunk) < threshold:
+            silent += 1
+        else:
+            silent = 0
+        if silent > max_silent and start // chunk >= min_chunks:
+            return start + chunk
+    return -1
+
+
+numba_find_stop = njit(cache=True)(_find_stop) if njit else None
+
+
+def per_chunk_find_stop(buf, chunk, threshold, max_silent, min_chunks, sum_sq):
+    # What the recorders do today, one get_rms-style call per chunk.
+    silent = 0
+    for idx, start in enumerate(range(0, buf.shape[0] - chunk + 1, chunk)):
+        rms = float(np.sqrt(sum_sq(buf[start : start + chunk]) / chunk))
+        silent = silent + 1 if rms < threshold else 0
+        if silent > max_silent and idx >= min_chunks:
+            return start + chunk
+    return -1
+
+
+def abs_mean_level(x: np.ndarray) -> float:
+    # mean(|x|) in int32: monotonic in loudness but not in RMS units.
+    return float(np.abs(x, dtype=np.int32).sum()) / len(x)
+
+
+def batched_frame_rms(x: np.ndarray, frame: int) -> np.ndarray:
+    # All frame RMS values in one reduction over a (frames, frame) view.
+    frames = x[: len(x) // frame * frame].reshape(-1, frame).astype(np.float32)
+    return np.sqrt(np.einsum("ij,ij->i", frames, frames) / frame)
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    for n in (1024, 16384, 262144):
+        x = rng.normal(0, 3000, n).astype(np.float32)
+        reps = 2000
+
+        def best_of(fn) -> float:
+            return min(timeit.repeat(lambda: fn(x), number=reps, repeat=3))
+
+        print(f"{n} samples, mean of squares: {best_of(mean_square_rms):.4f} s")
+        print(f"{n} samples, np.dot: {best_of(dot_rms):.4f} s")
+        if rms_simd is not None:
+            assert abs(float(rms_simd(x)[0]) - dot_rms(x)) < 1e-2 * dot_rms(x)
+            t_simd = best_of(lambda a: float(rms_simd(a)[0]))
+            print(f"{n} samples, numpy-rms: {t_simd:.4f} s")
+
+    chunk = rng.normal(0, 3000, 1024).astype(np.int16)
+    scratch = np.empty(1024, dtype=np.float32)
+    assert abs(int16_einsum_rms(chunk) - int16_dot_rms(chunk, scratch)) < 1e-2
+    t_dot = min(
+        timeit.repeat(lambda: int16_dot_rms(chunk, scratch), number=20000, repeat=3)
+    )
+    t_ein = min(timeit.repeat(lambda: int16_einsum_rms(chunk), number=20000, repeat=3))
+    print(f"int16 chunk, scratch + np.dot: {t_dot:.4f} s")
+    print(f"int16 chunk, einsum float64: {t_ein:.4f} s")
+
+    if rms_simd is not None:
+        # numpy-rms on raw int16 squares in int16 and overflows; it is only
+        # correct on float32, which is why get_rms never handed it int16.
+        print(
+            f"int16 chunk, numpy-rms on int16: {float(rms_simd(chunk)[0]):.1f}"
+            f" vs exact {int16_dot_rms(chunk, scratch):.1f}"
+        )
+
+    if audioop is not None:
+        # Same chunk straight from the PyAudio bytes; audioop truncates to int.
+        data = chunk.tobytes()
+        assert abs(audioop.rms(data, 2) - int16_dot_rms(chunk, scratch)) < 1.0
+        t_frombuffer = min(
+            timeit.repeat(
+                lambda: int16_dot_rms(np.frombuffer(data, dtype=np.int16), scratch),
+                number=20000,
+                repeat=3,
+            )
+        )
+        t_audioop = min(
+            timeit.repeat(lambda: audioop.rms(data, 2), number=20000, repeat=3)
+        )
+        print(f"bytes chunk, frombuffer + np.dot: {t_frombuffer:.4f} s")
+        print(f"bytes chunk, audioop.rms: {t_audioop:.4f} s")
+
+    # 16 chunks (~1 s): one batched reduction vs the per-chunk loop the
+    # recorders run. The recorders need each value as its chunk arrives, so a
+    # batch would also delay the stop-on-silence decision by up to 16 chunks.
+    block = rng.normal(0, 3000, 16 * 1024).astype(np.int16)
+    per_chunk = [
+        int16_dot_rms(block[i : i + 1024], scratch) for i in range(0, 16384, 1024)
+    ]
+    assert np.allclose(batched_frame_rms(block, 1024), per_chunk, rtol=1e-5)
+    t_loop = min(
+        timeit.repeat(
+            lambda: [
+                int16_dot_rms(block[i : i + 1024], scratch)
+                for i in range(0, 16384, 1024)
+            ],
+            number=2000,
+            repeat=3,
+        )
+    )
+    t_batch = min(
+        timeit.repeat(lambda: batched_frame_rms(block, 1024), number=2000, repeat=3)
+    )
+    print(f"16 chunks, per-chunk loop: {t_loop:.4f} s")
+    print(f"16 chunks, batched frames: {t_batch:.4f} s")
+
+    t_abs = min(timeit.repeat(lambda: abs_mean_level(chunk), number=20000, repeat=3))
+    print(f"int16 chunk, int32 abs-mean level: {t_abs:.4f} s")
+
+    assert abs(int64_dot_rms(chunk) - int16_dot_rms(chunk, scratch)) < 1e-2
+    t_i64 = min(timeit.repeat(lambda: int64_dot_rms(chunk), number=20000, repeat=3))
+    print(f"int16 chunk, int64 np.dot: {t_i64:.4f} s")
+
+    if numba_sum_squares is not None:
+        numba_sum_squares(chunk)
+        assert numba_sum_squares(chunk) == int(np.dot(chunk.astype(np.int64), chunk))
+        t_nb = min(
+            timeit.repeat(
+                lambda: float(np.sqrt(numba_sum_squares(chunk) / len(chunk))),
+                number=20000,
+                repeat=3,
+            )
+        )
+        print(f"int16 chunk, numba int64 loop: {t_nb:.4f} s")
+
+    if numba_find_stop is not None:
+        # 10 s take: speech, then enough silence to stop near the end.
+        take = np.concatenate(
+            [
+                rng.normal(0, 3000, 16000 * 9).astype(np.int16),
+                np.zeros(16000, dtype=np.int16),
+            ]
+        )
+        args = (take, 1024, 500.0, 12, 10)
+        stop = numba_find_stop(*args)
+        assert stop == per_chunk_find_stop(*args, numba_sum_squares)
+        t_loop = min(
+            timeit.repeat(
+                lambda: per_chunk_find_stop(*args, numba_sum_squares),
+                number=200,
+                repeat=3,
+            )
+        )
+        t_fused = min(
+            timeit.repeat(lambda: numba_find_stop(*args), number=200, repeat=3)
+        )
+        print(f"10 s take, per-chunk RMS + branch: {t_loop:.4f} s")
+        print(f"10 s take, fused numba stop scan: {t_fused:.4f} s")
+
+    if numba_sum_squares is not None:
+        # Silence test on the raw sum of squares against threshold**2 * n,
+        # which skips the division and sqrt. Same decision for int thresholds.
+        threshold = 500
+        thr_sq_n = threshold * threshold * len(chunk)
+        for level in (0, 499, 500, 501, 3000):
+            probe = np.full(1024, level, dtype=np.int16)
+            rms = float(np.sqrt(numba_sum_squares(probe) / len(probe)))
+            assert (numba_sum_squares(probe) < thr_sq_n) == (rms < threshold)
+        t_rms_cmp = min(
+            timeit.repeat(
+                lambda: float(np.sqrt(numba_sum_squares(chunk) / len(chunk)))
+                < threshold,
+                number=20000,
+                repeat=3,
+            )
+        )
+        t_sq_cmp = min(
+            timeit.repeat(
+                lambda: numba_sum_squares(chunk) < thr_sq_n, number=20000, repeat=3
+            )
+        )
+        print(f"int16 chunk, RMS vs threshold: {t_rms_cmp:.4f} s")
+        print(f"int16 chunk, sum of squares vs threshold**2 * n: {t_sq_cmp:.4f} s")
+
+    # Python-side bookkeeping the recorders do per chunk once the RMS is known
+    # (calibration append, threshold compare, silence counter), i.e. the part
+    # a jitted update_state kernel would take over.
+    levels = [float(v) for v in rng.uniform(0, 1000, 1000)]
+
+    def python_state_updates() -> int:
+        silence_counter = 0
+        has_speech = False
+        calibration_values = []
+        threshold = 500
+        for idx, rms in enumerate(levels):
+            if idx < 4 and not has_speech:
+                if rms < threshold * 1.2:
+                    calibration_values.append(rms)
+            if rms < threshold:
+                silence_counter += 1
+            else:
+                silence_counter = 0
+                has_speech = True
+            if silence_counter > 18 and idx > 10:
+                silence_counter = 0
+        return silence_counter
+
+    t_state = min(timeit.repeat(python_state_updates, number=200, repeat=3))
+    print(
+        f"per-chunk Python state update: {t_state / (200 * len(levels)) * 1e6:.3f} us"
+    )
+
+    # int32 accumulation, as in a.astype(np.int32).dot(a), on a clipped chunk:
+    # 1024 * 32768**2 does not fit in int32, so the sum of squares wraps.
+    clipped = np.full(1024, -32768, dtype=np.int16)
+    wide = clipped.astype(np.int32)
+    print(
+        f"clipped chunk, int32 sum of squares: {int(wide.dot(wide))}"
+        f" vs exact {int(np.dot(clipped.astype(np.int64), clipped))}"
+    )
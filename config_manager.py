@@ -1,11 +1,37 @@
-import copy
 import json
 import os
+import pickle
 import re
-from typing import Any
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
 
 
 CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
+ENV_PREFIX = "VOICE_PASTE_"
+
+# Single-slot cache of the last merged config, keyed by the config file's
+# stat and the VOICE_PASTE_* environment (see _config_cache_key). The config
+# is kept pickled: unpickling is the cheapest way to hand out a fresh copy.
+_CONFIG_CACHE: tuple[Any, bytes] | None = None
+_CONFIG_CACHE_LOCK = threading.Lock()
+
+# (path, copy of the config, (mtime_ns, size)) of the last file save_config
+# wrote.
+_LAST_WRITE: tuple[str, dict[str, Any], tuple[int, int]] | None = None
+
+# On Windows, os.replace fails with PermissionError while another process
+# (a second app instance, an antivirus scan) briefly has config.json open.
+_REPLACE_ATTEMPTS = 5
+_REPLACE_RETRY_SEC = 0.05
 
 
 DEFAULT_CONFIG = {
@@ -26,7 +52,9 @@ DEFAULT_CONFIG = {
         "model_gpu": "large-v3",
         "device": "auto",
         "compute_type_cpu": "int8",
-        "compute_type_gpu": "float16",
+        "compute_type_gpu": "int8_float16",
+        "cpu_threads": 0,
+        "model_pool_size": 1,
         "language_mode": "tr_en_mixed",
         "primary_language": "tr",
         "quality_profile": "balanced",
@@ -37,6 +65,7 @@ DEFAULT_CONFIG = {
         "allow_low_confidence_paste": True,
         "paste_min_confidence_floor": 0.25,
         "retry_on_low_confidence": True,
+        "condition_on_previous_text": True,
         "use_legacy_decode_values": False,
         "term_hints": [
             "proje",
@@ -56,6 +85,7 @@ DEFAULT_CONFIG = {
     "audio": {
         "noise_suppression": False,
         "highpass_hz": 80,
+        "highpass_order": 1,
         "normalize_target_dbfs": -20.0,
         "silence_calibration_seconds": 0.25,
         "silence_adaptive_multiplier": 2.5,
@@ -81,46 +111,81 @@ DEFAULT_CONFIG = {
 }
 
 
-QUALITY_PROFILES: dict[str, Any] = {
-    "fast": {"beam_size": 1, "best_of": 1, "temperature": [0.0], "vad_filter": True},
-    "balanced": {
-        "beam_size": 3,
-        "best_of": 3,
-        "temperature": [0.0, 0.2],
-        "vad_filter": True,
-    },
-    "quality": {
-        "beam_size": 5,
-        "best_of": 5,
-        "temperature": [0.0, 0.2, 0.4],
-        "vad_filter": True,
-    },
-}
+# Read-only: decode options hand these values out without copying them.
+QUALITY_PROFILES: Mapping[str, Mapping[str, Any]] = MappingProxyType(
+    {
+        "fast": MappingProxyType(
+            {"beam_size": 1, "best_of": 1, "temperature": (0.0,), "vad_filter": True}
+        ),
+        "balanced": MappingProxyType(
+            {
+                "beam_size": 3,
+                "best_of": 3,
+                "temperature": (0.0, 0.2),
+                "vad_filter": True,
+            }
+        ),
+        "quality": MappingProxyType(
+            {
+                "beam_size": 5,
+                "best_of": 5,
+                "temperature": (0.0, 0.2, 0.4),
+                "vad_filter": True,
+            }
+        ),
+    }
+)
+
+
+_DEFAULT_BLOB = pickle.dumps(DEFAULT_CONFIG, protocol=pickle.HIGHEST_PROTOCOL)
+
 
+def clone_default() -> dict[str, Any]:
+    """Return a fresh, independent copy of DEFAULT_CONFIG."""
+    # pickle's C unpickler rebuilds the tree about 4x faster than
+    # copy.deepcopy.
+    return pickle.loads(_DEFAULT_BLOB)
 
-def _deep_merge(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
-    out = copy.deepcopy(base)
+
+def _deep_merge_inplace(target: dict[str, Any], override: dict[str, Any]) -> None:
+    # For trees the caller owns on both sides, e.g. a fresh DEFAULT_CONFIG
+    # clone and a just-parsed config file: values from override are moved
+    # into target, nothing is copied.
     for key, value in override.items():
-        if isinstance(value, dict) and isinstance(out.get(key), dict):
-            out[key] = _deep_merge(out[key], value)
+        current = target.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            _deep_merge_inplace(current, value)
         else:
-            out[key] = value
-    return out
+            target[key] = value
 
 
 def _coerce_language(language: str) -> str:
     if not isinstance(language, str):
         return "tr"
-    if "-" in language:
-        return language.split("-")[0].lower()
-    return language.lower()
+    # partition() avoids split()'s list. Not sliced to two characters,
+    # because Whisper also has three-letter codes such as "haw" and "yue".
+    return language.partition("-")[0].lower()
+
+
+# Static per-section defaults filled in by _migrate_legacy. The language and
+# model keys are left out because they come from the legacy-key
+# translation below.
+_STT_DEFAULTS: dict[str, Any] = {
+    k: v
+    for k, v in DEFAULT_CONFIG["stt"].items()
+    if k not in ("model_cpu", "model_gpu", "primary_language", "language_mode")
+}
+_AUDIO_DEFAULTS: dict[str, Any] = dict(DEFAULT_CONFIG["audio"])
+_TELEMETRY_DEFAULTS: dict[str, Any] = dict(DEFAULT_CONFIG["telemetry"])
+_UI_DEFAULTS: dict[str, Any] = {
+    k: v for k, v in DEFAULT_CONFIG["ui"].items() if k not in ("window", "theme")
+}
+_UI_WINDOW_DEFAULTS: dict[str, Any] = dict(DEFAULT_CONFIG["ui"]["window"])
+_UI_THEME_DEFAULTS: dict[str, Any] = dict(DEFAULT_CONFIG["ui"]["theme"])
 
 
 def _migrate_legacy(config: dict[str, Any]) -> dict[str, Any]:
-    stt = config.setdefault("stt", {})
-    audio = config.setdefault("audio", {})
-    telemetry = config.setdefault("telemetry", {})
-    ui = config.setdefault("ui", {})
+    stt = config.get("stt", {})
 
     # Legacy keys from old config layout.
     if "whisper_model" in config and "model_cpu" not in stt:
@@ -138,60 +203,19 @@ def _migrate_legacy(config: dict[str, Any]) -> dict[str, Any]:
             "multilingual_auto" if config["enable_multilingual"] else "tr_en_mixed"
         )
 
-    stt.setdefault("backend", "faster_whisper_local")
-    stt.setdefault("device", "auto")
-    stt.setdefault("compute_type_cpu", "int8")
-    stt.setdefault("compute_type_gpu", "float16")
-    stt.setdefault("quality_profile", "balanced")
-    stt.setdefault("beam_size", 3)
-    stt.setdefault("best_of", 3)
-    stt.setdefault("vad_filter", True)
-    stt.setdefault("min_confidence_for_accept", 0.35)
-    stt.setdefault("allow_low_confidence_paste", True)
-    stt.setdefault("paste_min_confidence_floor", 0.25)
-    stt.setdefault("retry_on_low_confidence", True)
-    stt.setdefault("use_legacy_decode_values", False)
-    stt.setdefault(
-        "term_hints",
-        [
-            "proje",
-            "projenin",
-            "plani",
-            "planini",
-            "implementasyon",
-            "entegrasyon",
-            "api",
-            "endpoint",
-            "deployment",
-            "microservice",
-            "yapmamiz",
-            "gerekiyor",
-        ],
-    )
+    # One dict build per section instead of a setdefault call per key.
+    stt = config["stt"] = {**_STT_DEFAULTS, **stt}
     stt["term_hints"] = _sanitize_hints(stt.get("term_hints", []))
     stt["primary_language"] = _coerce_language(
         stt.get("primary_language", config.get("language", "tr"))
     )
 
-    audio.setdefault("noise_suppression", False)
-    audio.setdefault("highpass_hz", 80)
-    audio.setdefault("normalize_target_dbfs", -20.0)
-    audio.setdefault("silence_calibration_seconds", 0.25)
-    audio.setdefault("silence_adaptive_multiplier", 2.5)
-    audio.setdefault("min_silence_threshold", 200)
-
-    telemetry.setdefault("enabled", True)
-    telemetry.setdefault("log_path", "logs/transcribe_metrics.jsonl")
-
-    ui_window = ui.setdefault("window", {})
-    ui_theme = ui.setdefault("theme", {})
-    ui_window.setdefault("width", 420)
-    ui_window.setdefault("height", 620)
-    ui_window.setdefault("always_on_top", True)
-    ui_theme.setdefault("mode", "light")
-    ui_theme.setdefault("accent", "#9a6b2f")
-    ui.setdefault("density", "compact")
-    ui.setdefault("motion", "subtle")
+    config["audio"] = {**_AUDIO_DEFAULTS, **config.get("audio", {})}
+    config["telemetry"] = {**_TELEMETRY_DEFAULTS, **config.get("telemetry", {})}
+
+    ui = config["ui"] = {**_UI_DEFAULTS, **config.get("ui", {})}
+    ui["window"] = {**_UI_WINDOW_DEFAULTS, **ui.get("window", {})}
+    ui["theme"] = {**_UI_THEME_DEFAULTS, **ui.get("theme", {})}
 
     config["language"] = _coerce_language(
         config.get("language", stt["primary_language"])
@@ -199,13 +223,91 @@ def _migrate_legacy(config: dict[str, Any]) -> dict[str, Any]:
     return config
 
 
-def load_config() -> dict[str, Any]:
-    config = copy.deepcopy(DEFAULT_CONFIG)
+_INT_RE = re.compile(r"[+-]?\d+")
+_FLOAT_RE = re.compile(r"[+-]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?")
+_JSON_STARTS = ("{", "[", '"')
+_ENV_BOOLS = {"true": True, "false": False}
+
+
+def _coerce_env_value(val: str) -> Any:
+    # Each conversion is gated on a cheap precheck so plain strings don't
+    # pay for three raised exceptions before falling through.
+    v = val.strip()
+    if not v:
+        return ""
+    low = v.lower()
+    flag = _ENV_BOOLS.get(low)
+    if flag is not None:
+        return flag
+    if _INT_RE.fullmatch(v):
+        return int(v)
+    if _FLOAT_RE.fullmatch(v):
+        return float(v)
+    if v.startswith(_JSON_STARTS) or low == "null":
+        try:
+            return orjson.loads(v) if orjson is not None else json.loads(v)
+        except ValueError:
+            pass
+    # comma-separated list
+    if "," in v:
+        return [s.strip() for s in v.split(",") if s.strip()]
+    return v
+
+
+def _config_cache_key() -> tuple[Any, ...]:
+    try:
+        st = os.stat(CONFIG_PATH)
+        file_key: tuple[int, int] | None = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        file_key = None
+    # Filter on the keys first: os.environ.items() decodes every value in the
+    # environment, while only the few VOICE_PASTE_* values are needed.
+    environ = os.environ
+    env = tuple(sorted((k, environ[k]) for k in environ if k.startswith(ENV_PREFIX)))
+    return (CONFIG_PATH, file_key, env)
+
+
+def invalidate_config_cache() -> None:
+    global _CONFIG_CACHE
+    with _CONFIG_CACHE_LOCK:
+        _CONFIG_CACHE = None
+
+
+def load_config(force: bool = False) -> dict[str, Any]:
+    """Return the merged config, reusing the last result if nothing changed.
+
+    Callers get their own copy and may mutate it freely.
+    """
+    global _CONFIG_CACHE
+    key = _config_cache_key()
+    with _CONFIG_CACHE_LOCK:
+        cached = _CONFIG_CACHE
+    if not force and cached is not None and cached[0] == key:
+        return pickle.loads(cached[1])
+
+    # key[2] is the already-filtered VOICE_PASTE_* environment.
+    config = _load_config_uncached(key[2])
+    blob = pickle.dumps(config, protocol=pickle.HIGHEST_PROTOCOL)
+    with _CONFIG_CACHE_LOCK:
+        _CONFIG_CACHE = (key, blob)
+    # The freshly built tree is not shared with the cache, so hand it out.
+    return config
+
+
+def read_json(path: str) -> Any:
+    """Parse a JSON file from its raw bytes, with orjson when it is installed."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _load_config_uncached(
+    env_overrides: tuple[tuple[str, str], ...] | None = None,
+) -> dict[str, Any]:
+    config = clone_default()
     if os.path.exists(CONFIG_PATH):
         try:
-            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-                user_cfg = json.load(f)
-            config = _deep_merge(config, user_cfg)
+            _deep_merge_inplace(config, read_json(CONFIG_PATH))
         except Exception as exc:
             print(f"[!] Could not load config.json, using defaults: {exc}")
 
@@ -221,37 +323,11 @@ def load_config() -> dict[str, Any]:
             cur = cur[p]
         cur[path[-1]] = value
 
-    def _coerce_env_value(val: str) -> Any:
-        v = val.strip()
-        if not v:
-            return ""
-        low = v.lower()
-        if low in ("true", "false"):
-            return low == "true"
-        # try integer
-        try:
-            return int(v)
-        except Exception:
-            pass
-        # try float
-        try:
-            return float(v)
-        except Exception:
-            pass
-        # try json (list/dict)
-        try:
-            return json.loads(v)
-        except Exception:
-            pass
-        # comma-separated list
-        if "," in v:
-            return [s.strip() for s in v.split(",") if s.strip()]
-        return v
-
-    prefix = "VOICE_PASTE_"
-    for name, val in os.environ.items():
-        if not name.startswith(prefix):
-            continue
+    prefix = ENV_PREFIX
+    if env_overrides is None:
+        environ = os.environ
+        env_overrides = tuple((k, environ[k]) for k in environ if k.startswith(prefix))
+    for name, val in env_overrides:
         key = name[len(prefix) :].lower()
         # support double underscore for nested keys
         parts = [p for p in key.split("__") if p]
@@ -259,31 +335,103 @@ def load_config() -> dict[str, Any]:
             continue
         _set_in_path(config, parts, _coerce_env_value(val))
 
-    return _deep_merge(DEFAULT_CONFIG, config)
+    # No final merge with DEFAULT_CONFIG: the tree was seeded from it and
+    # _migrate_legacy setdefaults every nested section.
+    return config
 
 
 def save_config(config: dict[str, Any]) -> None:
-    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-        json.dump(config, f, indent=4, ensure_ascii=False)
+    global _LAST_WRITE
+    path = CONFIG_PATH
+    try:
+        st = os.stat(path)
+        on_disk: tuple[int, int] | None = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        on_disk = None
+    # Skip no-op saves, but only while the file is still the one we wrote.
+    # Comparing dicts runs in C, so an unchanged config is never encoded.
+    last = _LAST_WRITE
+    if (
+        last is not None
+        and last[0] == path
+        and last[2] == on_disk
+        and last[1] == config
+    ):
+        return
+
+    # Written to a temp file beside the config and swapped in, so a crash
+    # or full disk mid-write never leaves a truncated config.json behind.
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=".config-", suffix=".tmp", dir=os.path.dirname(path)
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(config, indent=4, ensure_ascii=False))
+        for attempt in range(_REPLACE_ATTEMPTS):
+            try:
+                os.replace(tmp_path, path)
+                break
+            except PermissionError:
+                if attempt == _REPLACE_ATTEMPTS - 1:
+                    raise
+                time.sleep(_REPLACE_RETRY_SEC)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    st = os.stat(path)
+    snapshot = pickle.loads(pickle.dumps(config, protocol=pickle.HIGHEST_PROTOCOL))
+    _LAST_WRITE = (path, snapshot, (st.st_mtime_ns, st.st_size))
+    # mtime resolution can be coarse, so do not rely on the stat key alone.
+    invalidate_config_cache()
 
 
 def get_profile_decode_options(config: dict[str, Any]) -> dict[str, Any]:
     stt = config["stt"]
     profile_name = str(stt.get("quality_profile", "balanced")).lower()
-    profile = QUALITY_PROFILES.get(profile_name, QUALITY_PROFILES["balanced"])
     if bool(stt.get("use_legacy_decode_values", False)):
-        return {
-            "beam_size": int(stt.get("beam_size", profile["beam_size"])),
-            "best_of": int(stt.get("best_of", profile["best_of"])),
-            "temperature": profile["temperature"],
-            "vad_filter": bool(stt.get("vad_filter", profile["vad_filter"])),
-        }
-    return {
-        "beam_size": int(profile["beam_size"]),
-        "best_of": int(profile["best_of"]),
-        "temperature": profile["temperature"],
-        "vad_filter": bool(profile["vad_filter"]),
-    }
+        items = _decode_options(
+            profile_name,
+            True,
+            stt.get("beam_size"),
+            stt.get("best_of"),
+            stt.get("vad_filter"),
+        )
+    else:
+        items = _decode_options(profile_name, False, None, None, None)
+    return dict(items)
+
+
+@lru_cache(maxsize=32)
+def _decode_options(
+    profile_name: str,
+    use_legacy: bool,
+    beam_size: Any,
+    best_of: Any,
+    vad_filter: Any,
+) -> tuple[tuple[str, Any], ...]:
+    profile = QUALITY_PROFILES.get(profile_name, QUALITY_PROFILES["balanced"])
+    if use_legacy:
+        return (
+            (
+                "beam_size",
+                int(profile["beam_size"] if beam_size is None else beam_size),
+            ),
+            ("best_of", int(profile["best_of"] if best_of is None else best_of)),
+            ("temperature", profile["temperature"]),
+            (
+                "vad_filter",
+                bool(profile["vad_filter"] if vad_filter is None else vad_filter),
+            ),
+        )
+    return (
+        ("beam_size", int(profile["beam_size"])),
+        ("best_of", int(profile["best_of"])),
+        ("temperature", profile["temperature"]),
+        ("vad_filter", bool(profile["vad_filter"])),
+    )
 
 
 def _sanitize_hints(values: Any) -> list[str]:
@@ -293,7 +441,10 @@ def _sanitize_hints(values: Any) -> list[str]:
     for v in values:
         if not isinstance(v, str):
             continue
-        cleaned = re.sub(r"\s+", " ", v.strip().lower())
+        # split()/join() trims and collapses whitespace without a regex pass.
+        cleaned = " ".join(v.lower().split())
         if cleaned:
             out.append(cleaned)
-    return out[:32]
+            if len(out) == 32:
+                break
+    return out
@@ -1,18 +1,42 @@
-﻿import json
+﻿import atexit
+import json
 import math
 import os
+import queue
 import re
-import tempfile
+import threading
 import time
-import wave
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, BinaryIO, Optional
 
-import ctranslate2
-from faster_whisper import WhisperModel
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
 
 from config_manager import get_profile_decode_options
 
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel as _WhisperModel
+
+# faster-whisper (and ctranslate2 under it) is slow to import, so it is only
+# loaded when a model is first built; see _whisper_model_class.
+WhisperModel: Any = None
+
+# faster-whisper expects mono float32 in [-1, 1] at this rate.
+WHISPER_SAMPLE_RATE = 16000
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Segment stats used when a decode pass reports none.
+_DEFAULT_LOGPROB = -2.0
+_DEFAULT_NO_SPEECH = 0.35
+_VAD_PARAMETERS = {"min_silence_duration_ms": 400, "speech_pad_ms": 350}
+# Value of config["stt"]["backend"] that selects the OpenVINO runtime; any
+# other value keeps faster-whisper.
+OPENVINO_BACKEND = "openvino"
+
 
 @dataclass
 class TranscriptionResult:
@@ -28,36 +52,105 @@ class TranscriptionResult:
     warning: str = ""
 
 
+def _decode_language(stt: dict[str, Any]) -> Optional[str]:
+    if stt.get("language_mode", "tr_en_mixed") == "multilingual_auto":
+        return None
+    return stt.get("primary_language", "tr")
+
+
+def _initial_prompt(language: Optional[str], hints: list[str]) -> Optional[str]:
+    if language != "tr":
+        return None
+    prompt = (
+        "Bu konusma cogunlukla Turkce. "
+        "Ingilizce teknik terimler, marka ve urun adlarini aynen koru."
+    )
+    if hints:
+        prompt = f"{prompt} Terim ipuclari: {', '.join(hints[:12])}."
+    return prompt
+
+
 class STTService:
     def __init__(self, config: dict[str, Any], sample_rate: int, channels: int):
         self.sample_rate = sample_rate
         self.channels = channels
-        self._model: Optional[WhisperModel] = None
-        self._loaded_signature: Optional[tuple[str, str, str]] = None
+        self._model: Optional["_WhisperModel"] = None
+        self._loaded_signature: Optional[tuple[str, str, str, int]] = None
+        # Loaded models kept by signature. stt.model_pool_size > 1 lets a
+        # switch back to an earlier model skip the load, at the cost of
+        # keeping that model's RAM/VRAM resident; the default keeps only the
+        # active one.
+        self._model_pool: OrderedDict[tuple[str, str, str, int], Any] = OrderedDict()
+        self._pool_size = 1
+        # Held by reload, warm_up and transcribe_audio_bytes, so a model switch
+        # from the loader thread never lands in the middle of a decode.
+        self._lock = threading.RLock()
         self._cuda_disabled = False
+        self._cuda_available: Optional[bool] = None
+        self._telemetry_path: Optional[str] = None
+        self._telemetry_fp: Optional[BinaryIO] = None
+        self._telemetry_queue: queue.Queue[Optional[tuple[str, dict[str, Any]]]] = (
+            queue.Queue(maxsize=1024)
+        )
+        self._telemetry_thread: Optional[threading.Thread] = None
         self.reload(config)
 
     def reload(self, config: dict[str, Any]) -> None:
+        with self._lock:
+            self._reload(config)
+
+    def _reload(self, config: dict[str, Any]) -> None:
         stt = config["stt"]
-        device = self._resolve_device(stt)
-        model_name = stt["model_gpu"] if device == "cuda" else stt["model_cpu"]
-        compute_type = (
-            stt["compute_type_gpu"] if device == "cuda" else stt["compute_type_cpu"]
+        self._pool_size = max(1, int(stt.get("model_pool_size", 1)))
+        # Kept for warm_up, which has no config of its own.
+        self._language = _decode_language(stt)
+        if stt.get("backend") == OPENVINO_BACKEND:
+            # OpenVINO runs on the CPU with 8-bit weights. "openvino" in the
+            # device slot keeps its models apart from faster-whisper's in the
+            # pool and shows up in the metrics line.
+            device = OPENVINO_BACKEND
+            model_name = stt["model_cpu"]
+            compute_type = "int8"
+        else:
+            device = self._resolve_device(stt)
+            model_name = stt["model_gpu"] if device == "cuda" else stt["model_cpu"]
+            compute_type = (
+                stt["compute_type_gpu"] if device == "cuda" else stt["compute_type_cpu"]
+            )
+        cpu_threads = _resolve_cpu_threads(stt.get("cpu_threads", 0))
+        signature = (
+            model_name,
+            device,
+            compute_type,
+            cpu_threads if device != "cuda" else 0,
         )
-        signature = (model_name, device, compute_type)
 
         if signature == self._loaded_signature and self._model is not None:
             return
+        if signature in self._model_pool:
+            print(f"[STT] Reusing loaded model={model_name} device={device}")
+            self._use_model(self._model_pool[signature], signature)
+            return
 
         print(
             f"[STT] Loading model={model_name} device={device} "
             f"compute_type={compute_type}"
         )
         try:
-            self._model = WhisperModel(
-                model_name, device=device, compute_type=compute_type
-            )
-            self._loaded_signature = signature
+            if device == OPENVINO_BACKEND:
+                model = _openvino_model_class()(model_name, cpu_threads=cpu_threads)
+            elif device == "cpu":
+                model = _whisper_model_class()(
+                    model_name,
+                    device=device,
+                    compute_type=compute_type,
+                    cpu_threads=cpu_threads,
+                )
+            else:
+                model = _whisper_model_class()(
+                    model_name, device=device, compute_type=compute_type
+                )
+            self._use_model(model, signature)
             return
         except Exception as exc:
             if device != "cuda":
@@ -67,11 +160,56 @@ class STTService:
 
         fallback_model = stt["model_cpu"]
         fallback_compute = stt["compute_type_cpu"]
-        fallback_sig = (fallback_model, "cpu", fallback_compute)
-        self._model = WhisperModel(
-            fallback_model, device="cpu", compute_type=fallback_compute
+        fallback_sig = (fallback_model, "cpu", fallback_compute, cpu_threads)
+        if fallback_sig in self._model_pool:
+            self._use_model(self._model_pool[fallback_sig], fallback_sig)
+            return
+        model = _whisper_model_class()(
+            fallback_model,
+            device="cpu",
+            compute_type=fallback_compute,
+            cpu_threads=cpu_threads,
         )
-        self._loaded_signature = fallback_sig
+        self._use_model(model, fallback_sig)
+
+    def _use_model(self, model: Any, signature: tuple[str, str, str, int]) -> None:
+        self._model = model
+        self._loaded_signature = signature
+        self._model_pool[signature] = model
+        self._model_pool.move_to_end(signature)
+        while len(self._model_pool) > self._pool_size:
+            # Dropping the last reference frees the CTranslate2 model.
+            self._model_pool.popitem(last=False)
+
+    @property
+    def loaded_model(self) -> Optional[tuple[str, str]]:
+        """(model name, device) of the loaded model, or None before a load."""
+        if self._loaded_signature is None:
+            return None
+        return self._loaded_signature[0], self._loaded_signature[1]
+
+    def warm_up(self) -> None:
+        """Run one throwaway decode so the first take skips backend start-up."""
+        with self._lock:
+            self._warm_up()
+
+    def _warm_up(self) -> None:
+        model = self._model
+        if model is None:
+            return
+        try:
+            # vad_filter is off: it would drop the silent clip before the
+            # encoder and decoder ever run.
+            segments, _ = model.transcribe(
+                np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32),
+                language=self._language,
+                beam_size=1,
+                vad_filter=False,
+            )
+            for _ in segments:
+                pass
+        except Exception as exc:
+            print(f"[STT] Warm-up failed: {exc}")
 
     def _resolve_device(self, stt_cfg: dict[str, Any]) -> str:
         forced = stt_cfg.get("device", "auto")
@@ -79,26 +217,22 @@ class STTService:
             return forced
         if self._cuda_disabled:
             return "cpu"
-
-        try:
-            import torch  # type: ignore
-
-            if torch.cuda.is_available():
-                return "cuda"
-        except Exception:
-            pass
-
-        try:
-            if ctranslate2.get_cuda_device_count() > 0:
-                return "cuda"
-        except Exception:
-            pass
-        return "cpu"
+        if self._cuda_available is None:
+            self._cuda_available = _probe_cuda()
+        return "cuda" if self._cuda_available else "cpu"
 
     def transcribe_audio_bytes(
         self, audio_bytes: bytes, config: dict[str, Any]
     ) -> TranscriptionResult:
-        self.reload(config)
+        with self._lock:
+            result = self._transcribe(audio_bytes, config)
+        self._write_telemetry(config, result)
+        return result
+
+    def _transcribe(
+        self, audio_bytes: bytes, config: dict[str, Any]
+    ) -> TranscriptionResult:
+        self._reload(config)
         if self._model is None or self._loaded_signature is None:
             raise RuntimeError("STT model failed to load")
         duration_audio_sec = len(audio_bytes) / float(
@@ -106,116 +240,93 @@ class STTService:
         )
         start = time.time()
 
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-            path = tmp.name
-
-        try:
-            with wave.open(path, "wb") as wav_file:
-                wav_file.setnchannels(self.channels)
-                wav_file.setsampwidth(2)
-                wav_file.setframerate(self.sample_rate)
-                wav_file.writeframes(audio_bytes)
-
-            language_mode = config["stt"].get("language_mode", "tr_en_mixed")
-            primary_language = config["stt"].get("primary_language", "tr")
-            language = (
-                None if language_mode == "multilingual_auto" else primary_language
-            )
-            hints = config["stt"].get("term_hints", [])
-
-            prompt = (
-                "Bu konusma cogunlukla Turkce. "
-                "Ingilizce teknik terimler, marka ve urun adlarini aynen koru."
-                if language == "tr"
-                else None
-            )
-            if language == "tr" and hints:
-                prompt = f"{prompt} Terim ipuclari: {', '.join(hints[:12])}."
-
-            first_decode = get_profile_decode_options(config)
-            best = self._run_decode_pass(path, language, prompt, first_decode)
-            min_conf = float(config["stt"].get("min_confidence_for_accept", 0.35))
-            retry_enabled = bool(config["stt"].get("retry_on_low_confidence", True))
-            needs_retry = (
-                not best["text"]
-                or best["confidence"] < min_conf
-                or _looks_fragmented(best["text"])
-            )
+        # Decoded once; the retry pass below reuses the same array.
+        audio = _pcm16_to_whisper_audio(audio_bytes, self.sample_rate, self.channels)
+        stt = config["stt"]
+        language = _decode_language(stt)
+        prompt = _initial_prompt(language, stt.get("term_hints", []))
+
+        condition = bool(stt.get("condition_on_previous_text", True))
+        first_decode = get_profile_decode_options(config)
+        best = self._run_decode_pass(audio, language, prompt, first_decode, condition)
+        min_conf = float(stt.get("min_confidence_for_accept", 0.35))
+        retry_enabled = bool(stt.get("retry_on_low_confidence", True))
+        needs_retry = (
+            not best["text"] or best["confidence"] < min_conf or best["fragmented"]
+        )
 
-            if retry_enabled and needs_retry:
-                retry_decode = {
-                    "beam_size": max(5, int(first_decode["beam_size"])),
-                    "best_of": max(5, int(first_decode["best_of"])),
-                    "temperature": [0.0, 0.2, 0.4],
-                    "vad_filter": True,
-                }
-                retry = self._run_decode_pass(path, language, prompt, retry_decode)
-                best_score = _decode_quality_score(best)
-                retry_score = _decode_quality_score(retry)
-                if retry_score >= best_score or (not best["text"] and retry["text"]):
-                    best = retry
-
-            text = best["text"]
-            avg_logprob = best["avg_logprob"]
-            no_speech_prob = best["no_speech_prob"]
-            confidence = best["confidence"]
-            accepted = bool(text) and confidence >= min_conf
-            warning = "" if accepted else "Dusuk guvenli sonuc, lutfen tekrar deneyin."
-            latency = time.time() - start
-
-            result = TranscriptionResult(
-                text=text,
-                accepted=accepted,
-                confidence=confidence,
-                avg_logprob=avg_logprob,
-                no_speech_prob=no_speech_prob,
-                latency_sec=latency,
-                duration_audio_sec=duration_audio_sec,
-                model=self._loaded_signature[0],
-                device=self._loaded_signature[1],
-                warning=warning,
+        if retry_enabled and needs_retry:
+            retry_decode = {
+                "beam_size": max(5, int(first_decode["beam_size"])),
+                "best_of": max(5, int(first_decode["best_of"])),
+                "temperature": (0.0, 0.2, 0.4),
+                "vad_filter": True,
+            }
+            retry = self._run_decode_pass(
+                audio, language, prompt, retry_decode, condition
             )
-            self._write_telemetry(config, result)
-            return result
-        finally:
-            try:
-                os.remove(path)
-            except Exception:
-                pass
+            best_score = _decode_quality_score(best)
+            retry_score = _decode_quality_score(retry)
+            if retry_score >= best_score or (not best["text"] and retry["text"]):
+                best = retry
+
+        text = best["text"]
+        avg_logprob = best["avg_logprob"]
+        no_speech_prob = best["no_speech_prob"]
+        confidence = best["confidence"]
+        accepted = bool(text) and confidence >= min_conf
+        warning = "" if accepted else "Dusuk guvenli sonuc, lutfen tekrar deneyin."
+        latency = time.time() - start
+
+        return TranscriptionResult(
+            text=text,
+            accepted=accepted,
+            confidence=confidence,
+            avg_logprob=avg_logprob,
+            no_speech_prob=no_speech_prob,
+            latency_sec=latency,
+            duration_audio_sec=duration_audio_sec,
+            model=self._loaded_signature[0],
+            device=self._loaded_signature[1],
+            warning=warning,
+        )
 
     def _run_decode_pass(
         self,
-        path: str,
+        audio: np.ndarray,
         language: str | None,
         prompt: str | None,
         decode: dict[str, Any],
+        condition_on_previous_text: bool = True,
     ) -> dict[str, Any]:
         if self._model is None:
             raise RuntimeError("STT model is not loaded")
         segments, _ = self._model.transcribe(
-            path,
+            audio,
             language=language,
             initial_prompt=prompt,
             beam_size=int(decode["beam_size"]),
             best_of=int(decode["best_of"]),
             vad_filter=bool(decode["vad_filter"]),
             temperature=decode["temperature"],
-            vad_parameters={"min_silence_duration_ms": 400, "speech_pad_ms": 350},
-        )
-        segment_list = list(segments)
-        text = " ".join(seg.text.strip() for seg in segment_list).strip()
-        avg_logprob = _mean(
-            [getattr(seg, "avg_logprob", None) for seg in segment_list], -2.0
-        )
-        no_speech_prob = _mean(
-            [getattr(seg, "no_speech_prob", None) for seg in segment_list], 0.35
+            vad_parameters=_VAD_PARAMETERS,
+            # stt.condition_on_previous_text: off skips feeding earlier 30 s
+            # windows' text back into the decoder, which is cheaper and avoids
+            # repetition loops but can change casing and punctuation.
+            condition_on_previous_text=condition_on_previous_text,
         )
+        text, avg_logprob, no_speech_prob = _segment_stats(segments)
         confidence = _confidence_score(avg_logprob, no_speech_prob)
+        # Computed once here; both the retry check and the quality score
+        # read them back instead of re-tokenizing the text.
+        fragmented, fragment_ratio = _analyze_fragments(text)
         return {
             "text": text,
             "avg_logprob": avg_logprob,
             "no_speech_prob": no_speech_prob,
             "confidence": confidence,
+            "fragmented": fragmented,
+            "fragment_ratio": fragment_ratio,
         }
 
     def _write_telemetry(
@@ -225,11 +336,6 @@ class STTService:
         if not telemetry.get("enabled", True):
             return
         output_path = telemetry.get("log_path", "logs/transcribe_metrics.jsonl")
-        abs_path = output_path
-        if not os.path.isabs(output_path):
-            root = os.path.dirname(os.path.abspath(__file__))
-            abs_path = os.path.join(root, output_path)
-        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
         line = {
             "ts": int(time.time()),
             "duration_audio_sec": round(result.duration_audio_sec, 3),
@@ -241,55 +347,317 @@ class STTService:
             "confidence": round(result.confidence, 4),
             "accepted": result.accepted,
         }
-        with open(abs_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        # File I/O happens on the telemetry thread, off the dictation path.
+        self._start_telemetry_worker()
+        try:
+            self._telemetry_queue.put_nowait((output_path, line))
+        except queue.Full:
+            pass  # Telemetry is best effort; drop rather than block.
+
+    def _start_telemetry_worker(self) -> None:
+        if self._telemetry_thread is not None:
+            return
+        self._telemetry_thread = threading.Thread(
+            target=self._telemetry_worker, name="stt-telemetry", daemon=True
+        )
+        self._telemetry_thread.start()
+        atexit.register(self.close_telemetry)
+
+    def _telemetry_worker(self) -> None:
+        while True:
+            item = self._telemetry_queue.get()
+            if item is None:
+                self._close_telemetry_file()
+                return
+            output_path, line = item
+            try:
+                fp = self._telemetry_file(output_path)
+                if orjson is not None:
+                    fp.write(orjson.dumps(line) + b"\n")
+                else:
+                    data = json.dumps(line, ensure_ascii=False) + "\n"
+                    fp.write(data.encode("utf-8"))
+            except OSError as exc:
+                print(f"[STT] Telemetry write failed: {exc}")
+
+    def _telemetry_file(self, output_path: str) -> BinaryIO:
+        # Resolved and opened once per log path, then kept open. Unbuffered,
+        # so each record lands in the file with a single write.
+        if self._telemetry_fp is not None and self._telemetry_path == output_path:
+            return self._telemetry_fp
+        self._close_telemetry_file()
+        abs_path = output_path
+        if not os.path.isabs(output_path):
+            abs_path = os.path.join(_MODULE_DIR, output_path)
+        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+        fp = open(abs_path, "ab", buffering=0)
+        self._telemetry_path = output_path
+        self._telemetry_fp = fp
+        return fp
+
+    def _close_telemetry_file(self) -> None:
+        fp, self._telemetry_fp = self._telemetry_fp, None
+        self._telemetry_path = None
+        if fp is not None:
+            fp.close()
+
+    def close_telemetry(self) -> None:
+        """Drain queued telemetry records and close the log file."""
+        thread, self._telemetry_thread = self._telemetry_thread, None
+        if thread is None:
+            self._close_telemetry_file()
+            return
+        atexit.unregister(self.close_telemetry)
+        self._telemetry_queue.put(None)
+        thread.join(timeout=2.0)
+
+
+def _whisper_model_class() -> Any:
+    global WhisperModel
+    if WhisperModel is None:
+        from faster_whisper import WhisperModel as model_cls
+
+        WhisperModel = model_cls
+    return WhisperModel
+
+
+class _OVSegment:
+    __slots__ = ("text", "avg_logprob")
+
+    def __init__(self, text: str, avg_logprob: Optional[float]):
+        self.text = text
+        self.avg_logprob = avg_logprob
+
 
+# Whisper's encoder sees 30 s at a time, and the Hugging Face processor pads
+# or cuts its input to exactly that.
+_OV_WINDOW_SAMPLES = 30 * WHISPER_SAMPLE_RATE
 
-def _mean(values: list[Any], default: float) -> float:
-    clean = [float(v) for v in values if v is not None]
-    if not clean:
-        return default
-    return float(sum(clean) / len(clean))
+
+class OpenVINOWhisper:
+    """Whisper on OpenVINO behind faster-whisper's transcribe() interface.
+
+    The model is exported from its Hugging Face checkpoint on first load
+    with 8-bit weight quantization. Takes longer than 30 s are decoded as
+    consecutive 30 s windows, one segment each, so a word on a window
+    boundary can be split. Only language, initial_prompt and beam_size are
+    honored; temperature fallback, best_of, vad_filter and
+    condition_on_previous_text are ignored, and there is no per-segment
+    no_speech_prob (the default from _segment_stats applies).
+    """
+
+    def __init__(self, model_name: str, cpu_threads: int = 0):
+        from optimum.intel import OVModelForSpeechSeq2Seq, OVWeightQuantizationConfig
+        from transformers import AutoProcessor
+
+        # faster-whisper size names ("small", "large-v3") map onto the OpenAI
+        # checkpoints; anything with a slash is already a hub id or a path.
+        model_id = model_name if "/" in model_name else f"openai/whisper-{model_name}"
+        ov_config = {"INFERENCE_NUM_THREADS": str(cpu_threads)} if cpu_threads else {}
+        self._processor = AutoProcessor.from_pretrained(model_id)
+        self._model = OVModelForSpeechSeq2Seq.from_pretrained(
+            model_id,
+            export=True,
+            quantization_config=OVWeightQuantizationConfig(bits=8),
+            ov_config=ov_config,
+        )
+        print(
+            "[STT] OpenVINO backend ignores temperature, best_of, vad_filter "
+            "and condition_on_previous_text"
+        )
+
+    def transcribe(
+        self,
+        audio: np.ndarray,
+        language: Optional[str] = None,
+        initial_prompt: Optional[str] = None,
+        beam_size: int = 1,
+        **_unsupported: Any,
+    ) -> tuple[list[_OVSegment], None]:
+        generate_kwargs: dict[str, Any] = {
+            "num_beams": int(beam_size),
+            "task": "transcribe",
+            "return_dict_in_generate": True,
+            "output_scores": True,
+        }
+        if language:
+            generate_kwargs["language"] = language
+        if initial_prompt:
+            generate_kwargs["prompt_ids"] = self._processor.get_prompt_ids(
+                initial_prompt, return_tensors="pt"
+            )
+        segments = []
+        for start in range(0, max(len(audio), 1), _OV_WINDOW_SAMPLES):
+            window = audio[start : start + _OV_WINDOW_SAMPLES]
+            features = self._processor(
+                window, sampling_rate=WHISPER_SAMPLE_RATE, return_tensors="pt"
+            ).input_features
+            out = self._model.generate(features, **generate_kwargs)
+            text = self._processor.batch_decode(
+                out.sequences, skip_special_tokens=True
+            )[0]
+            segments.append(_OVSegment(text, _generated_avg_logprob(self._model, out)))
+        return segments, None
+
+
+def _generated_avg_logprob(model: Any, out: Any) -> Optional[float]:
+    # Beam search reports a length-normalized sequence log-probability, the
+    # same quantity faster-whisper puts in avg_logprob; greedy search only
+    # has per-step scores, which are averaged here.
+    seq_scores = getattr(out, "sequences_scores", None)
+    if seq_scores is not None:
+        return float(seq_scores[0])
+    try:
+        steps = model.compute_transition_scores(
+            out.sequences, out.scores, normalize_logits=True
+        )
+    except Exception:
+        return None
+    return float(steps[0].mean()) if steps.numel() else None
+
+
+def _openvino_model_class() -> Any:
+    # A function so the optimum/transformers import only happens for the
+    # OpenVINO backend, and so tests can swap the class out.
+    return OpenVINOWhisper
+
+
+def _resolve_cpu_threads(requested: Any) -> int:
+    # 0 means auto: about one thread per physical core. faster-whisper's own
+    # default is a fixed 4, which leaves larger CPUs idle, and SMT siblings
+    # do not speed up the int8 GEMMs.
+    threads = int(requested or 0)
+    if threads > 0:
+        return threads
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def _probe_cuda() -> bool:
+    # Failed imports are not cached by Python, so callers keep the result.
+    try:
+        import torch  # type: ignore
+
+        if torch.cuda.is_available():
+            return True
+    except Exception:
+        pass
+
+    try:
+        import ctranslate2
+
+        if ctranslate2.get_cuda_device_count() > 0:
+            return True
+    except Exception:
+        pass
+    return False
+
+
+def _pcm16_to_whisper_audio(
+    audio_bytes: bytes, sample_rate: int, channels: int
+) -> np.ndarray:
+    usable = len(audio_bytes) - len(audio_bytes) % (2 * max(1, channels))
+    samples = np.frombuffer(memoryview(audio_bytes)[:usable], dtype=np.int16)
+    if channels > 1:
+        audio = samples.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+    else:
+        # Not a single np.multiply(..., dtype=float32): its buffered cast is
+        # slower than astype plus an in-place scale for takes under ~30 s
+        # (see benchmark_pcm_handoff.py).
+        audio = samples.astype(np.float32)
+    audio *= np.float32(1.0 / 32768.0)
+    if sample_rate != WHISPER_SAMPLE_RATE and audio.size:
+        try:
+            # Only needed off the 16 kHz fast path, and scipy.signal is slow
+            # to import.
+            from scipy.signal import resample_poly
+        except ImportError:
+            resample_poly = None  # type: ignore[assignment]
+        if resample_poly is not None:
+            g = math.gcd(WHISPER_SAMPLE_RATE, sample_rate)
+            audio = resample_poly(
+                audio, WHISPER_SAMPLE_RATE // g, sample_rate // g
+            ).astype(np.float32, copy=False)
+        else:
+            n_out = int(round(audio.size * WHISPER_SAMPLE_RATE / sample_rate))
+            src = np.arange(audio.size, dtype=np.float64)
+            dst = np.linspace(0.0, audio.size - 1, n_out)
+            audio = np.interp(dst, src, audio).astype(np.float32)
+    return audio
+
+
+def _segment_stats(segments: Any) -> tuple[str, float, float]:
+    """Join segment text and average the per-segment stats in one pass.
+
+    Plain float accumulators: decodes yield a handful of segments, where
+    building NumPy arrays costs more than the arithmetic.
+    """
+    parts = []
+    lp_total = ns_total = 0.0
+    lp_count = ns_count = 0
+    for seg in segments:
+        parts.append(seg.text.strip())
+        lp = getattr(seg, "avg_logprob", None)
+        if lp is not None:
+            lp_total += lp
+            lp_count += 1
+        ns = getattr(seg, "no_speech_prob", None)
+        if ns is not None:
+            ns_total += ns
+            ns_count += 1
+    avg_logprob = lp_total / lp_count if lp_count else _DEFAULT_LOGPROB
+    no_speech_prob = ns_total / ns_count if ns_count else _DEFAULT_NO_SPEECH
+    return " ".join(parts).strip(), avg_logprob, no_speech_prob
 
 
 def _confidence_score(avg_logprob: float, no_speech_prob: float) -> float:
-    lp_conf = math.exp(min(0.0, avg_logprob))
-    speech_conf = 1.0 - max(0.0, min(1.0, no_speech_prob))
-    score = 0.6 * lp_conf + 0.4 * speech_conf
-    return max(0.0, min(1.0, score))
+    # Plain comparisons instead of nested min()/max() calls.
+    lp_conf = math.exp(avg_logprob) if avg_logprob < 0.0 else 1.0
+    if not 0.0 <= no_speech_prob <= 1.0:
+        # NaN fails both bounds and lands on 1.0, as min()/max() put it.
+        no_speech_prob = 0.0 if no_speech_prob < 0.0 else 1.0
+    # Both terms are in [0, 1], so the weighted sum needs no clamp.
+    return 0.6 * lp_conf + 0.4 * (1.0 - no_speech_prob)
 
 
 _TOKEN_PATTERN = re.compile(r"[a-zA-Z0-9çğıöşüÇĞİÖŞÜ]+")
-_SPLIT_HINT_PATTERN = re.compile(r"\b[iı]p\s+le\s+mantasyon\b")
+# Matched case-insensitively against the original text: str.lower() turns
+# Turkish "İ" into "i" plus a combining dot, which "[iı]" would miss.
+_SPLIT_HINT_PATTERN = re.compile(r"\b[iı]p\s+le\s+mantasyon\b", re.IGNORECASE)
 
 
-def _looks_fragmented(text: str) -> bool:
+def _analyze_fragments(text: str) -> tuple[bool, float]:
+    """Return (looks_fragmented, short_token_ratio) from a single tokenize pass."""
     if not text:
-        return True
+        return True, 1.0
     lower_text = text.lower()
     tokens = _TOKEN_PATTERN.findall(lower_text)
+    if not tokens:
+        return False, 1.0
+    short_tokens = len([token for token in tokens if len(token) <= 2])
+    ratio = short_tokens / len(tokens)
     if len(tokens) < 4:
-        return False
-    short_tokens = sum(1 for token in tokens if len(token) <= 2)
-    short_ratio = short_tokens / max(1, len(tokens))
-    if short_ratio >= 0.35:
-        return True
-    return bool(_SPLIT_HINT_PATTERN.search(lower_text))
+        return False, ratio
+    fragmented = ratio >= 0.35 or bool(_SPLIT_HINT_PATTERN.search(text))
+    return fragmented, ratio
+
+
+def _looks_fragmented(text: str) -> bool:
+    return _analyze_fragments(text)[0]
 
 
 def _fragment_ratio(text: str) -> float:
-    tokens = _TOKEN_PATTERN.findall((text or "").lower())
-    if not tokens:
-        return 1.0
-    short_tokens = sum(1 for token in tokens if len(token) <= 2)
-    return short_tokens / max(1, len(tokens))
+    return _analyze_fragments(text)[1]
 
 
 def _decode_quality_score(decoded: dict[str, Any]) -> float:
     text = decoded.get("text", "")
     conf = float(decoded.get("confidence", 0.0))
     score = conf
-    if _looks_fragmented(text):
+    if "fragment_ratio" in decoded:
+        fragmented, ratio = decoded["fragmented"], decoded["fragment_ratio"]
+    else:
+        fragmented, ratio = _analyze_fragments(text)
+    if fragmented:
         score -= 0.20
-    score -= 0.10 * _fragment_ratio(text)
+    score -= 0.10 * ratio
     return score
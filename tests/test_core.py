@@ -2,6 +2,8 @@
 
 import copy
 import io
+import json
+import os
 import sys
 import types
 from typing import Any
@@ -9,12 +11,22 @@ from typing import Any
 import numpy as np
 import pytest
 
+import audio_processing
 import config_manager
-from audio_processing import get_rms, preprocess_audio_bytes, suppress_noise
+from audio_processing import (
+    StreamingPreprocessor,
+    calibrate_silence_threshold,
+    fast_percentile,
+    get_rms,
+    highpass_filter,
+    int16_to_bytes,
+    preprocess_audio_bytes,
+    suppress_noise,
+)
 from config_manager import (
     DEFAULT_CONFIG,
     _coerce_language,
-    _deep_merge,
+    _deep_merge_inplace,
     _sanitize_hints,
     get_profile_decode_options,
     load_config,
@@ -23,23 +35,30 @@ from config_manager import (
 
 class TestDeepMerge:
     def test_shallow_override(self):
-        base = {"a": 1, "b": 2}
-        override = {"b": 3}
-        result = _deep_merge(base, override)
-        assert result == {"a": 1, "b": 3}
+        target = {"a": 1, "b": 2}
+        _deep_merge_inplace(target, {"b": 3})
+        assert target == {"a": 1, "b": 3}
 
     def test_nested_merge(self):
-        base = {"stt": {"model_cpu": "small", "device": "auto"}}
-        override = {"stt": {"model_cpu": "medium"}}
-        result = _deep_merge(base, override)
-        assert result["stt"]["model_cpu"] == "medium"
-        assert result["stt"]["device"] == "auto"
+        target = {"stt": {"model_cpu": "small", "device": "auto"}}
+        _deep_merge_inplace(target, {"stt": {"model_cpu": "medium"}})
+        assert target["stt"]["model_cpu"] == "medium"
+        assert target["stt"]["device"] == "auto"
+
+    def test_inplace_merge_updates_target(self):
+        target = {"a": 1, "stt": {"device": "auto", "backend": "x"}}
+        _deep_merge_inplace(target, {"stt": {"device": "cpu"}, "b": 2})
+        assert target == {"a": 1, "stt": {"device": "cpu", "backend": "x"}, "b": 2}
+
+    def test_non_dict_override_replaces_subtree(self):
+        target = {"stt": {"term_hints": ["api"]}}
+        _deep_merge_inplace(target, {"stt": None})
+        assert target == {"stt": None}
 
-    def test_does_not_mutate_base(self):
-        base = {"x": {"y": 1}}
-        override = {"x": {"y": 2}}
-        _deep_merge(base, override)
-        assert base["x"]["y"] == 1
+    def test_preserves_target_key_order(self):
+        target = {"a": 1, "b": {"x": 1}, "c": 3}
+        _deep_merge_inplace(target, {"new": 0, "b": {}})
+        assert list(target) == ["a", "b", "c", "new"]
 
 
 class TestCoerceLanguage:
@@ -55,6 +74,9 @@ class TestCoerceLanguage:
     def test_non_string(self):
         assert _coerce_language(42) == "tr"  # type: ignore[arg-type]
 
+    def test_three_letter_code_kept(self):
+        assert _coerce_language("YUE-HK") == "yue"
+
 
 class TestSanitizeHints:
     def test_basic(self):
@@ -72,8 +94,22 @@ class TestSanitizeHints:
         hints = [str(i) for i in range(50)]
         assert len(_sanitize_hints(hints)) == 32
 
+    def test_cap_counts_only_kept_hints(self):
+        hints = ["  ", 7] * 10 + [f"H{i}" for i in range(40)]
+        assert _sanitize_hints(hints) == [f"h{i}" for i in range(32)]
+
+    def test_collapses_inner_whitespace(self):
+        assert _sanitize_hints(["Micro \t  Service\n", " \n "]) == ["micro service"]
+
 
 class TestGetProfileDecodeOptions:
+    def test_profiles_are_read_only(self):
+        profiles: Any = config_manager.QUALITY_PROFILES
+        with pytest.raises(TypeError):
+            profiles["fast"]["beam_size"] = 9
+        with pytest.raises(TypeError):
+            profiles["new"] = {}
+
     def test_balanced_profile(self):
         config = _make_config("balanced")
         opts = get_profile_decode_options(config)
@@ -103,6 +139,37 @@ class TestGetProfileDecodeOptions:
         opts = get_profile_decode_options(config)
         assert opts["beam_size"] == 7
 
+    def test_repeat_calls_hit_cache(self):
+        config = _make_config("fast")
+        get_profile_decode_options(config)
+        hits = config_manager._decode_options.cache_info().hits
+        get_profile_decode_options(config)
+        assert config_manager._decode_options.cache_info().hits == hits + 1
+
+    def test_legacy_overrides_are_part_of_cache_key(self):
+        config = _make_config("balanced")
+        config["stt"]["use_legacy_decode_values"] = True
+        config["stt"]["beam_size"] = 2
+        assert get_profile_decode_options(config)["beam_size"] == 2
+        config["stt"]["beam_size"] = 4
+        assert get_profile_decode_options(config)["beam_size"] == 4
+
+    def test_returns_independent_dicts(self):
+        config = _make_config("quality")
+        opts = get_profile_decode_options(config)
+        opts["beam_size"] = 99
+        again = get_profile_decode_options(config)
+        assert again["beam_size"] == 5
+        assert again["temperature"] == (0.0, 0.2, 0.4)
+
+    def test_model_size_does_not_override_profile(self):
+        config = _make_config("quality")
+        config["stt"]["model_cpu"] = "tiny"
+        tiny = get_profile_decode_options(config)
+        config["stt"]["model_cpu"] = "medium"
+        assert tiny == get_profile_decode_options(config)
+        assert tiny["beam_size"] == 5
+
 
 def _make_config(profile: str) -> dict[str, Any]:
     cfg: dict[str, Any] = copy.deepcopy(DEFAULT_CONFIG)
@@ -123,6 +190,149 @@ class TestGetRms:
         data = np.full(100, 1000, dtype=np.int16)
         assert get_rms(data) == pytest.approx(1000.0)
 
+    def test_scratch_buffer_matches(self):
+        rng = np.random.default_rng(3)
+        data = rng.integers(-32768, 32767, size=512, dtype=np.int16)
+        scratch = np.empty(1024, dtype=np.float32)
+        assert get_rms(data, scratch) == pytest.approx(get_rms(data), rel=1e-6)
+
+    def test_int16_kernel_matches_numpy_path(self, monkeypatch):
+        rng = np.random.default_rng(9)
+        data = rng.integers(-32768, 32767, size=1024, dtype=np.int16)
+        expected = get_rms(data)
+        monkeypatch.setattr(audio_processing, "_sum_squares_kernel", None)
+        assert get_rms(data) == pytest.approx(expected, rel=1e-6)
+        assert get_rms(data, np.empty(1024, np.float32)) == pytest.approx(
+            expected, rel=1e-6
+        )
+
+    def test_full_scale_int16_does_not_overflow(self):
+        data = np.full(1024, -32768, dtype=np.int16)
+        assert get_rms(data) == pytest.approx(32768.0)
+
+    def test_matches_float64_reference(self):
+        rng = np.random.default_rng(7)
+        data = rng.integers(-32768, 32767, size=1024, dtype=np.int16)
+        expected = np.sqrt(np.mean(data.astype(np.float64) ** 2))
+        assert get_rms(data) == pytest.approx(expected, rel=1e-5)
+
+
+def _reference_highpass(x: np.ndarray, sample_rate: int, cutoff_hz: float):
+    dt = 1.0 / sample_rate
+    rc = 1.0 / (2.0 * np.pi * cutoff_hz)
+    alpha = rc / (rc + dt)
+    y = np.zeros(len(x), dtype=np.float64)
+    prev_y = 0.0
+    prev_x = float(x[0])
+    for i, cur_x in enumerate(x.astype(np.float64)):
+        prev_y = alpha * (prev_y + cur_x - prev_x)
+        prev_x = cur_x
+        y[i] = prev_y
+    return y
+
+
+class TestFastPercentile:
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 100])
+    @pytest.mark.parametrize("q", [0, 70, 90, 100])
+    def test_matches_numpy_percentile(self, size, q):
+        rng = np.random.default_rng(size)
+        values = rng.uniform(0, 500, size=size).tolist()
+        assert fast_percentile(values, q) == pytest.approx(np.percentile(values, q))
+
+    def test_empty(self):
+        assert fast_percentile([], 90) == 0.0
+
+
+class _ScriptedStream:
+    def __init__(self, chunks):
+        self._chunks = list(chunks)
+
+    def read(self, *_args, **_kwargs):
+        if not self._chunks:
+            raise OSError("stream closed")
+        return self._chunks.pop(0)
+
+
+class TestCalibrateSilenceThreshold:
+    def _calibrate(self, stream):
+        return calibrate_silence_threshold(
+            stream,
+            sample_rate=16000,
+            chunk_size=1024,
+            calibration_seconds=0.25,
+            adaptive_multiplier=2.5,
+            fallback_threshold=100,
+            min_threshold=50,
+        )
+
+    def test_uses_ambient_level(self):
+        chunk = np.full(1024, 200, dtype=np.int16).tobytes()
+        assert self._calibrate(_ScriptedStream([chunk] * 3)) == 500
+
+    def test_read_failure_falls_back(self):
+        assert self._calibrate(_ScriptedStream([])) == 100
+
+
+class TestHighpassFilter:
+    def test_impulse_matches_recurrence(self):
+        x = np.zeros(256, dtype=np.float32)
+        x[10] = 1000.0
+        result = highpass_filter(x, sample_rate=16000, cutoff_hz=80.0)
+        assert result.dtype == np.float32
+        assert np.allclose(result, _reference_highpass(x, 16000, 80.0), atol=1e-3)
+
+    @pytest.mark.parametrize("disabled", [("_hp_kernel",), ("_hp_kernel", "lfilter")])
+    def test_fallback_paths_match(self, monkeypatch, disabled):
+        rng = np.random.default_rng(0)
+        x = rng.integers(-3000, 3000, size=512).astype(np.float32)
+        expected = _reference_highpass(x, 16000, 80.0)
+        for name in disabled:
+            monkeypatch.setattr(audio_processing, name, None)
+        result = highpass_filter(x, sample_rate=16000, cutoff_hz=80.0)
+        assert np.allclose(result, expected, atol=1e-2)
+
+    def test_butterworth_rejects_low_frequency(self):
+        if audio_processing.sosfilt is None:
+            pytest.skip("scipy not installed")
+        t = np.arange(16000) / 16000.0
+        hum = (1000.0 * np.sin(2 * np.pi * 20.0 * t)).astype(np.float32)
+        first = highpass_filter(hum, sample_rate=16000, cutoff_hz=80.0)
+        fourth = highpass_filter(hum, sample_rate=16000, cutoff_hz=80.0, order=4)
+        assert fourth.dtype == np.float32
+        assert get_rms(fourth[8000:]) < get_rms(first[8000:]) / 10
+
+    def test_inplace_matches_copy(self):
+        rng = np.random.default_rng(1)
+        x = rng.integers(-3000, 3000, size=512).astype(np.float32)
+        expected = highpass_filter(x, sample_rate=16000, cutoff_hz=80.0)
+        work = x.copy()
+        result = highpass_filter(work, sample_rate=16000, cutoff_hz=80.0, inplace=True)
+        assert np.allclose(result, expected, atol=1e-3)
+        if audio_processing._hp_kernel is not None:
+            assert result is work
+
+    def test_zero_cutoff_passthrough(self):
+        x = np.arange(16, dtype=np.int16)
+        result = highpass_filter(x, sample_rate=16000, cutoff_hz=0.0)
+        assert result.dtype == np.float32
+        assert np.array_equal(result, x.astype(np.float32))
+
+
+class TestInt16ToBytes:
+    def test_float32_is_clipped(self):
+        data = np.array([-40000.0, -1.5, 0.0, 1.5, 40000.0], dtype=np.float32)
+        result = np.frombuffer(int16_to_bytes(data), dtype=np.int16)
+        assert result.tolist() == [-32768, -1, 0, 1, 32767]
+
+    def test_float32_input_is_not_modified(self):
+        data = np.array([-40000.0, 40000.0], dtype=np.float32)
+        int16_to_bytes(data)
+        assert data.tolist() == [-40000.0, 40000.0]
+
+    def test_int16_passthrough(self):
+        data = np.array([-32768, 0, 32767], dtype=np.int16)
+        assert int16_to_bytes(data) == data.tobytes()
+
 
 class TestPreprocessAudioBytes:
     def test_returns_bytes(self):
@@ -150,7 +360,74 @@ class TestPreprocessAudioBytes:
         assert len(result) == len(raw)
 
 
+class TestStreamingPreprocessor:
+    @pytest.mark.parametrize("noise_suppression", [False, True])
+    @pytest.mark.parametrize("highpass_hz,order", [(0.0, 1), (80.0, 1), (80.0, 4)])
+    @pytest.mark.parametrize(
+        "disabled", [(), ("_hp_kernel",), ("_hp_kernel", "lfilter")]
+    )
+    def test_matches_batch_pipeline(
+        self, monkeypatch, noise_suppression, highpass_hz, order, disabled
+    ):
+        for name in disabled:
+            monkeypatch.setattr(audio_processing, name, None)
+        rng = np.random.default_rng(11)
+        data = (rng.normal(0, 1500, size=16000) + 300).astype(np.int16)
+        raw = data.tobytes()
+        expected = preprocess_audio_bytes(
+            audio_bytes=raw,
+            sample_rate=16000,
+            highpass_hz=highpass_hz,
+            normalize_target_dbfs=-20.0,
+            noise_suppression=noise_suppression,
+            highpass_order=order,
+        )
+
+        pp = StreamingPreprocessor(
+            sample_rate=16000,
+            highpass_hz=highpass_hz,
+            normalize_target_dbfs=-20.0,
+            noise_suppression=noise_suppression,
+            highpass_order=order,
+        )
+        for start in range(0, len(data), 1024):
+            pp.process_chunk(data[start : start + 1024])
+        result = pp.finish()
+
+        a = np.frombuffer(expected, dtype=np.int16).astype(np.int32)
+        b = np.frombuffer(result, dtype=np.int16).astype(np.int32)
+        assert len(a) == len(b)
+        assert np.max(np.abs(a - b)) <= 1
+
+    def test_empty_take(self):
+        pp = StreamingPreprocessor(16000, 80.0, -20.0, False)
+        assert pp.finish() == b""
+
+    def test_butterworth_design_shared_across_takes(self):
+        if audio_processing.sosfilt is None:
+            pytest.skip("scipy not installed")
+        first = StreamingPreprocessor(16000, 80.0, -20.0, False, highpass_order=4)
+        second = StreamingPreprocessor(16000, 80.0, -20.0, False, highpass_order=4)
+        # The filter is designed once per (order, cutoff, rate); later takes
+        # reuse the cached sections instead of calling butter() again.
+        assert second._sos is first._sos
+        assert second._sos_zi is first._sos_zi
+
+
 class TestLoadConfig:
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_read_json_parses_utf8_bytes(self, tmp_path, monkeypatch, use_orjson):
+        if not use_orjson:
+            monkeypatch.setattr(config_manager, "orjson", None)
+        elif config_manager.orjson is None:
+            pytest.skip("orjson not installed")
+        path = tmp_path / "config.json"
+        path.write_text('{"hotkey": "ctrl+ş", "stt": {"beam_size": 2}}', "utf-8")
+        assert config_manager.read_json(str(path)) == {
+            "hotkey": "ctrl+ş",
+            "stt": {"beam_size": 2},
+        }
+
     def test_returns_dict(self):
         cfg = load_config()
         assert isinstance(cfg, dict)
@@ -165,12 +442,112 @@ class TestLoadConfig:
         cfg = load_config()
         assert cfg["stt"]["device"] == "cpu"
 
+    def test_cached_result_is_a_private_copy(self):
+        first = load_config(force=True)
+        first["stt"]["device"] = "mutated"
+        second = load_config()
+        assert second["stt"]["device"] != "mutated"
+        second["stt"]["term_hints"].append("mutated")
+        assert "mutated" not in load_config()["stt"]["term_hints"]
+
+    def test_clone_default_is_independent(self):
+        clone = config_manager.clone_default()
+        assert clone == DEFAULT_CONFIG
+        clone["stt"]["term_hints"].append("new")
+        assert "new" not in DEFAULT_CONFIG["stt"]["term_hints"]
+
+    def test_cache_tracks_env_changes(self, monkeypatch):
+        monkeypatch.setenv("VOICE_PASTE_STT__DEVICE", "cpu")
+        assert load_config()["stt"]["device"] == "cpu"
+        monkeypatch.setenv("VOICE_PASTE_STT__DEVICE", "cuda")
+        assert load_config()["stt"]["device"] == "cuda"
+
+    def test_cache_reuses_parse(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config_manager, "CONFIG_PATH", str(tmp_path / "c.json"))
+        calls = []
+        original = config_manager._load_config_uncached
+        monkeypatch.setattr(
+            config_manager,
+            "_load_config_uncached",
+            lambda *args: calls.append(1) or original(*args),
+        )
+        load_config()
+        load_config()
+        assert len(calls) == 1
+        load_config(force=True)
+        assert len(calls) == 2
+
+    @pytest.mark.parametrize(
+        "raw,expected",
+        [
+            ("42", 42),
+            ("-3", -3),
+            ("0.5", 0.5),
+            ("1e3", 1000.0),
+            ("TRUE", True),
+            ('["a", "b"]', ["a", "b"]),
+            ('{"k": 1}', {"k": 1}),
+            ("null", None),
+            ("a, b,,c", ["a", "b", "c"]),
+            ("[broken", "[broken"),
+            ("large-v3", "large-v3"),
+            ("  ", ""),
+        ],
+    )
+    def test_coerce_env_value(self, raw, expected):
+        assert config_manager._coerce_env_value(raw) == expected
+
+    def test_migrate_bare_legacy_config(self):
+        cfg = config_manager._migrate_legacy(
+            {"whisper_model": "medium", "language": "en-US", "enable_multilingual": 1}
+        )
+        assert cfg["stt"]["model_cpu"] == "medium"
+        assert cfg["stt"]["model_gpu"] == "large-v3"
+        assert cfg["stt"]["primary_language"] == "en"
+        assert cfg["stt"]["language_mode"] == "multilingual_auto"
+        assert cfg["stt"]["beam_size"] == DEFAULT_CONFIG["stt"]["beam_size"]
+        assert cfg["audio"] == DEFAULT_CONFIG["audio"]
+        assert cfg["ui"] == DEFAULT_CONFIG["ui"]
+        assert cfg["language"] == "en"
+
+    def test_migrate_keeps_user_values(self):
+        cfg = config_manager._migrate_legacy(
+            {"audio": {"highpass_hz": 120}, "ui": {"theme": {"mode": "dark"}}}
+        )
+        assert cfg["audio"]["highpass_hz"] == 120
+        assert cfg["audio"]["min_silence_threshold"] == 200
+        assert cfg["ui"]["theme"] == {"mode": "dark", "accent": "#9a6b2f"}
+
+    def test_legacy_config_has_full_default_tree(self, tmp_path, monkeypatch):
+        config_path = tmp_path / "legacy.json"
+        config_path.write_text(
+            json.dumps(
+                {
+                    "language": "en-US",
+                    "whisper_model": "medium",
+                    "enable_multilingual": True,
+                    "stt": {},
+                    "ui": {"window": {"width": 500}},
+                }
+            ),
+            encoding="utf-8",
+        )
+        monkeypatch.setattr(config_manager, "CONFIG_PATH", str(config_path))
+        cfg = load_config()
+        merged = config_manager.clone_default()
+        _deep_merge_inplace(merged, copy.deepcopy(cfg))
+        assert cfg == merged
+        assert cfg["language"] == "en"
+        assert cfg["ui"]["window"]["height"] == 620
+
 
 class TestBackendHandleRequest:
     @pytest.fixture
     def backend_module(self, monkeypatch):
         monkeypatch.setitem(
-            sys.modules, "keyboard", types.SimpleNamespace(send=lambda *_: None)
+            sys.modules,
+            "keyboard",
+            types.SimpleNamespace(send=lambda *_: None, is_pressed=lambda *_: False),
         )
         monkeypatch.setitem(
             sys.modules,
@@ -191,11 +568,17 @@ class TestBackendHandleRequest:
         default_cfg = copy.deepcopy(DEFAULT_CONFIG)
 
         class DummySTTService:
-            def __init__(self, *_args, **_kwargs):
+            def __init__(self, config, *_args, **_kwargs):
                 self.reloaded_with = None
+                self.loaded_model = (config["stt"]["model_cpu"], "cpu")
+                self.warm_ups = 0
 
             def reload(self, cfg):
                 self.reloaded_with = cfg
+                self.loaded_model = (cfg["stt"]["model_cpu"], "cpu")
+
+            def warm_up(self):
+                self.warm_ups += 1
 
         monkeypatch.setattr(backend_service, "STTService", DummySTTService)
         monkeypatch.setattr(
@@ -243,6 +626,69 @@ class TestBackendHandleRequest:
         assert saved_cfg["value"]["stt"]["device"] == "cpu"
         assert saved_cfg["value"]["stt"]["backend"] == DEFAULT_CONFIG["stt"]["backend"]
 
+    def test_backend_merge_shares_untouched_subtrees(self, backend_module):
+        base = {"stt": {"device": "auto"}, "ui": {"window": {"width": 420}}}
+        merged = backend_module._deep_merge(base, {"stt": {"device": "cpu"}})
+        assert merged["stt"] == {"device": "cpu"}
+        assert base["stt"] == {"device": "auto"}
+        assert merged["ui"] is base["ui"]
+        assert backend_module._deep_merge(base, {}) is base
+
+    def test_backend_merge_returns_base_for_unchanged_values(self, backend_module):
+        base = {"stt": {"device": "cpu", "beam_size": 5}, "enabled": 1}
+        assert backend_module._deep_merge(base, {"stt": {"device": "cpu"}}) is base
+        merged = backend_module._deep_merge(base, {"enabled": True, "stt": {}})
+        assert merged is not base
+        assert merged["enabled"] is True
+        assert merged["stt"] is base["stt"]
+
+    def test_update_config_warms_up_only_on_model_switch(
+        self, backend_module, monkeypatch
+    ):
+        service = backend_module.BackendService()
+        saved = {}
+        monkeypatch.setattr(
+            backend_module, "save_config", lambda cfg: saved.update(value=cfg)
+        )
+        monkeypatch.setattr(backend_module, "load_config", lambda: saved["value"])
+        monkeypatch.setattr(
+            backend_module.threading,
+            "Thread",
+            lambda target, args=(), daemon=False: types.SimpleNamespace(
+                start=lambda: target(*args)
+            ),
+        )
+
+        service.update_config({"auto_enter": not service.config["auto_enter"]})
+        assert service.stt.warm_ups == 0
+        service.update_config({"stt": {"model_cpu": "tiny"}})
+        assert service.stt.warm_ups == 1
+
+    def test_update_config_noop_patch_skips_save(self, backend_module, monkeypatch):
+        service = backend_module.BackendService()
+        saves = []
+        monkeypatch.setattr(backend_module, "save_config", saves.append)
+        current = service.config["stt"]["device"]
+
+        result = service.update_config({"stt": {"device": current}})
+
+        assert saves == []
+        assert result is service.config
+
+    def test_update_config_refreshes_audio_cfg(self, backend_module, monkeypatch):
+        service = backend_module.BackendService()
+        saved_cfg = {}
+
+        monkeypatch.setattr(
+            backend_module, "save_config", lambda cfg: saved_cfg.update(value=cfg)
+        )
+        monkeypatch.setattr(backend_module, "load_config", lambda: saved_cfg["value"])
+
+        service.update_config({"audio": {"highpass_hz": 120, "noise_suppression": 1}})
+
+        assert service.audio_cfg.highpass_hz == 120.0
+        assert service.audio_cfg.noise_suppression is True
+
     def test_shutdown_sets_running_false(self, backend_module):
         service = backend_module.BackendService()
         service._handle_request({"method": "shutdown", "id": 4})
@@ -260,6 +706,30 @@ class TestBackendHandleRequest:
         assert "error" in responses[0]
         assert responses[0]["error"]["code"] == "request_failed"
 
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_run_parses_binary_stdin(self, backend_module, monkeypatch, use_orjson):
+        if not use_orjson:
+            monkeypatch.setattr(backend_module, "orjson", None)
+        elif backend_module.orjson is None:
+            pytest.skip("orjson not installed")
+        service = backend_module.BackendService()
+        seen = []
+        monkeypatch.setattr(service, "_handle_request", seen.append)
+        monkeypatch.setattr(
+            backend_module.threading,
+            "Thread",
+            lambda target, args=(), daemon=False: types.SimpleNamespace(
+                start=lambda: target(*args)
+            ),
+        )
+        raw = '{"id": 1, "method": "ping", "params": {"s": "çalış"}}\n\n'
+        stdin = io.TextIOWrapper(io.BytesIO(raw.encode("utf-8")), encoding="utf-8")
+        monkeypatch.setattr(sys, "stdin", stdin)
+        service.emit = lambda event, data: None
+        service.run()
+
+        assert seen == [{"id": 1, "method": "ping", "params": {"s": "çalış"}}]
+
     def test_invalid_json_emits_runtime_error(self, backend_module, monkeypatch):
         service = backend_module.BackendService()
         events = []
@@ -272,6 +742,240 @@ class TestBackendHandleRequest:
         assert events[-1]["event"] == "runtime_error"
         assert "Invalid JSON" in events[-1]["data"]["message"]
 
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_write_emits_json_line(self, backend_module, monkeypatch, use_orjson):
+        if not use_orjson:
+            monkeypatch.setattr(backend_module, "orjson", None)
+        elif backend_module.orjson is None:
+            pytest.skip("orjson not installed")
+        raw = io.BytesIO()
+        out = io.TextIOWrapper(raw, encoding="utf-8")
+        monkeypatch.setattr(sys, "stdout", out)
+
+        service = backend_module.BackendService()
+        service.emit("status_changed", {"status": "çalışıyor"})
+        out.flush()
+
+        lines = raw.getvalue().decode("utf-8").splitlines()
+        payload = json.loads(lines[-1])
+        assert payload["event"] == "status_changed"
+        assert payload["data"] == {"status": "çalışıyor"}
+
+    def test_record_audio_uses_calibrated_threshold(self, backend_module, monkeypatch):
+        chunk = backend_module.CHUNK
+        quiet = np.full(chunk, 100, dtype=np.int16).tobytes()
+        speech = np.full(chunk, 300, dtype=np.int16).tobytes()
+        silence = np.zeros(chunk, dtype=np.int16).tobytes()
+        script = [quiet] * 3 + [speech] * 2
+
+        class FakeStream:
+            def read(self, *_args, **_kwargs):
+                return script.pop(0) if script else silence
+
+            def start_stream(self):
+                pass
+
+            def stop_stream(self):
+                pass
+
+            def close(self):
+                pass
+
+        fake_pa = types.SimpleNamespace(
+            open=lambda **_kw: FakeStream(), terminate=lambda: None
+        )
+        monkeypatch.setattr(backend_module.pyaudio, "PyAudio", lambda: fake_pa)
+
+        service = backend_module.BackendService()
+        audio_bytes, _ = service._record_audio(service.config)
+
+        # Ambient 100 * 2.5 -> threshold 250, so the 300-level chunks count as
+        # speech and trailing silence ends the take.
+        max_silence = int(service.config["silence_duration"] * 16000 / chunk)
+        assert len(audio_bytes) == (5 + max_silence) * chunk * 2
+
+    def test_record_audio_settles_threshold_when_speech_starts_early(
+        self, backend_module, monkeypatch
+    ):
+        levels = [40] + [3000] * 2 + [350] * 8
+
+        class FakeStream:
+            def read(self, n, **_kwargs):
+                level = levels.pop(0) if levels else 0
+                return np.full(n, level, dtype=np.int16).tobytes()
+
+            def start_stream(self):
+                pass
+
+            def stop_stream(self):
+                pass
+
+            def close(self):
+                pass
+
+        fake_pa = types.SimpleNamespace(
+            open=lambda **_kw: FakeStream(), terminate=lambda: None
+        )
+        monkeypatch.setattr(backend_module.pyaudio, "PyAudio", lambda: fake_pa)
+
+        service = backend_module.BackendService()
+        cfg = {**service.config, "silence_duration": 0.2}
+        audio_bytes, _ = service._record_audio(cfg)
+
+        # Speech on the second read ends calibration early; the threshold
+        # still settles at max(200, 40 * 2.5) = 200, so every 350-level read
+        # is kept instead of ending the take as 0.2 s of silence.
+        samples = np.frombuffer(audio_bytes, dtype=np.int16)
+        assert not levels
+        assert (samples == 0).sum() >= int(0.2 * 16000 / backend_module.CHUNK) * 1024
+
+    def test_record_audio_adapts_read_size_to_speech(self, backend_module, monkeypatch):
+        # Speech for four CHUNKs, so it ends halfway through the first
+        # SPEECH_CHUNK read.
+        signal = np.zeros(40 * 1024, dtype=np.int16)
+        signal[: 4 * 1024] = 3000
+        sizes = []
+
+        class FakeStream:
+            def read(self, n, **_kwargs):
+                start = sum(sizes)
+                sizes.append(n)
+                return signal[start : start + n].tobytes()
+
+            def start_stream(self):
+                pass
+
+            def stop_stream(self):
+                pass
+
+            def close(self):
+                pass
+
+        fake_pa = types.SimpleNamespace(
+            open=lambda **_kw: FakeStream(), terminate=lambda: None
+        )
+        monkeypatch.setattr(backend_module.pyaudio, "PyAudio", lambda: fake_pa)
+
+        service = backend_module.BackendService()
+        cfg = {**service.config, "silence_duration": 0.256}
+        audio_bytes, _ = service._record_audio(cfg)
+
+        # Three speech reads at CHUNK, then SPEECH_CHUNK. Its quiet second
+        # half already counts as silence and drops the read size to
+        # TAIL_CHUNK, so the take stops at exactly 0.256 s (4 * CHUNK) of it.
+        assert sizes == [1024, 1024, 1024, 2048] + [512] * 6
+        assert len(audio_bytes) == sum(sizes) * 2
+
+    def test_record_audio_streams_into_preprocessor(self, backend_module, monkeypatch):
+        chunk = backend_module.CHUNK
+        rng = np.random.default_rng(11)
+        script = [
+            rng.integers(-5000, 5000, chunk, dtype=np.int16).tobytes() for _ in range(6)
+        ]
+        silence = np.zeros(chunk, dtype=np.int16).tobytes()
+        read = []
+
+        class FakeStream:
+            def read(self, *_args, **_kwargs):
+                data = script.pop(0) if script else silence
+                read.append(data)
+                return data
+
+            def start_stream(self):
+                pass
+
+            def stop_stream(self):
+                pass
+
+            def close(self):
+                pass
+
+        fake_pa = types.SimpleNamespace(
+            open=lambda **_kw: FakeStream(), terminate=lambda: None
+        )
+        monkeypatch.setattr(backend_module.pyaudio, "PyAudio", lambda: fake_pa)
+        params = dict(
+            sample_rate=16000,
+            highpass_hz=80.0,
+            normalize_target_dbfs=-20.0,
+            noise_suppression=False,
+        )
+        preprocessor = StreamingPreprocessor(**params)
+
+        service = backend_module.BackendService()
+        audio_bytes, _ = service._record_audio(service.config, preprocessor)
+
+        assert audio_bytes == b""
+        expected = preprocess_audio_bytes(b"".join(read), **params)
+        assert preprocessor.finish() == expected
+
+    def test_record_audio_reuses_input_stream(self, backend_module, monkeypatch):
+        silence = np.zeros(backend_module.CHUNK, dtype=np.int16).tobytes()
+        opened = []
+
+        class FakeStream:
+            def __init__(self):
+                self.starts = 0
+                self.closed = False
+
+            def read(self, *_args, **_kwargs):
+                return silence
+
+            def start_stream(self):
+                self.starts += 1
+
+            def stop_stream(self):
+                pass
+
+            def close(self):
+                self.closed = True
+
+        def open_stream(**kwargs):
+            assert kwargs["start"] is False
+            opened.append(FakeStream())
+            return opened[-1]
+
+        fake_pa = types.SimpleNamespace(open=open_stream, terminate=lambda: None)
+        monkeypatch.setattr(backend_module.pyaudio, "PyAudio", lambda: fake_pa)
+
+        service = backend_module.BackendService()
+        cfg = {**service.config, "max_record_seconds": 0.2}
+        service._record_audio(cfg)
+        service._record_audio(cfg)
+
+        assert len(opened) == 1
+        assert opened[0].starts == 2
+        service._close_input_stream()
+        assert opened[0].closed
+
+    def test_paste_skips_delay_when_modifiers_released(
+        self, backend_module, monkeypatch
+    ):
+        sleeps = []
+        monkeypatch.setattr(backend_module.time, "sleep", sleeps.append)
+        service = backend_module.BackendService()
+        ok, message = service._paste_text("merhaba", {"paste_delay": 0.5})
+
+        assert ok and message == ""
+        assert sleeps == []
+
+    def test_paste_falls_back_to_pyautogui_when_keyboard_fails(
+        self, backend_module, monkeypatch
+    ):
+        def broken_send(_keys):
+            raise OSError("no hook")
+
+        hotkeys = []
+        monkeypatch.setattr(backend_module.keyboard, "send", broken_send)
+        monkeypatch.setattr(
+            sys.modules["pyautogui"], "hotkey", lambda *keys: hotkeys.append(keys)
+        )
+        service = backend_module.BackendService()
+        ok, message = service._paste_text("merhaba", {"paste_delay": 0})
+
+        assert ok and "PyAutoGUI fallback used" in message
+        assert hotkeys == [("ctrl", "v")]
+
 
 class TestSaveConfig:
     def test_save_and_reload_roundtrip(self, tmp_path, monkeypatch):
@@ -288,6 +992,103 @@ class TestSaveConfig:
 
         assert loaded == cfg
 
+    def test_unchanged_save_skips_write(self, tmp_path, monkeypatch):
+        config_path = tmp_path / "cfg.json"
+        monkeypatch.setattr(config_manager, "CONFIG_PATH", str(config_path))
+        writes = []
+        real_replace = os.replace
+
+        def tracking_replace(src, dst):
+            writes.append(dst)
+            real_replace(src, dst)
+
+        monkeypatch.setattr(config_manager.os, "replace", tracking_replace)
+        cfg = copy.deepcopy(DEFAULT_CONFIG)
+        config_manager.save_config(cfg)
+        config_manager.save_config(copy.deepcopy(cfg))
+        assert len(writes) == 1
+
+        # Mutating the caller's dict after a save is still picked up.
+        cfg["language"] = "en"
+        config_manager.save_config(cfg)
+        assert len(writes) == 2
+
+        # An external edit means the file no longer matches what was written.
+        config_path.write_text("{}", encoding="utf-8")
+        config_manager.save_config(cfg)
+        assert len(writes) == 3
+        assert json.loads(config_path.read_text(encoding="utf-8")) == cfg
+
+    def test_save_retries_replace_on_permission_error(self, tmp_path, monkeypatch):
+        config_path = tmp_path / "cfg.json"
+        config_path.write_text("{}", encoding="utf-8")
+        monkeypatch.setattr(config_manager, "CONFIG_PATH", str(config_path))
+        monkeypatch.setattr(config_manager, "_REPLACE_RETRY_SEC", 0.0)
+        real_replace = os.replace
+        attempts = []
+
+        def locked_once(src, dst):
+            attempts.append(dst)
+            if len(attempts) == 1:
+                raise PermissionError("config.json is open elsewhere")
+            real_replace(src, dst)
+
+        monkeypatch.setattr(config_manager.os, "replace", locked_once)
+        cfg = copy.deepcopy(DEFAULT_CONFIG)
+        config_manager.save_config(cfg)
+
+        assert len(attempts) == 2
+        assert json.loads(config_path.read_text(encoding="utf-8")) == cfg
+        assert os.listdir(tmp_path) == ["cfg.json"]
+
+    def test_failed_save_keeps_old_file(self, tmp_path, monkeypatch):
+        config_path = tmp_path / "cfg.json"
+        config_path.write_text('{"language": "tr"}', encoding="utf-8")
+        monkeypatch.setattr(config_manager, "CONFIG_PATH", str(config_path))
+        monkeypatch.setattr(config_manager, "_REPLACE_RETRY_SEC", 0.0)
+
+        def always_locked(src, dst):
+            raise PermissionError("config.json is open elsewhere")
+
+        monkeypatch.setattr(config_manager.os, "replace", always_locked)
+        with pytest.raises(PermissionError):
+            config_manager.save_config(copy.deepcopy(DEFAULT_CONFIG))
+
+        # The old file is untouched and no temp file is left beside it.
+        assert config_path.read_text(encoding="utf-8") == '{"language": "tr"}'
+        assert os.listdir(tmp_path) == ["cfg.json"]
+
+    def test_save_invalidates_cache_even_with_same_stat(self, tmp_path, monkeypatch):
+        config_path = tmp_path / "cfg.json"
+        monkeypatch.setattr(config_manager, "CONFIG_PATH", str(config_path))
+        cfg = copy.deepcopy(DEFAULT_CONFIG)
+        cfg["stt"]["device"] = "cpu"
+        config_manager.save_config(cfg)
+        assert config_manager.load_config()["stt"]["device"] == "cpu"
+
+        # Same-length rewrite with the old mtime restored, as a coarse
+        # filesystem clock would report it.
+        st = os.stat(config_path)
+        cfg["stt"]["device"] = "gpu"
+        config_manager.save_config(cfg)
+        os.utime(config_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert config_manager.load_config()["stt"]["device"] == "gpu"
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_load_parses_utf8_file(self, tmp_path, monkeypatch, use_orjson):
+        if not use_orjson:
+            monkeypatch.setattr(config_manager, "orjson", None)
+        elif config_manager.orjson is None:
+            pytest.skip("orjson not installed")
+        config_path = tmp_path / "cfg.json"
+        config_path.write_text(
+            json.dumps({"stt": {"term_hints": ["Çalışma"]}}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        monkeypatch.setattr(config_manager, "CONFIG_PATH", str(config_path))
+        loaded = config_manager.load_config(force=True)
+        assert loaded["stt"]["term_hints"] == ["çalışma"]
+
 
 class TestSuppressNoise:
     def test_silence_unchanged(self):
@@ -299,3 +1100,9 @@ class TestSuppressNoise:
         data = np.full(1600, 5000.0, dtype=np.float32)
         result = suppress_noise(data.copy(), sample_rate=16000)
         assert np.allclose(result, data, atol=1e-6)
+
+    def test_gates_samples_below_threshold(self):
+        data = np.zeros(4000, dtype=np.float32)
+        data[-3:] = [-100.0, 30.0, 100.0]
+        result = suppress_noise(data.copy(), sample_rate=16000)
+        assert result[-3:].tolist() == [-100.0, 0.0, 100.0]
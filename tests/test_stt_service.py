@@ -1,9 +1,14 @@
 """Tests for the stt_service module."""
 
+import json
+import math
 import sys
+import threading
 import types
+from typing import Any
 from unittest.mock import MagicMock
 
+import numpy as np
 import pytest
 
 
@@ -19,7 +24,16 @@ sys.modules.setdefault(
     "faster_whisper", _make_module("faster_whisper", WhisperModel=MagicMock())
 )
 
-from stt_service import _fragment_ratio
+import stt_service
+from stt_service import (
+    _analyze_fragments,
+    _confidence_score,
+    _decode_quality_score,
+    _fragment_ratio,
+    _looks_fragmented,
+    _pcm16_to_whisper_audio,
+    _segment_stats,
+)
 
 
 class TestFragmentRatio:
@@ -71,3 +85,485 @@ class TestFragmentRatio:
         # "I" (1), "AM" (2), "SHOUTING" (8)
         # 3 tokens, 2 short ("I", "AM") -> ratio = 2 / 3 = 0.666...
         assert _fragment_ratio("I AM SHOUTING") == pytest.approx(2 / 3)
+
+
+class TestConfidenceScore:
+    @pytest.mark.parametrize(
+        "avg_logprob,no_speech_prob",
+        [
+            (-0.3, 0.1),
+            (0.5, 0.0),
+            (-5.0, 1.5),
+            (-1.0, -0.2),
+            (0.0, 1.0),
+            (-0.3, math.nan),
+            (math.nan, 0.2),
+        ],
+    )
+    def test_matches_clamped_formula(self, avg_logprob, no_speech_prob):
+        expected = 0.6 * math.exp(min(0.0, avg_logprob)) + 0.4 * (
+            1.0 - max(0.0, min(1.0, no_speech_prob))
+        )
+        score = _confidence_score(avg_logprob, no_speech_prob)
+        assert score == pytest.approx(expected)
+        assert 0.0 <= score <= 1.0
+
+
+class TestAnalyzeFragments:
+    @pytest.mark.parametrize(
+        "text,expected",
+        [
+            ("", (True, 1.0)),
+            ("!!", (False, 1.0)),
+            ("a b c", (False, 1.0)),
+            ("a b c d", (True, 1.0)),
+            ("bu ip le mantasyon plani uzun suren detayli calisma", (True, 1 / 3)),
+            ("projenin plani hazir durumda", (False, 0.0)),
+            ("İp le mantasyon plani uzun suren detayli calisma", (True, 1 / 3)),
+        ],
+    )
+    def test_flags_and_ratio(self, text, expected):
+        fragmented, ratio = _analyze_fragments(text)
+        assert fragmented is expected[0]
+        assert ratio == pytest.approx(expected[1])
+        assert _looks_fragmented(text) is expected[0]
+        assert _fragment_ratio(text) == pytest.approx(expected[1])
+
+    @pytest.mark.parametrize(
+        "text,ratio",
+        [
+            ("naïve café", 2 / 3),
+            ("snake_case_id ok", 0.5),
+            ("日本語 テキスト", 1.0),
+        ],
+    )
+    def test_only_latin_and_turkish_letters_form_tokens(self, text, ratio):
+        # Letters outside the Turkish/ASCII set split tokens rather than
+        # extending them; a generic \w+ scanner would change these ratios.
+        assert _fragment_ratio(text) == pytest.approx(ratio)
+
+
+class TestDecodeQualityScore:
+    def test_precomputed_stats_match_fresh_analysis(self):
+        text = "a b c d projenin"
+        fragmented, ratio = _analyze_fragments(text)
+        fresh = _decode_quality_score({"text": text, "confidence": 0.8})
+        cached = _decode_quality_score(
+            {
+                "text": text,
+                "confidence": 0.8,
+                "fragmented": fragmented,
+                "fragment_ratio": ratio,
+            }
+        )
+        assert cached == fresh == pytest.approx(0.8 - 0.20 - 0.10 * 0.8)
+
+
+class TestPcm16ToWhisperAudio:
+    def test_mono_scaled_to_unit_range(self):
+        pcm = np.array([0, 16384, -32768, 32767], dtype=np.int16).tobytes()
+        audio = _pcm16_to_whisper_audio(pcm, 16000, 1)
+        assert audio.dtype == np.float32
+        assert audio.tolist() == pytest.approx([0.0, 0.5, -1.0, 32767 / 32768])
+
+    def test_stereo_downmixed(self):
+        pcm = np.array([100, 300, -200, 200], dtype=np.int16).tobytes()
+        audio = _pcm16_to_whisper_audio(pcm, 16000, 2)
+        assert audio.tolist() == pytest.approx([200 / 32768, 0.0])
+
+    def test_resampled_to_16k(self):
+        pcm = np.zeros(8000, dtype=np.int16).tobytes()
+        audio = _pcm16_to_whisper_audio(pcm, 8000, 1)
+        assert audio.shape == (16000,)
+
+    def test_trailing_odd_byte_dropped(self):
+        audio = _pcm16_to_whisper_audio(b"\x00\x01\x02", 16000, 1)
+        assert audio.shape == (1,)
+
+
+class TestSegmentStats:
+    def test_skips_missing_values(self):
+        segs = [
+            types.SimpleNamespace(text=" a ", avg_logprob=-0.5, no_speech_prob=None),
+            types.SimpleNamespace(text="b", avg_logprob=None, no_speech_prob=0.2),
+            types.SimpleNamespace(text=" c", avg_logprob=-1.5, no_speech_prob=0.4),
+        ]
+        text, avg_logprob, no_speech_prob = _segment_stats(iter(segs))
+        assert text == "a b c"
+        assert avg_logprob == pytest.approx(-1.0)
+        assert no_speech_prob == pytest.approx(0.3)
+
+    def test_defaults_when_no_segments(self):
+        assert _segment_stats([]) == ("", -2.0, 0.35)
+
+
+class TestTranscribeAudioBytes:
+    @staticmethod
+    def _service(monkeypatch, text, seen):
+        class FakeModel:
+            def transcribe(self, audio, **kwargs):
+                seen.append(audio)
+                seg = types.SimpleNamespace(
+                    text=text, avg_logprob=-0.1, no_speech_prob=0.0
+                )
+                return iter([seg]), None
+
+        monkeypatch.setattr(stt_service, "WhisperModel", lambda *a, **k: FakeModel())
+        from config_manager import clone_default
+
+        config = clone_default()
+        config["stt"]["device"] = "cpu"
+        config["telemetry"]["enabled"] = False
+        service = stt_service.STTService(config, sample_rate=16000, channels=1)
+        return service, config
+
+    def test_model_receives_float_array(self, monkeypatch):
+        seen = []
+        service, config = self._service(monkeypatch, " merhaba dunya nasilsin ", seen)
+        pcm = (np.ones(1600, dtype=np.int16) * 1000).tobytes()
+        result = service.transcribe_audio_bytes(pcm, config)
+
+        assert result.text == "merhaba dunya nasilsin"
+        assert isinstance(seen[0], np.ndarray)
+        assert seen[0].dtype == np.float32
+        assert seen[0].shape == (1600,)
+
+    def test_reload_waits_for_decode_in_progress(self, monkeypatch):
+        service, config = self._service(monkeypatch, "merhaba dunya nasilsin", [])
+        acquired = []
+        transcribe = service._model.transcribe
+
+        def probing_transcribe(audio, **kw):
+            # What a reload from the GUI's loader thread would try mid-decode.
+            probe = threading.Thread(
+                target=lambda: acquired.append(service._lock.acquire(blocking=False))
+            )
+            probe.start()
+            probe.join()
+            return transcribe(audio, **kw)
+
+        service._model.transcribe = probing_transcribe
+        service.transcribe_audio_bytes(np.zeros(1600, np.int16).tobytes(), config)
+        assert acquired and not any(acquired)
+
+    def test_condition_on_previous_text_follows_config(self, monkeypatch):
+        service, config = self._service(monkeypatch, "merhaba dunya nasilsin", [])
+        calls = []
+        transcribe = service._model.transcribe
+        service._model.transcribe = lambda audio, **kw: (
+            calls.append(kw) or transcribe(audio, **kw)
+        )
+        audio = np.zeros(1600, np.int16).tobytes()
+        service.transcribe_audio_bytes(audio, config)
+        assert calls[0]["condition_on_previous_text"] is True
+        assert calls[0]["vad_filter"] is True
+
+        config["stt"]["condition_on_previous_text"] = False
+        service.transcribe_audio_bytes(audio, config)
+        assert calls[-1]["condition_on_previous_text"] is False
+
+    def test_retry_reuses_decoded_array(self, monkeypatch):
+        seen = []
+        # All-short tokens look fragmented, which forces the retry pass.
+        service, config = self._service(monkeypatch, "a b c d e", seen)
+        service.transcribe_audio_bytes(np.zeros(1600, np.int16).tobytes(), config)
+        assert len(seen) == 2
+        assert seen[0] is seen[1]
+
+    def test_warm_up_runs_a_full_decode_on_silence(self, monkeypatch):
+        service, _ = self._service(monkeypatch, "merhaba", [])
+        calls = []
+        service._model.transcribe = lambda audio, **kw: (
+            calls.append((audio, kw)) or (iter([]), None)
+        )
+        service.warm_up()
+        audio, kwargs = calls[0]
+        assert audio.dtype == np.float32 and not audio.any()
+        assert kwargs["vad_filter"] is False
+
+    def test_warm_up_failure_is_not_raised(self, monkeypatch):
+        service, _ = self._service(monkeypatch, "merhaba", [])
+
+        def fail(*_a, **_k):
+            raise RuntimeError("no device")
+
+        service._model.transcribe = fail
+        service.warm_up()
+
+    def test_repeated_audio_is_decoded_again(self, monkeypatch):
+        seen = []
+        service, config = self._service(monkeypatch, "merhaba dunya nasilsin", seen)
+        pcm = (np.ones(1600, dtype=np.int16) * 1000).tobytes()
+        service.transcribe_audio_bytes(pcm, config)
+        service.transcribe_audio_bytes(pcm, config)
+        # No result cache: every take goes through the model.
+        assert len(seen) == 2
+
+
+class TestResolveDevice:
+    def test_cuda_probe_runs_once(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            stt_service, "_probe_cuda", lambda: calls.append(1) or False
+        )
+        service = stt_service.STTService.__new__(stt_service.STTService)
+        service._cuda_disabled = False
+        service._cuda_available = None
+        assert service._resolve_device({"device": "auto"}) == "cpu"
+        assert service._resolve_device({"device": "auto"}) == "cpu"
+        assert service._resolve_device({"device": "cuda"}) == "cuda"
+        assert len(calls) == 1
+
+
+class TestReload:
+    def test_model_loaded_once_per_signature(self, monkeypatch):
+        from config_manager import clone_default
+
+        loads = []
+        monkeypatch.setattr(
+            stt_service,
+            "_whisper_model_class",
+            lambda: lambda name, device, compute_type, **kw: (
+                loads.append(name) or object()
+            ),
+        )
+        config = clone_default()
+        config["stt"]["device"] = "cpu"
+        service = stt_service.STTService(config, sample_rate=16000, channels=1)
+        model = service._model
+
+        config["stt"]["beam_size"] = 1
+        service.reload(config)
+        assert service._model is model
+
+        config["stt"]["model_cpu"] = "tiny"
+        service.reload(config)
+        assert loads == [clone_default()["stt"]["model_cpu"], "tiny"]
+
+    def test_switching_back_reuses_pooled_model(self, monkeypatch):
+        from config_manager import clone_default
+
+        loads = []
+        monkeypatch.setattr(
+            stt_service,
+            "_whisper_model_class",
+            lambda: lambda name, **kw: loads.append(name) or object(),
+        )
+        config = clone_default()
+        config["stt"]["device"] = "cpu"
+        config["stt"]["model_cpu"] = "small"
+        config["stt"]["model_pool_size"] = 2
+        service = stt_service.STTService(config, sample_rate=16000, channels=1)
+        small = service._model
+
+        config["stt"]["model_cpu"] = "tiny"
+        service.reload(config)
+        config["stt"]["model_cpu"] = "small"
+        service.reload(config)
+        assert service._model is small
+        assert service.loaded_model == ("small", "cpu")
+        assert loads == ["small", "tiny"]
+
+        # A third model evicts the least recently used one (tiny).
+        config["stt"]["model_cpu"] = "base"
+        service.reload(config)
+        config["stt"]["model_cpu"] = "tiny"
+        service.reload(config)
+        assert loads == ["small", "tiny", "base", "tiny"]
+        assert len(service._model_pool) == 2
+
+    def test_default_pool_keeps_only_the_active_model(self, monkeypatch):
+        from config_manager import clone_default
+
+        loads = []
+        monkeypatch.setattr(
+            stt_service,
+            "_whisper_model_class",
+            lambda: lambda name, **kw: loads.append(name) or object(),
+        )
+        config = clone_default()
+        config["stt"]["device"] = "cpu"
+        config["stt"]["model_cpu"] = "small"
+        service = stt_service.STTService(config, sample_rate=16000, channels=1)
+
+        config["stt"]["model_cpu"] = "tiny"
+        service.reload(config)
+        assert list(service._model_pool.values()) == [service._model]
+        config["stt"]["model_cpu"] = "small"
+        service.reload(config)
+        assert loads == ["small", "tiny", "small"]
+
+    def test_cuda_defaults_to_int8_float16(self, monkeypatch):
+        from config_manager import clone_default
+
+        monkeypatch.setattr(
+            stt_service, "_whisper_model_class", lambda: lambda *a, **kw: object()
+        )
+        config = clone_default()
+        config["stt"]["device"] = "cuda"
+        service = stt_service.STTService(config, sample_rate=16000, channels=1)
+        assert service._loaded_signature == (
+            config["stt"]["model_gpu"],
+            "cuda",
+            "int8_float16",
+            0,
+        )
+
+    def test_loaded_model_reports_cpu_fallback(self, monkeypatch):
+        from config_manager import clone_default
+
+        def build(name, device, **kw):
+            if device == "cuda":
+                raise RuntimeError("no CUDA driver")
+            return object()
+
+        monkeypatch.setattr(stt_service, "_whisper_model_class", lambda: build)
+        config = clone_default()
+        config["stt"]["device"] = "cuda"
+        service = stt_service.STTService(config, sample_rate=16000, channels=1)
+        assert service.loaded_model == (config["stt"]["model_cpu"], "cpu")
+
+    def test_cpu_threads_passed_and_part_of_signature(self, monkeypatch):
+        from config_manager import clone_default
+
+        loads = []
+        monkeypatch.setattr(
+            stt_service,
+            "_whisper_model_class",
+            lambda: lambda name, **kw: loads.append(kw) or object(),
+        )
+        monkeypatch.setattr(stt_service.os, "cpu_count", lambda: 16)
+        config = clone_default()
+        config["stt"]["device"] = "cpu"
+        service = stt_service.STTService(config, sample_rate=16000, channels=1)
+        assert loads[-1]["cpu_threads"] == 8
+
+        config["stt"]["cpu_threads"] = 3
+        service.reload(config)
+        assert loads[-1]["cpu_threads"] == 3
+        assert len(loads) == 2
+
+    def test_openvino_backend_loads_its_own_model(self, monkeypatch):
+        from config_manager import clone_default
+
+        ov_loads = []
+        monkeypatch.setattr(
+            stt_service,
+            "_openvino_model_class",
+            lambda: lambda name, cpu_threads: ov_loads.append(name) or object(),
+        )
+        monkeypatch.setattr(
+            stt_service, "_whisper_model_class", lambda: lambda *a, **kw: object()
+        )
+        config = clone_default()
+        config["stt"]["device"] = "cpu"
+        config["stt"]["model_cpu"] = "small"
+        service = stt_service.STTService(config, sample_rate=16000, channels=1)
+        faster_whisper_model = service._model
+
+        config["stt"]["backend"] = "openvino"
+        service.reload(config)
+        assert ov_loads == ["small"]
+        assert service.loaded_model == ("small", "openvino")
+        assert service._model is not faster_whisper_model
+
+        # Only the active model stays resident by default, so switching back
+        # builds a fresh faster-whisper model.
+        config["stt"]["backend"] = "faster_whisper_local"
+        service.reload(config)
+        assert service.loaded_model == ("small", "cpu")
+        assert service._model is not faster_whisper_model
+
+
+class TestOpenVINOWhisper:
+    def test_long_take_is_decoded_in_30s_windows(self):
+        window_sizes = []
+
+        def processor(audio, **_kw):
+            window_sizes.append(len(audio))
+            return types.SimpleNamespace(input_features=len(window_sizes))
+
+        processor.batch_decode = lambda seqs, **_kw: [f" part{seqs}"]
+        model = MagicMock()
+        model.generate.side_effect = lambda features, **_kw: types.SimpleNamespace(
+            sequences=features, sequences_scores=[-0.5]
+        )
+        whisper = stt_service.OpenVINOWhisper.__new__(stt_service.OpenVINOWhisper)
+        whisper._processor = processor
+        whisper._model = model
+
+        audio = np.zeros(70 * stt_service.WHISPER_SAMPLE_RATE, dtype=np.float32)
+        segments, _ = whisper.transcribe(audio, language="tr", temperature=(0.0,))
+
+        window = 30 * stt_service.WHISPER_SAMPLE_RATE
+        assert window_sizes == [window, window, 10 * stt_service.WHISPER_SAMPLE_RATE]
+        text, avg_logprob, _ = stt_service._segment_stats(segments)
+        assert text == "part1 part2 part3"
+        assert avg_logprob == -0.5
+
+
+class TestWriteTelemetry:
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_records_written_in_background(self, tmp_path, monkeypatch, use_orjson):
+        if not use_orjson:
+            monkeypatch.setattr(stt_service, "orjson", None)
+        elif stt_service.orjson is None:
+            pytest.skip("orjson not installed")
+        opened = []
+
+        def counting_open(*args, **kwargs):
+            opened.append(args[0])
+            return open(*args, **kwargs)
+
+        monkeypatch.setattr(stt_service, "open", counting_open, raising=False)
+        service = stt_service.STTService.__new__(stt_service.STTService)
+        service._telemetry_path = None
+        service._telemetry_fp = None
+        service._telemetry_queue = stt_service.queue.Queue(maxsize=8)
+        service._telemetry_thread = None
+        log_path = tmp_path / "logs" / "metrics.jsonl"
+        config = {"telemetry": {"enabled": True, "log_path": str(log_path)}}
+        result = stt_service.TranscriptionResult(
+            text="x",
+            accepted=True,
+            confidence=0.9,
+            avg_logprob=-0.1,
+            no_speech_prob=0.0,
+            latency_sec=0.2,
+            duration_audio_sec=1.0,
+            model="küçük",
+            device="cpu",
+        )
+        service._write_telemetry(config, result)
+        service._write_telemetry(config, result)
+        service.close_telemetry()
+
+        assert service._telemetry_fp is None
+        assert len(opened) == 1
+        lines = log_path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[0])["model"] == "küçük"
+
+    def test_disabled_telemetry_starts_no_thread(self):
+        service = stt_service.STTService.__new__(stt_service.STTService)
+        service._telemetry_thread = None
+        result: Any = None
+        service._write_telemetry({"telemetry": {"enabled": False}}, result)
+        assert service._telemetry_thread is None
+
+
+class TestDecodeSettings:
+    def test_turkish_prompt_includes_first_hints(self):
+        stt = {"language_mode": "tr_en_mixed", "primary_language": "tr"}
+        language = stt_service._decode_language(stt)
+        prompt = stt_service._initial_prompt(language, [f"h{i}" for i in range(20)])
+        assert language == "tr"
+        assert prompt is not None
+        assert prompt.endswith(
+            "Terim ipuclari: " + ", ".join(f"h{i}" for i in range(12)) + "."
+        )
+
+    def test_multilingual_has_no_language_or_prompt(self):
+        language = stt_service._decode_language({"language_mode": "multilingual_auto"})
+        assert language is None
+        assert stt_service._initial_prompt(language, ["api"]) is None
@@ -29,13 +29,22 @@ def _make_module(name, **attrs):
 
 
 sys.modules.setdefault("winsound", _make_module("winsound", Beep=MagicMock()))
-sys.modules.setdefault("pyaudio", _make_module("pyaudio", PyAudio=MagicMock, paInt16=8))
+sys.modules.setdefault(
+    "pyaudio", _make_module("pyaudio", PyAudio=MagicMock, paInt16=8, paContinue=0)
+)
 sys.modules.setdefault(
     "pyautogui", _make_module("pyautogui", hotkey=MagicMock(), press=MagicMock())
 )
 sys.modules.setdefault("pyperclip", _make_module("pyperclip", copy=MagicMock()))
 sys.modules.setdefault(
-    "keyboard", _make_module("keyboard", add_hotkey=MagicMock(), wait=MagicMock())
+    "keyboard",
+    _make_module(
+        "keyboard",
+        add_hotkey=MagicMock(),
+        wait=MagicMock(),
+        send=MagicMock(),
+        is_pressed=MagicMock(return_value=False),
+    ),
 )
 sys.modules.setdefault(
     "faster_whisper", _make_module("faster_whisper", WhisperModel=MagicMock())
@@ -161,6 +170,21 @@ class TestSaveAudioTemp:
         finally:
             os.unlink(path)
 
+    def test_header_matches_wave_module(self):
+        raw = np.arange(-50, 50, dtype=np.int16).tobytes()
+        expected = io.BytesIO()
+        with wave.open(expected, "wb") as wf:
+            wf.setnchannels(voice_paste.CHANNELS)
+            wf.setsampwidth(2)
+            wf.setframerate(voice_paste.SAMPLE_RATE)
+            wf.writeframes(raw)
+        path = voice_paste.save_audio_temp(raw)
+        try:
+            with open(path, "rb") as f:
+                assert f.read() == expected.getvalue()
+        finally:
+            os.remove(path)
+
     def test_empty_audio(self):
         """save_audio_temp() must handle empty bytes without crashing."""
         path = voice_paste.save_audio_temp(b"")
@@ -170,6 +194,183 @@ class TestSaveAudioTemp:
             os.unlink(path)
 
 
+class TestRecordAudioWithSilenceDetection:
+    @staticmethod
+    def _record(monkeypatch, chunks, preprocessor=None, **overrides):
+        stream = MagicMock()
+        stream.read.side_effect = chunks
+        pa = MagicMock()
+        pa.open.return_value = stream
+        monkeypatch.setattr(voice_paste.pyaudio, "PyAudio", lambda: pa)
+        monkeypatch.setattr(voice_paste, "_pa", None)
+        monkeypatch.setattr(voice_paste, "_stream", None)
+        monkeypatch.setattr(voice_paste.atexit, "register", lambda fn: fn)
+        config = {
+            "silence_duration": 0.2,
+            "silence_threshold": 500,
+            "beep_on_ready": False,
+            "max_record_seconds": 60,
+            "audio": {},
+            **overrides,
+        }
+        return voice_paste.record_audio_with_silence_detection(config, preprocessor)
+
+    def test_returns_recorded_samples_in_order(self, monkeypatch):
+        loud = [
+            np.full(voice_paste.CHUNK, 3000 + i, dtype=np.int16).tobytes()
+            for i in range(12)
+        ]
+        quiet = [np.zeros(voice_paste.CHUNK, dtype=np.int16).tobytes()] * 10
+        audio, _ = self._record(monkeypatch, loud + quiet)
+
+        recorded = np.frombuffer(audio, dtype=np.int16)
+        assert audio[: len(loud) * len(loud[0])] == b"".join(loud)
+        assert recorded.shape[0] % voice_paste.CHUNK == 0
+        assert not recorded[len(loud) * voice_paste.CHUNK :].any()
+
+    def test_streams_chunks_into_preprocessor(self, monkeypatch):
+        from audio_processing import StreamingPreprocessor, preprocess_audio_bytes
+
+        rng = np.random.default_rng(5)
+        chunks = [
+            rng.integers(-6000, 6000, voice_paste.CHUNK, dtype=np.int16).tobytes()
+            for _ in range(14)
+        ]
+        params = dict(
+            sample_rate=voice_paste.SAMPLE_RATE,
+            highpass_hz=80.0,
+            normalize_target_dbfs=-20.0,
+            noise_suppression=True,
+        )
+        preprocessor = StreamingPreprocessor(**params)
+        audio, _ = self._record(monkeypatch, chunks, preprocessor)
+
+        # The raw take is not kept when it is streamed into a preprocessor.
+        assert audio == b""
+        expected = preprocess_audio_bytes(b"".join(chunks), **params)
+        assert preprocessor.finish() == expected
+
+    def test_stream_reused_across_recordings(self, monkeypatch):
+        quiet = np.zeros(voice_paste.CHUNK, dtype=np.int16).tobytes()
+        self._record(monkeypatch, [quiet] * 3)
+        stream = voice_paste._stream
+        stream.read.side_effect = [quiet] * 3
+        voice_paste.record_audio_with_silence_detection(
+            {
+                "silence_duration": 0.2,
+                "silence_threshold": 500,
+                "beep_on_ready": False,
+                "max_record_seconds": 60,
+                "audio": {},
+            }
+        )
+
+        assert voice_paste._stream is stream
+        assert voice_paste._pa.open.call_count == 1
+        assert stream.start_stream.call_count == 2
+        assert stream.stop_stream.call_count == 2
+        stream.close.assert_not_called()
+
+    def test_reopens_stream_that_fails_to_start(self, monkeypatch):
+        quiet = np.zeros(voice_paste.CHUNK, dtype=np.int16).tobytes()
+        self._record(monkeypatch, [quiet])
+        broken = voice_paste._stream
+        broken.start_stream.side_effect = OSError("device unavailable")
+        fresh = MagicMock()
+        voice_paste._pa.open.return_value = fresh
+
+        assert voice_paste._start_input_stream() is fresh
+        broken.close.assert_called_once()
+        fresh.start_stream.assert_called_once()
+
+    def test_stops_at_buffer_capacity(self, monkeypatch):
+        loud = np.full(voice_paste.CHUNK, 3000, dtype=np.int16).tobytes()
+        audio, _ = self._record(monkeypatch, [loud] * 100, max_record_seconds=0.5)
+
+        max_chunks = int(0.5 * voice_paste.SAMPLE_RATE / voice_paste.CHUNK) + 1
+        assert len(audio) == max_chunks * len(loud)
+
+    def test_stops_after_configured_silence(self, monkeypatch):
+        loud = np.full(voice_paste.CHUNK, 3000, dtype=np.int16).tobytes()
+        quiet = np.zeros(voice_paste.CHUNK, dtype=np.int16).tobytes()
+        audio, _ = self._record(monkeypatch, [loud] * 12 + [quiet] * 40)
+
+        # 0.2 s of silence is int(0.2 * 16000 / 1024) = 3 chunks; the take
+        # ends on the quiet chunk that completes that count.
+        assert len(audio) == (12 + 3) * len(loud)
+
+    def test_uses_threshold_calibrated_on_ambient(self, monkeypatch):
+        ambient = np.full(voice_paste.CHUNK, 100, dtype=np.int16).tobytes()
+        speech = np.full(voice_paste.CHUNK, 300, dtype=np.int16).tobytes()
+        quiet = np.zeros(voice_paste.CHUNK, dtype=np.int16).tobytes()
+        chunks = [ambient] * 3 + [speech] * 10 + [quiet] * 40
+        audio, _ = self._record(monkeypatch, chunks)
+
+        # Ambient 100 * 2.5 -> threshold 250 once the 0.25 s window closes, so
+        # the 300-level chunks count as speech despite the 500 fallback.
+        assert len(audio) == (3 + 10 + 3) * len(quiet)
+
+    def test_speech_inside_calibration_window_settles_threshold(self, monkeypatch):
+        ambient = np.full(voice_paste.CHUNK, 40, dtype=np.int16).tobytes()
+        loud = np.full(voice_paste.CHUNK, 3000, dtype=np.int16).tobytes()
+        words = np.full(voice_paste.CHUNK, 350, dtype=np.int16).tobytes()
+        quiet = np.zeros(voice_paste.CHUNK, dtype=np.int16).tobytes()
+        chunks = [ambient] + [loud] * 2 + [words] * 10 + [quiet] * 40
+        audio, _ = self._record(monkeypatch, chunks)
+
+        # Speech on chunk 1 ends calibration early: the threshold still
+        # settles at max(200, 40 * 2.5) = 200, so the 350-level words are
+        # kept instead of counting as silence against the 500 fallback.
+        assert len(audio) == (1 + 2 + 10 + 3) * len(quiet)
+
+    def test_listen_and_paste_decodes_in_memory(self, monkeypatch):
+        from audio_processing import preprocess_audio_bytes
+        from config_manager import clone_default
+
+        rng = np.random.default_rng(2)
+        chunks = [
+            rng.integers(-6000, 6000, voice_paste.CHUNK, dtype=np.int16).tobytes()
+            for _ in range(14)
+        ]
+        config = clone_default()
+        config["beep_on_ready"] = False
+        config["post_recording_delay"] = 0
+        config["paste_delay"] = 0
+        received = []
+        stt = MagicMock()
+        stt.transcribe_audio_bytes.side_effect = lambda audio, cfg: (
+            received.append(audio) or types.SimpleNamespace(text="")
+        )
+
+        def no_temp_files(*args, **kwargs):
+            raise AssertionError("the recording must not touch a temp file")
+
+        monkeypatch.setattr(voice_paste.tempfile, "NamedTemporaryFile", no_temp_files)
+        monkeypatch.setattr(voice_paste, "beep_error", lambda: None)
+        monkeypatch.setattr(
+            voice_paste.time, "time", iter(np.arange(0.0, 100.0, 0.01)).__next__
+        )
+        self._record(monkeypatch, [])
+        voice_paste._stream.read.side_effect = chunks
+        voice_paste.listen_and_paste(config, stt)
+
+        audio_cfg = config["audio"]
+        expected = preprocess_audio_bytes(
+            b"".join(chunks),
+            sample_rate=voice_paste.SAMPLE_RATE,
+            highpass_hz=float(audio_cfg["highpass_hz"]),
+            normalize_target_dbfs=float(audio_cfg["normalize_target_dbfs"]),
+            noise_suppression=bool(audio_cfg["noise_suppression"]),
+            highpass_order=int(audio_cfg.get("highpass_order", 1)),
+        )
+        assert len(received) == 1
+        # The streamed gain is summed per chunk, so samples may round 1 LSB apart.
+        got = np.frombuffer(received[0], dtype=np.int16).astype(np.int32)
+        want = np.frombuffer(expected, dtype=np.int16).astype(np.int32)
+        assert got.shape == want.shape
+        assert np.abs(got - want).max() <= 1
+
+
 # ── paste_to_active_window tests ──────────────────────────────────────────────
 
 
@@ -183,25 +384,25 @@ class TestPasteToActiveWindow:
 
     def test_copies_text_to_clipboard(self):
         mock_copy = MagicMock()
-        mock_hotkey = MagicMock()
+        mock_send = MagicMock()
         with (
             patch.object(sys.modules["pyperclip"], "copy", mock_copy),
-            patch.object(sys.modules["pyautogui"], "hotkey", mock_hotkey),
+            patch.object(voice_paste.keyboard, "send", mock_send),
         ):
             voice_paste.paste_to_active_window("hello world", self.config)
         mock_copy.assert_called_once_with("hello world")
-        mock_hotkey.assert_called_once_with("ctrl", "v")
+        mock_send.assert_called_once_with("ctrl+v")
 
     def test_no_paste_for_empty_string(self):
         mock_copy = MagicMock()
-        mock_hotkey = MagicMock()
+        mock_send = MagicMock()
         with (
             patch.object(sys.modules["pyperclip"], "copy", mock_copy),
-            patch.object(sys.modules["pyautogui"], "hotkey", mock_hotkey),
+            patch.object(voice_paste.keyboard, "send", mock_send),
         ):
             voice_paste.paste_to_active_window("", self.config)
         mock_copy.assert_not_called()
-        mock_hotkey.assert_not_called()
+        mock_send.assert_not_called()
 
     def test_no_paste_for_whitespace_only(self):
         mock_copy = MagicMock()
@@ -210,25 +411,95 @@ class TestPasteToActiveWindow:
         mock_copy.assert_not_called()
 
     def test_auto_enter_presses_enter(self):
-        mock_press = MagicMock()
+        mock_send = MagicMock()
         cfg = {**self.config, "auto_enter": True}
         with (
             patch.object(sys.modules["pyperclip"], "copy", MagicMock()),
-            patch.object(sys.modules["pyautogui"], "hotkey", MagicMock()),
-            patch.object(sys.modules["pyautogui"], "press", mock_press),
+            patch.object(voice_paste.keyboard, "send", mock_send),
         ):
             voice_paste.paste_to_active_window("hi", cfg)
-        mock_press.assert_called_once_with("enter")
+        mock_send.assert_called_with("enter")
+        assert mock_send.call_count == 2
 
     def test_no_auto_enter_when_disabled(self):
-        mock_press = MagicMock()
+        mock_send = MagicMock()
         with (
             patch.object(sys.modules["pyperclip"], "copy", MagicMock()),
-            patch.object(sys.modules["pyautogui"], "hotkey", MagicMock()),
-            patch.object(sys.modules["pyautogui"], "press", mock_press),
+            patch.object(voice_paste.keyboard, "send", mock_send),
         ):
             voice_paste.paste_to_active_window("hi", self.config)
-        mock_press.assert_not_called()
+        mock_send.assert_called_once_with("ctrl+v")
+
+    def test_paste_does_not_sleep_when_modifiers_are_released(self):
+        cfg = {**self.config, "paste_delay": 0.5}
+        with (
+            patch.object(sys.modules["pyperclip"], "copy", MagicMock()),
+            patch.object(voice_paste.keyboard, "send", MagicMock()),
+            patch.object(voice_paste.keyboard, "is_pressed", return_value=False),
+            patch.object(voice_paste.time, "sleep") as mock_sleep,
+        ):
+            voice_paste.paste_to_active_window("hi", cfg)
+        mock_sleep.assert_not_called()
+
+    def test_paste_waits_for_held_modifiers_up_to_delay(self):
+        held = iter([True, True, False])
+        mock_send = MagicMock()
+        with (
+            patch.object(sys.modules["pyperclip"], "copy", MagicMock()),
+            patch.object(voice_paste.keyboard, "send", mock_send),
+            patch.object(
+                voice_paste.keyboard,
+                "is_pressed",
+                side_effect=lambda key: next(held, False),
+            ),
+            patch.object(voice_paste.time, "sleep") as mock_sleep,
+        ):
+            voice_paste.paste_to_active_window("hi", {**self.config, "paste_delay": 5})
+        assert mock_sleep.call_count == 2
+        mock_send.assert_called_once_with("ctrl+v")
+
+
+class TestOnHotkey:
+    def test_press_while_busy_is_dropped(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(voice_paste, "_last_hotkey_time", 0.0)
+        monkeypatch.setattr(voice_paste.time, "monotonic", lambda: 100.0)
+
+        def nested_press(config, stt):
+            calls.append(config)
+            voice_paste._on_hotkey({"nested": True}, stt)
+
+        monkeypatch.setattr(voice_paste, "listen_and_paste", nested_press)
+        voice_paste._on_hotkey({}, None)
+
+        assert calls == [{}]
+        assert not voice_paste._hotkey_busy.locked()
+
+    def test_debounces_rapid_presses(self, monkeypatch):
+        calls = []
+        clock = iter([100.0, 100.2, 100.7])
+        monkeypatch.setattr(voice_paste, "_last_hotkey_time", 0.0)
+        monkeypatch.setattr(voice_paste.time, "monotonic", lambda: next(clock))
+        monkeypatch.setattr(
+            voice_paste, "listen_and_paste", lambda config, stt: calls.append(1)
+        )
+        for _ in range(3):
+            voice_paste._on_hotkey({}, None)
+
+        assert len(calls) == 2
+
+    def test_dispatch_hands_presses_to_the_worker_queue(self, monkeypatch):
+        pending = voice_paste.queue.Queue(maxsize=1)
+        monkeypatch.setattr(voice_paste, "_hotkey_queue", pending)
+        with voice_paste._hotkey_busy:
+            voice_paste._dispatch_hotkey({"busy": True}, None)
+        assert pending.empty()
+
+        voice_paste._dispatch_hotkey({}, None)
+        voice_paste._dispatch_hotkey({"repeat": True}, None)
+        # Only one press waits for the worker; the repeat is dropped.
+        assert pending.get_nowait() == ({}, None)
+        assert pending.empty()
 
 
 # ── Constants sanity checks ───────────────────────────────────────────────────
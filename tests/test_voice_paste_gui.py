@@ -6,10 +6,14 @@ Windows-specific modules are mocked before the module is imported.
 """
 
 import json
+import queue
 import sys
+import threading
+import time
 import types
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
 
 
@@ -26,13 +30,22 @@ def _make_module(name, **attrs):
 # Already mocked by test_voice_paste.py if both run in the same process;
 # setdefault keeps the first registration.
 sys.modules.setdefault("winsound", _make_module("winsound", Beep=MagicMock()))
-sys.modules.setdefault("pyaudio", _make_module("pyaudio", PyAudio=MagicMock, paInt16=8))
+sys.modules.setdefault(
+    "pyaudio", _make_module("pyaudio", PyAudio=MagicMock, paInt16=8, paContinue=0)
+)
 sys.modules.setdefault(
     "pyautogui", _make_module("pyautogui", hotkey=MagicMock(), press=MagicMock())
 )
 sys.modules.setdefault("pyperclip", _make_module("pyperclip", copy=MagicMock()))
 sys.modules.setdefault(
-    "keyboard", _make_module("keyboard", add_hotkey=MagicMock(), wait=MagicMock())
+    "keyboard",
+    _make_module(
+        "keyboard",
+        add_hotkey=MagicMock(),
+        wait=MagicMock(),
+        send=MagicMock(),
+        is_pressed=MagicMock(return_value=False),
+    ),
 )
 sys.modules.setdefault(
     "faster_whisper", _make_module("faster_whisper", WhisperModel=MagicMock())
@@ -83,6 +96,11 @@ _pil.ImageDraw = sys.modules["PIL.ImageDraw"]
 
 # Import only the free functions — do NOT instantiate VoicePasteApp (needs display)
 import voice_paste_gui as vpg  # noqa: E402
+from audio_processing import (  # noqa: E402
+    StreamingPreprocessor,
+    preprocess_audio_bytes,
+)
+from config_manager import clone_default  # noqa: E402
 
 
 # ── load_config tests ──────────────────────────────────────────────────────────
@@ -230,6 +248,413 @@ class TestPostProcessText:
         result = post_process("bu dogru degil", "tr")
         assert "doğru" in result
 
+    def test_corrections_case_insensitive_in_one_pass(self, post_process):
+        """Every correction fires regardless of case, including Turkish İ/ı."""
+        result = post_process("BUGUN istanbul ıstanbul Simdi highway high", "tr")
+        assert result == "bugün İstanbul İstanbul şimdi highway hay"
+
+
+# ── _record_audio tests ────────────────────────────────────────────────────────
+
+
+def _gui_recorder(config_updates, chunks):
+    """A VoicePasteApp whose fake callback stream delivers ``chunks``.
+
+    start_stream() pushes every chunk through the stream_callback the
+    recorder registered, as PortAudio's thread would.
+    """
+    instance = object.__new__(vpg.VoicePasteApp)
+    instance.config = clone_default()
+    instance.config.update(config_updates)
+    instance._stream = None
+    instance._stream_lock = threading.Lock()
+    instance._in_q = queue.SimpleQueue()
+    instance.stop_requested = threading.Event()
+
+    def start_stream():
+        callback = instance.pa.open.call_args.kwargs["stream_callback"]
+        for chunk in chunks:
+            assert callback(chunk, len(chunk) // 2, None, 0) == (
+                None,
+                vpg.pyaudio.paContinue,
+            )
+
+    stream = MagicMock()
+    stream.start_stream.side_effect = start_stream
+    instance.pa = MagicMock(open=MagicMock(return_value=stream))
+    return instance, stream
+
+
+class TestGuiRecordAudio:
+    def test_streams_chunks_into_preprocessor(self):
+        loud = np.full(vpg.CHUNK, 3000, dtype=np.int16).tobytes()
+        quiet = np.zeros(vpg.CHUNK, dtype=np.int16).tobytes()
+        instance, _ = _gui_recorder(
+            {
+                "silence_threshold": 500,
+                "silence_duration": 0.2,
+                "max_record_seconds": 5,
+            },
+            [loud] * 6 + [quiet] * 40,
+        )
+
+        preprocessor = MagicMock(spec=StreamingPreprocessor)
+        raw, duration = instance._record_audio(preprocessor)
+
+        # The raw take is not kept; every chunk went to the preprocessor and
+        # the duration still reflects what was captured.
+        assert raw == b""
+        calls = preprocessor.process_chunk.call_count
+        # The take ends on exactly 0.2 s (3 chunks) of silence, although it
+        # began inside a SPEECH_CHUNK block that also held the last speech.
+        assert calls == 6 + 3
+        assert duration == pytest.approx(calls * vpg.CHUNK / vpg.SAMPLE_RATE)
+
+    def test_raw_take_keeps_chunk_order(self):
+        chunks = [
+            np.full(vpg.CHUNK, 3000 + i, dtype=np.int16).tobytes() for i in range(4)
+        ]
+        instance, _ = _gui_recorder(
+            {
+                "silence_threshold": 500,
+                "silence_duration": 0.2,
+                "max_record_seconds": 4 * vpg.CHUNK / vpg.SAMPLE_RATE,
+            },
+            chunks,
+        )
+
+        raw, _ = instance._record_audio()
+        assert raw == b"".join(chunks)
+
+    def test_input_stream_reused_across_takes(self):
+        quiet = np.zeros(vpg.CHUNK, dtype=np.int16).tobytes()
+        instance, stream = _gui_recorder({"max_record_seconds": 0.2}, [quiet] * 8)
+
+        instance._record_audio()
+        instance._record_audio()
+
+        instance.pa.open.assert_called_once()
+        assert instance.pa.open.call_args.kwargs["start"] is False
+        assert stream.start_stream.call_count == 2
+        stream.close.assert_not_called()
+
+    def test_full_scale_speech_is_not_read_as_silence(self):
+        # A clipped take: an int16-squaring RMS would wrap to a tiny level
+        # here and cut the recording off as silence.
+        loud = np.full(vpg.CHUNK, -32768, dtype=np.int16).tobytes()
+        quiet = np.zeros(vpg.CHUNK, dtype=np.int16).tobytes()
+        instance, _ = _gui_recorder(
+            {
+                "silence_threshold": 500,
+                "silence_duration": 0.2,
+                "max_record_seconds": 5,
+            },
+            [quiet] * 4 + [loud] * 10 + [quiet] * 40,
+        )
+
+        raw, _ = instance._record_audio()
+        assert len(raw) == (4 + 10 + 3) * len(quiet)
+
+    def test_block_sizes_follow_speech_activity(self):
+        # TAIL_CHUNK buffers, as the stream is opened with them.
+        piece = vpg.TAIL_CHUNK
+        loud = np.full(piece, 3000, dtype=np.int16).tobytes()
+        quiet = np.zeros(piece, dtype=np.int16).tobytes()
+        instance, _ = _gui_recorder(
+            {
+                "silence_threshold": 500,
+                "silence_duration": 0.2,
+                "max_record_seconds": 5,
+            },
+            [loud] * 36 + [quiet] * 40,
+        )
+        rms_sizes = []
+        real_get_rms = vpg.get_rms
+
+        def spy(samples, scratch=None):
+            rms_sizes.append(len(samples))
+            return real_get_rms(samples, scratch)
+
+        with patch.object(vpg, "get_rms", spy):
+            raw, _ = instance._record_audio()
+
+        # CHUNK blocks until speech has held for three of them, then
+        # SPEECH_CHUNK blocks, each judged as two CHUNK halves. Speech ends
+        # halfway through the eighth, whose quiet half starts the silence
+        # count; TAIL_CHUNK blocks follow until 0.2 s (3 * CHUNK) of it.
+        assert rms_sizes == (
+            [vpg.CHUNK] * 3 + [vpg.CHUNK, vpg.CHUNK] * 8 + [vpg.TAIL_CHUNK] * 4
+        )
+        assert len(raw) == (36 * piece + 3 * vpg.CHUNK) * 2
+
+    def test_speech_inside_calibration_window_settles_threshold(self):
+        ambient = np.full(vpg.CHUNK, 40, dtype=np.int16).tobytes()
+        loud = np.full(vpg.CHUNK, 3000, dtype=np.int16).tobytes()
+        words = np.full(vpg.CHUNK, 350, dtype=np.int16).tobytes()
+        quiet = np.zeros(vpg.CHUNK, dtype=np.int16).tobytes()
+        instance, _ = _gui_recorder(
+            {"silence_threshold": 500, "silence_duration": 0.2},
+            [ambient] + [loud] * 2 + [words] * 8 + [quiet] * 40,
+        )
+
+        raw, _ = instance._record_audio()
+
+        # Speech on chunk 1 ends calibration early: the threshold settles at
+        # max(200, 40 * 2.5) = 200, so the 350-level words are part of the
+        # take rather than 0.2 s of silence against the 500 fallback.
+        samples = np.frombuffer(raw, dtype=np.int16)
+        assert (samples == 350).sum() == 8 * vpg.CHUNK
+        assert len(samples) < (1 + 2 + 8 + 10) * vpg.CHUNK
+
+    def test_stop_sentinel_ends_take_without_waiting(self, monkeypatch):
+        loud = np.full(vpg.CHUNK, 3000, dtype=np.int16).tobytes()
+        instance, _ = _gui_recorder({"max_record_seconds": 5}, [loud] * 2)
+        # A missed sentinel would block here for the full capture timeout.
+        monkeypatch.setattr(vpg, "CAPTURE_TIMEOUT_SEC", 30.0)
+
+        original = instance.pa.open.return_value.start_stream.side_effect
+
+        def start_then_stop():
+            original()
+            instance._in_q.put_nowait(None)
+
+        instance.pa.open.return_value.start_stream.side_effect = start_then_stop
+        raw, _ = instance._record_audio()
+        assert raw == loud * 2
+
+
+@pytest.fixture
+def app():
+    """A VoicePasteApp with default config and a mock Tk root, without __init__."""
+    instance = object.__new__(vpg.VoicePasteApp)
+    instance.config = clone_default()
+    instance.root = MagicMock()
+    instance._pending_state = {}
+    instance._state_lock = threading.Lock()
+    instance._stream = None
+    instance._stream_lock = threading.Lock()
+    instance._in_q = queue.SimpleQueue()
+    instance._beeps = queue.Queue()
+    instance._beep_thread = None
+    return instance
+
+
+class TestGuiListenWorker:
+    def test_transcribes_preprocessed_take_in_memory(self, app):
+        rng = np.random.default_rng(3)
+        chunks = [
+            rng.integers(-4000, 4000, vpg.CHUNK, dtype=np.int16) for _ in range(8)
+        ]
+
+        def fake_record(preprocessor):
+            for chunk in chunks:
+                preprocessor.process_chunk(chunk)
+            return b"", 1.0
+
+        app.config["beep_on_ready"] = False
+        app.stt = MagicMock()
+        app.stt.transcribe_audio_bytes.return_value = MagicMock(text="")
+        app.model_ready = True
+        app._record_audio = fake_record
+        app._log_runtime_error = MagicMock()
+        app._beep = MagicMock()
+
+        app._listen_worker()
+        app._beep.assert_called_once_with(420, 230)
+
+        # No WAV file in between: the STT service gets the PCM bytes the
+        # streaming preprocessor produced, matching the batch pipeline.
+        audio_cfg = app.config["audio"]
+        expected = preprocess_audio_bytes(
+            np.concatenate(chunks).tobytes(),
+            sample_rate=vpg.SAMPLE_RATE,
+            highpass_hz=float(audio_cfg["highpass_hz"]),
+            normalize_target_dbfs=float(audio_cfg["normalize_target_dbfs"]),
+            noise_suppression=bool(audio_cfg["noise_suppression"]),
+            highpass_order=int(audio_cfg.get("highpass_order", 1)),
+        )
+        app._log_runtime_error.assert_not_called()
+        sent = app.stt.transcribe_audio_bytes.call_args[0][0]
+        a = np.frombuffer(sent, dtype=np.int16).astype(np.int32)
+        b = np.frombuffer(expected, dtype=np.int16).astype(np.int32)
+        assert len(a) == len(b)
+        assert np.max(np.abs(a - b)) <= 1
+
+
+class TestGuiInitStt:
+    def test_model_change_reloads_existing_service(self, app):
+        app._stream = MagicMock()
+        stt = MagicMock()
+        stt.loaded_model = ("tiny", "cpu")
+        app.stt = stt
+
+        app._init_stt_worker()
+
+        # Same service, so its pool of loaded models survives the switch.
+        assert app.stt is stt
+        stt.reload.assert_called_once_with(app.config)
+        stt.warm_up.assert_called_once_with()
+        assert app.model_ready is True
+
+    def test_ready_transition_is_one_tk_event(self, app):
+        app._stream = MagicMock()
+        app.stt = MagicMock(loaded_model=("tiny", "cpu"))
+
+        app._init_stt_worker()
+
+        app.root.after.assert_called_once()
+        with patch.object(vpg.VoicePasteApp, "_apply_state") as apply_state:
+            app.root.after.call_args.args[1]()
+        apply_state.assert_called_once_with(
+            status="Ready",
+            status_color=vpg.THEME["ok"],
+            metrics="cpu/tiny",
+            mic_color=vpg.THEME["accent"],
+            tray="idle",
+        )
+
+    def test_back_to_back_updates_share_one_tk_event(self, app):
+
+        app._post_state(status="Ready", status_color="ok", result="hello")
+        app._post_state(mic_color="accent", mic_text="MIC", tray="idle")
+
+        app.root.after.assert_called_once_with(0, app._flush_state)
+        with patch.object(vpg.VoicePasteApp, "_apply_state") as apply_state:
+            app._flush_state()
+        apply_state.assert_called_once_with(
+            status="Ready",
+            status_color="ok",
+            result="hello",
+            mic_color="accent",
+            mic_text="MIC",
+            tray="idle",
+        )
+
+        app._post_state(status="Listening...")
+        assert app.root.after.call_count == 2
+
+    def test_input_stream_opened_while_model_loads(self, app):
+        app.stt = MagicMock(loaded_model=("tiny", "cpu"))
+        app.pa = MagicMock()
+
+        app._init_stt_worker()
+        app._init_stt_worker()
+
+        # Opened once, stopped, for the first take to start.
+        app.pa.open.assert_called_once()
+        assert app.pa.open.call_args.kwargs["start"] is False
+        assert app._stream is app.pa.open.return_value
+
+    def test_model_change_refused_while_loading(self, app):
+        app.model_loading = True
+        app.model_var = MagicMock()
+        app.model_var.get.return_value = "large-v3"
+        app._set_status = MagicMock()
+
+        with patch.object(vpg.VoicePasteApp, "_init_stt_async") as init_stt:
+            app.on_model_change()
+
+        # The running loader is left alone and the combobox shows its model.
+        init_stt.assert_not_called()
+        default_model = clone_default()["stt"]["model_cpu"]
+        app.model_var.set.assert_called_once_with(default_model)
+        assert app.config["stt"]["model_cpu"] == default_model
+
+
+class TestGuiListenThread:
+    def test_takes_share_one_worker_thread(self):
+        instance = object.__new__(vpg.VoicePasteApp)
+        instance._listen_requests = queue.SimpleQueue()
+        instance._listen_thread = None
+        threads = []
+        done = threading.Semaphore(0)
+
+        def take():
+            threads.append(threading.current_thread())
+            done.release()
+
+        with patch.object(instance, "_listen_worker", side_effect=take):
+            for _ in range(2):
+                instance._start_listen_thread()
+                instance._listen_requests.put(None)
+                assert done.acquire(timeout=5)
+
+        assert threads[0] is threads[1] is instance._listen_thread
+        assert threads[0].daemon
+
+
+class TestGuiTray:
+    def test_tray_modules_not_imported_at_module_level(self):
+        assert not hasattr(vpg, "pystray")
+        assert not hasattr(vpg, "Image")
+
+    def test_state_change_swaps_precomputed_image(self):
+        instance = object.__new__(vpg.VoicePasteApp)
+        instance.tray_icon = None
+        with (
+            patch.object(
+                vpg.VoicePasteApp,
+                "_create_tray_image",
+                side_effect=lambda color: object(),
+            ) as create,
+            patch.dict(sys.modules, {"pystray": MagicMock()}),
+            patch.object(vpg.threading, "Thread", MagicMock()) as thread_cls,
+        ):
+            instance._setup_tray()
+            instance._set_tray("rec")
+            instance._set_tray("err")
+            instance._set_tray("idle")
+            instance._setup_tray()
+
+        assert create.call_count == 3
+        thread_cls.assert_called_once()
+        assert instance.tray_icon.icon is instance._tray_img_idle
+
+
+class TestGuiBeep:
+    def test_beeps_are_queued_for_one_beeper_thread(self, app):
+        with patch.object(vpg.threading, "Thread", MagicMock()) as thread_cls:
+            app._beep(1200, 100)
+            app._beep(420, 260)
+
+        thread_cls.assert_called_once()
+        thread_cls.return_value.start.assert_called_once_with()
+        assert app._beeps.get_nowait() == (1200, 100)
+        assert app._beeps.get_nowait() == (420, 260)
+
+    def test_ready_cue_waits_for_result_beep(self, app):
+        played = []
+
+        def beep(freq, duration_ms):
+            if freq == 420:
+                # Still sounding when the next take starts.
+                time.sleep(0.05)
+            played.append(freq)
+
+        app.config["beep_on_ready"] = True
+        app.model_ready = True
+        app._record_audio = MagicMock(side_effect=RuntimeError("no device"))
+        app._log_runtime_error = MagicMock()
+        with patch.object(vpg.winsound, "Beep", side_effect=beep):
+            app._beep(420, 230)
+            app._listen_worker()
+
+        assert played[:2] == [420, 850]
+
+
+class TestGuiMicButton:
+    def test_redraw_reconfigures_existing_items(self):
+        instance = object.__new__(vpg.VoicePasteApp)
+        instance.mic_btn = MagicMock()
+        instance._mic_oval, instance._mic_label = 1, 2
+
+        instance._draw_mic_button(vpg.THEME["danger"], text="STOP")
+
+        instance.mic_btn.delete.assert_not_called()
+        instance.mic_btn.create_oval.assert_not_called()
+        instance.mic_btn.itemconfig.assert_any_call(1, fill=vpg.THEME["danger"])
+        instance.mic_btn.itemconfig.assert_any_call(2, text="STOP")
+
 
 # ── LANG_MAP / DEFAULT_CONFIG sanity checks ────────────────────────────────────
 
@@ -1,21 +1,23 @@
-import copy
-import json
+import atexit
 import os
+import queue
+import struct
 import sys
 import tempfile
 import threading
 import time
-import wave
 import winsound
 
+# Third-party imports stay at module level: startup is dominated by the
+# Whisper model load in main(), and deferring keyboard, numpy, pyaudio or
+# pyperclip would only move their import cost onto the first hotkey press.
 import config_manager as _config_manager
 import keyboard
 import numpy as np
 import pyaudio
-import pyautogui
 import pyperclip
 
-from audio_processing import get_rms, preprocess_audio_bytes
+from audio_processing import StreamingPreprocessor, fast_percentile, get_rms
 from stt_service import STTService
 
 SAMPLE_RATE = 16000
@@ -42,12 +44,11 @@ DEFAULT_CONFIG = {
 def load_config() -> dict:
     """Return a flat CLI config merged from DEFAULT_CONFIG and CONFIG_PATH file."""
     global CONFIG_PATH
-    config = copy.deepcopy(DEFAULT_CONFIG)
+    # DEFAULT_CONFIG is flat and holds only scalars, so a shallow copy is enough.
+    config = dict(DEFAULT_CONFIG)
     if os.path.exists(CONFIG_PATH):
         try:
-            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-                user_cfg = json.load(f)
-            config.update(user_cfg)
+            config.update(_config_manager.read_json(CONFIG_PATH))
         except Exception:
             pass
     lang = config.get("language", "tr")
@@ -56,16 +57,39 @@ def load_config() -> dict:
     return config
 
 
+def _wav_header(data_len: int) -> bytes:
+    """Return the 44-byte PCM16 RIFF header for data_len bytes of samples."""
+    block_align = CHANNELS * 2
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + data_len,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,
+        CHANNELS,
+        SAMPLE_RATE,
+        SAMPLE_RATE * block_align,
+        block_align,
+        16,
+        b"data",
+        data_len,
+    )
+
+
 def save_audio_temp(audio_bytes: bytes) -> str:
-    """Write audio bytes to a temporary WAV file and return the path."""
+    """Write audio bytes to a temporary WAV file and return the path.
+
+    Only for exporting a take; transcription decodes the PCM bytes in memory.
+    """
+    # Header and samples go out through the temp file handle, instead of
+    # reopening the path with the wave module. They are written separately
+    # so the samples are not copied into a concatenated buffer first.
     with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-        path = tmp.name
-    with wave.open(path, "wb") as wf:
-        wf.setnchannels(CHANNELS)
-        wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
-        wf.writeframes(audio_bytes)
-    return path
+        tmp.write(_wav_header(len(audio_bytes)))
+        tmp.write(audio_bytes)
+        return tmp.name
 
 
 def beep_ready():
@@ -80,34 +104,101 @@ def beep_error():
     winsound.Beep(400, 300)
 
 
+_MODIFIER_KEYS = ("ctrl", "shift", "alt")
+
+
+def _wait_for_modifier_release(timeout: float) -> None:
+    # pyperclip sets the clipboard synchronously; the delay before Ctrl+V is
+    # only needed while the record hotkey's modifiers are still held (ctrl +
+    # shift + v would paste something else). Poll for their release and give
+    # up after paste_delay instead of always sleeping it out.
+    deadline = time.monotonic() + timeout
+    while any(keyboard.is_pressed(key) for key in _MODIFIER_KEYS):
+        if time.monotonic() >= deadline:
+            return
+        time.sleep(0.01)
+
+
 def paste_to_active_window(text: str, config: dict):
     if not text or not text.strip():
         print("[!] No text to paste")
         return
 
     pyperclip.copy(text)
-    time.sleep(config["paste_delay"])
-    pyautogui.hotkey("ctrl", "v")
+    _wait_for_modifier_release(config["paste_delay"])
+    # keyboard.send issues the whole chord through one SendInput call;
+    # pyautogui.hotkey/press slept PAUSE (0.1 s) after each of them.
+    keyboard.send("ctrl+v")
 
     if config["auto_enter"]:
         time.sleep(0.1)
-        pyautogui.press("enter")
+        keyboard.send("enter")
+
+
+_pa = None
+_stream = None
+
+
+def _input_stream():
+    """Return the shared, stopped input stream, opening PortAudio on first use."""
+    global _pa, _stream
+    if _stream is None:
+        if _pa is None:
+            _pa = pyaudio.PyAudio()
+            atexit.register(_close_input_stream)
+        _stream = _pa.open(
+            format=FORMAT,
+            channels=CHANNELS,
+            rate=SAMPLE_RATE,
+            input=True,
+            frames_per_buffer=CHUNK,
+            start=False,
+        )
+    return _stream
 
 
-def record_audio_with_silence_detection(config: dict) -> tuple[bytes, float]:
-    p = pyaudio.PyAudio()
-    stream = p.open(
-        format=FORMAT,
-        channels=CHANNELS,
-        rate=SAMPLE_RATE,
-        input=True,
-        frames_per_buffer=CHUNK,
-    )
+def _close_input_stream() -> None:
+    global _pa, _stream
+    if _stream is not None:
+        _stream.close()
+        _stream = None
+    if _pa is not None:
+        _pa.terminate()
+        _pa = None
+
 
-    frames = []
+def _start_input_stream():
+    # PortAudio init and device enumeration are paid once per process; a
+    # stream that no longer starts (e.g. the device went away) is reopened.
+    global _stream
+    stream = _input_stream()
+    try:
+        stream.start_stream()
+    except Exception:
+        stream.close()
+        _stream = None
+        stream = _input_stream()
+        stream.start_stream()
+    return stream
+
+
+def record_audio_with_silence_detection(
+    config: dict, preprocessor: StreamingPreprocessor | None = None
+) -> tuple[bytes, float]:
+    stream = _start_input_stream()
+
+    # One preallocated int16 buffer for the whole take instead of a list of
+    # per-chunk bytes objects joined at the end; one spare chunk absorbs a
+    # read that lands just past max_record_seconds. With a preprocessor the
+    # chunks are only streamed into it and the raw take is not kept.
+    max_chunks = int(config["max_record_seconds"] * SAMPLE_RATE / CHUNK) + 1
+    capacity = max_chunks * CHUNK
+    samples = np.empty(capacity, dtype=np.int16) if preprocessor is None else None
+    samples_bytes = memoryview(samples).cast("B") if samples is not None else None
+    written = 0
     silence_counter = 0
     recording_start = time.time()
-    max_silence_frames = int((config["silence_duration"] * SAMPLE_RATE) / CHUNK)
+    max_silence_frames = max(1, int((config["silence_duration"] * SAMPLE_RATE) / CHUNK))
 
     fallback_threshold = int(config["silence_threshold"])
     min_threshold = int(config["audio"].get("min_silence_threshold", 200))
@@ -122,7 +213,12 @@ def record_audio_with_silence_detection(config: dict) -> tuple[bytes, float]:
     )
     calibration_values = []
     calibrated_threshold = fallback_threshold
+    # Only chunks near the fallback threshold count as ambient noise.
+    calibration_ceiling = fallback_threshold * 1.2
+    # No threshold lets a chunk below this count as speech; see below.
+    calibration_floor = min(min_threshold, fallback_threshold)
     has_speech = False
+    rms_scratch = np.empty(CHUNK, dtype=np.float32)
 
     try:
         print("Listening... (speak now)")
@@ -131,17 +227,33 @@ def record_audio_with_silence_detection(config: dict) -> tuple[bytes, float]:
 
         chunk_idx = 0
         while True:
+            if written + CHUNK > capacity:
+                break
             try:
                 data = stream.read(CHUNK, exception_on_overflow=False)
-                frames.append(data)
-                audio_data = np.frombuffer(data, dtype=np.int16)
-                rms = get_rms(audio_data)
+                if samples is None:
+                    audio_data = np.frombuffer(data, dtype=np.int16)
+                    preprocessor.process_chunk(audio_data)
+                else:
+                    # Copy the bytes straight into the take and measure the
+                    # row in place, without a frombuffer wrapper per chunk.
+                    end = written + len(data) // 2
+                    samples_bytes[written * 2 : end * 2] = data
+                    audio_data = samples[written:end]
+                written += audio_data.shape[0]
+                rms = get_rms(audio_data, rms_scratch)
 
                 if chunk_idx < calibration_chunks and not has_speech:
-                    if rms < fallback_threshold * 1.2:
+                    if rms < calibration_ceiling:
                         calibration_values.append(rms)
-                    if calibration_values:
-                        ambient = float(np.percentile(calibration_values, 90))
+                    # The percentile is only needed where the threshold decides a
+                    # chunk: one loud enough to be speech, which ends calibration
+                    # early, and the chunk that closes the window. Quieter chunks are
+                    # silence under any threshold, so skipping them changes nothing.
+                    if calibration_values and (
+                        rms >= calibration_floor or chunk_idx == calibration_chunks - 1
+                    ):
+                        ambient = fast_percentile(calibration_values, 90)
                         calibrated_threshold = int(
                             max(min_threshold, ambient * adaptive_multiplier)
                         )
@@ -153,7 +265,9 @@ def record_audio_with_silence_detection(config: dict) -> tuple[bytes, float]:
                     silence_counter = 0
                     has_speech = True
 
-                if silence_counter > max_silence_frames and len(frames) > 10:
+                # Stop on the chunk that completes silence_duration, as the
+                # backend does; ">" used to hold every take one extra chunk.
+                if silence_counter >= max_silence_frames and chunk_idx > 10:
                     break
 
                 elapsed = time.time() - recording_start
@@ -165,20 +279,30 @@ def record_audio_with_silence_detection(config: dict) -> tuple[bytes, float]:
 
     finally:
         stream.stop_stream()
-        stream.close()
-        p.terminate()
 
     duration = time.time() - recording_start
-    return b"".join(frames), duration
+    raw = samples[:written].tobytes() if samples is not None else b""
+    return raw, duration
 
 
-_last_hotkey_time = 0
+_last_hotkey_time = 0.0
 _hotkey_debounce = 0.5
+# Held for the whole take; a press that cannot take it is dropped, which
+# closes the check-then-set race two near-simultaneous presses had with an
+# Event.
+_hotkey_busy = threading.Lock()
 
 
 def listen_and_paste(config: dict, stt: STTService):
     try:
-        audio_bytes, duration = record_audio_with_silence_detection(config)
+        preprocessor = StreamingPreprocessor(
+            sample_rate=SAMPLE_RATE,
+            highpass_hz=float(config["audio"]["highpass_hz"]),
+            normalize_target_dbfs=float(config["audio"]["normalize_target_dbfs"]),
+            noise_suppression=bool(config["audio"]["noise_suppression"]),
+            highpass_order=int(config["audio"].get("highpass_order", 1)),
+        )
+        _, duration = record_audio_with_silence_detection(config, preprocessor)
 
         if duration < config["min_record_seconds"]:
             print(f"Recording too short ({duration:.1f}s), ignoring")
@@ -187,13 +311,9 @@ def listen_and_paste(config: dict, stt: STTService):
 
         print(f"Processing... ({duration:.1f}s recorded)")
 
-        processed_audio = preprocess_audio_bytes(
-            audio_bytes=audio_bytes,
-            sample_rate=SAMPLE_RATE,
-            highpass_hz=float(config["audio"]["highpass_hz"]),
-            normalize_target_dbfs=float(config["audio"]["normalize_target_dbfs"]),
-            noise_suppression=bool(config["audio"]["noise_suppression"]),
-        )
+        # The highpass already ran chunk by chunk while recording, so only
+        # the whole-take gating and normalisation are left before decoding.
+        processed_audio = preprocessor.finish()
 
         result = stt.transcribe_audio_bytes(processed_audio, config)
 
@@ -229,30 +349,56 @@ def listen_and_paste(config: dict, stt: STTService):
         beep_error()
 
 
-def run_continuous(config: dict, stt: STTService):
+def _on_hotkey(config: dict, stt: STTService) -> None:
     global _last_hotkey_time
+    if not _hotkey_busy.acquire(blocking=False):
+        return
+    try:
+        now = time.monotonic()
+        if now - _last_hotkey_time < _hotkey_debounce:
+            return
+        _last_hotkey_time = now
+        listen_and_paste(config, stt)
+    finally:
+        _hotkey_busy.release()
 
-    hotkey = config["hotkey"]
-    exit_hotkey = config["exit_hotkey"]
-    is_listening = threading.Event()
 
-    def on_hotkey():
-        global _last_hotkey_time
-        current_time = time.time()
+# One long-lived worker runs the takes instead of a new thread per press.
+# The queue holds at most one pending press; anything beyond it is dropped.
+_hotkey_queue: queue.Queue[tuple[dict, STTService]] = queue.Queue(maxsize=1)
+_hotkey_thread: threading.Thread | None = None
 
-        if current_time - _last_hotkey_time < _hotkey_debounce:
-            return
 
-        _last_hotkey_time = current_time
+def _start_hotkey_worker() -> None:
+    global _hotkey_thread
+    if _hotkey_thread is not None:
+        return
+    _hotkey_thread = threading.Thread(
+        target=_hotkey_worker, name="voice-paste-hotkey", daemon=True
+    )
+    _hotkey_thread.start()
 
-        if is_listening.is_set():
-            return
 
-        is_listening.set()
-        try:
-            listen_and_paste(config, stt)
-        finally:
-            is_listening.clear()
+def _hotkey_worker() -> None:
+    while True:
+        config, stt = _hotkey_queue.get()
+        _on_hotkey(config, stt)
+
+
+def _dispatch_hotkey(config: dict, stt: STTService) -> None:
+    # Key auto-repeat during a take is dropped here rather than queued behind
+    # it; _on_hotkey's acquire and debounce stay the real guard.
+    if _hotkey_busy.locked():
+        return
+    try:
+        _hotkey_queue.put_nowait((config, stt))
+    except queue.Full:
+        pass
+
+
+def run_continuous(config: dict, stt: STTService):
+    hotkey = config["hotkey"]
+    exit_hotkey = config["exit_hotkey"]
 
     print("=" * 60)
     print("Voice Paste")
@@ -266,9 +412,8 @@ def run_continuous(config: dict, stt: STTService):
     print("=" * 60)
     print("Waiting for hotkey...\n")
 
-    keyboard.add_hotkey(
-        hotkey, lambda: threading.Thread(target=on_hotkey, daemon=True).start()
-    )
+    _start_hotkey_worker()
+    keyboard.add_hotkey(hotkey, lambda: _dispatch_hotkey(config, stt))
     keyboard.wait(exit_hotkey)
     print("Voice Paste closed.")
 
@@ -283,6 +428,9 @@ def run_once(config: dict, stt: STTService):
 def main():
     config = _config_manager.load_config()
     stt = STTService(config=config, sample_rate=SAMPLE_RATE, channels=CHANNELS)
+    # Warm the model in the background so the first take does not pay the
+    # decoder's first-call cost; the banner and hotkey wait are not delayed.
+    threading.Thread(target=stt.warm_up, daemon=True).start()
 
     if "--once" in sys.argv:
         run_once(config, stt)
@@ -1,6 +1,8 @@
-import copy
 import json
+import math
 import os
+import queue
+import re
 import sys
 import threading
 import time
@@ -11,20 +13,27 @@ import config_manager as _cm
 import keyboard
 import numpy as np
 import pyaudio
-import pyautogui
 import pyperclip
 import tkinter as tk
 from tkinter import ttk
 
-from audio_processing import get_rms, preprocess_audio_bytes
+from audio_processing import StreamingPreprocessor, fast_percentile, get_rms
 from stt_service import STTService
 
-import pystray
-from PIL import Image, ImageDraw
+# pystray and PIL are imported in _setup_tray / _create_tray_image, after the
+# window is up; faster-whisper is already deferred to the model load thread
+# by stt_service.
 
 SAMPLE_RATE = 16000
 CHANNELS = 1
 CHUNK = 1024
+# Read sizes once speech is under way: larger reads while the speaker keeps
+# going, smaller ones through trailing silence so the take ends promptly.
+SPEECH_CHUNK = 2048
+TAIL_CHUNK = 512
+# A device that delivers nothing for this long ends the take instead of
+# blocking the worker forever.
+CAPTURE_TIMEOUT_SEC = 1.0
 FORMAT = pyaudio.paInt16
 
 THEME = {
@@ -72,28 +81,37 @@ DEFAULT_CONFIG = {
 # Turkish phonetic corrections: Whisper may mishear these words
 _TR_CORRECTIONS = {
     # Whisper English-phonetic substitutions for Turkish sounds
-    r"\bhigh\b": "hay",
-    r"\bbey\b": "bey",
-    r"\btamam\b": "tamam",
+    "high": "hay",
+    "bey": "bey",
+    "tamam": "tamam",
     # Whisper often omits Turkish-specific characters; common fixes:
-    r"\bgunun\b": "günün",
-    r"\bbugun\b": "bugün",
-    r"\byarin\b": "yarın",
-    r"\bsimdi\b": "şimdi",
-    r"\bdogru\b": "doğru",
-    r"\bIstanbul\b": "İstanbul",
+    "gunun": "günün",
+    "bugun": "bugün",
+    "yarin": "yarın",
+    "simdi": "şimdi",
+    "dogru": "doğru",
+    "Istanbul": "İstanbul",
 }
 
+# All corrections as one alternation, scanned in a single pass. Every entry
+# is a whole word, so the \b anchors are shared instead of being tried once
+# per alternative; each word is its own group, so the match's group index
+# picks the replacement.
+_TR_CORRECTIONS_RE = re.compile(
+    r"\b(?:" + "|".join(f"({re.escape(word)})" for word in _TR_CORRECTIONS) + r")\b",
+    re.IGNORECASE,
+)
+_TR_REPLACEMENTS = (None, *_TR_CORRECTIONS.values())
+
 
 def load_config() -> dict:
     """Return a flat GUI config merged from DEFAULT_CONFIG and CONFIG_PATH file."""
     global CONFIG_PATH
-    config = copy.deepcopy(DEFAULT_CONFIG)
+    # DEFAULT_CONFIG is flat and holds only scalars, so a shallow copy is enough.
+    config = dict(DEFAULT_CONFIG)
     if os.path.exists(CONFIG_PATH):
         try:
-            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-                user_cfg = json.load(f)
-            config.update(user_cfg)
+            config.update(_cm.read_json(CONFIG_PATH))
         except Exception:
             pass
     lang = config.get("language", "tr")
@@ -111,6 +129,19 @@ def save_config(config: dict) -> None:
         json.dump(config, f, indent=4, ensure_ascii=False)
 
 
+_MODIFIER_KEYS = ("ctrl", "shift", "alt")
+
+
+def _wait_for_modifier_release(timeout: float) -> None:
+    # Same as voice_paste: only wait while the hotkey's modifiers are held,
+    # giving up after paste_delay, instead of always sleeping it out.
+    deadline = time.monotonic() + timeout
+    while any(keyboard.is_pressed(key) for key in _MODIFIER_KEYS):
+        if time.monotonic() >= deadline:
+            return
+        time.sleep(0.01)
+
+
 class VoicePasteApp:
     def __init__(self):
         self.config = _cm.load_config()
@@ -121,7 +152,28 @@ class VoicePasteApp:
         self.last_toggle_time = 0.0
         self.toggle_debounce_sec = 0.35
         self.stt = None
-        self.pa = pyaudio.PyAudio()
+        # PortAudio is initialised with the first stream open, on the model
+        # loader thread, instead of before the window is shown.
+        self.pa = None
+        self._stream = None
+        # The loader and the listen worker can both reach for the stream;
+        # only one of them may create PortAudio and open the device.
+        self._stream_lock = threading.Lock()
+        # Filled by the PortAudio callback thread, drained by _record_audio;
+        # None is the stop sentinel.
+        self._in_q = queue.SimpleQueue()
+        # One long-lived worker serves every take, as the CLI's hotkey worker
+        # does, instead of a new thread per take; each item is one take.
+        self._listen_requests = queue.SimpleQueue()
+        self._listen_thread = None
+        # Result beeps are played from their own thread; see _beep. Joinable,
+        # so the next take can wait for the last tone to finish.
+        self._beeps = queue.Queue()
+        self._beep_thread = None
+        # UI updates posted from worker threads and not yet applied by Tk;
+        # see _post_state.
+        self._pending_state = {}
+        self._state_lock = threading.Lock()
 
         self.root = tk.Tk()
         self.root.title("Voice Paste Studio")
@@ -136,9 +188,12 @@ class VoicePasteApp:
         self._setup_styles()
         self._build_ui()
         self._setup_hotkey()
-        self._setup_tray()
         self._position_bottom_right()
-        self._init_stt_async()
+        # Tk's own redraws are idle callbacks queued while the widgets were
+        # built, so the window paints before the model loader's imports and
+        # the tray's imports and draws compete with it for the GIL.
+        self.root.after_idle(self._init_stt_async)
+        self.root.after_idle(self._setup_tray)
 
     def _setup_styles(self):
         style = ttk.Style(self.root)
@@ -209,7 +264,9 @@ class VoicePasteApp:
             status_box, width=10, height=10, bg=THEME["panel"], highlightthickness=0
         )
         self.status_dot.pack(side="left", padx=(14, 6), pady=12)
-        self.status_dot.create_oval(1, 1, 9, 9, fill=THEME["warn"], outline="")
+        self._status_dot_item = self.status_dot.create_oval(
+            1, 1, 9, 9, fill=THEME["warn"], outline=""
+        )
 
         self.status_label = tk.Label(
             status_box,
@@ -232,7 +289,14 @@ class VoicePasteApp:
             cursor="hand2",
         )
         self.mic_btn.pack()
-        self._draw_mic_button(THEME["accent"], text="WAIT")
+        # The oval and label are created once; state changes recolour and
+        # relabel them in place instead of deleting and redrawing the canvas.
+        self._mic_oval = self.mic_btn.create_oval(
+            4, 4, 104, 104, fill=THEME["accent"], outline=""
+        )
+        self._mic_label = self.mic_btn.create_text(
+            54, 54, text="WAIT", fill="#ffffff", font=("Segoe UI", 11, "bold")
+        )
         self.mic_btn.bind("<Button-1>", lambda e: self.toggle_listening())
 
         hotkey = self.config["hotkey"].replace("+", " + ").upper()
@@ -375,45 +439,76 @@ class VoicePasteApp:
         threading.Thread(target=self._init_stt_worker, daemon=True).start()
 
     def _init_stt_worker(self):
+        with self._stream_lock:
+            if self._stream is None:
+                # Opened here, off the Tk thread and before "Ready", so the
+                # first take does not pay for PortAudio's device negotiation
+                # either. A failure is left to the first take, which retries
+                # and reports it.
+                try:
+                    self._stream = self._open_input_stream()
+                except Exception:
+                    pass
         try:
-            self.stt = STTService(
-                self.config, sample_rate=SAMPLE_RATE, channels=CHANNELS
-            )
+            if self.stt is None:
+                self.stt = STTService(
+                    self.config, sample_rate=SAMPLE_RATE, channels=CHANNELS
+                )
+            else:
+                # Model switch: reload in place. The service's lock holds this
+                # back until a take still decoding has finished, and with
+                # stt.model_pool_size > 1 an earlier model is handed back.
+                self.stt.reload(self.config)
+            # Still on the loader thread: "Ready" only shows once the first
+            # decode has been paid for, not on the user's first take.
+            self.stt.warm_up()
             self.model_ready = True
-            self.root.after(0, lambda: self._set_status("Ready", THEME["ok"]))
-            self.root.after(
-                0, lambda: self._draw_mic_button(THEME["accent"], text="MIC")
+            # Same device/model prefix the per-take metrics line uses, so a
+            # silent fallback from CUDA to CPU is visible before the first take.
+            model_name, device = self.stt.loaded_model
+            self._post_state(
+                status="Ready",
+                status_color=THEME["ok"],
+                metrics=f"{device}/{model_name}",
+                mic_color=THEME["accent"],
+                tray="idle",
             )
         except Exception as exc:
             error_message = str(exc)
             self.model_ready = False
-            self.root.after(0, lambda: self._set_status("Model error", THEME["danger"]))
-            self.root.after(
-                0,
-                lambda: self.result_label.config(
-                    text=f"Model load failed: {error_message}"
-                ),
-            )
-            self.root.after(
-                0, lambda: self._draw_mic_button(THEME["danger"], text="ERR")
+            self._post_state(
+                status="Model error",
+                status_color=THEME["danger"],
+                result=f"Model load failed: {error_message}",
+                mic_color=THEME["danger"],
+                mic_text="ERR",
+                tray="err",
             )
         finally:
             self.model_loading = False
 
-    def _record_audio(self) -> bytes:
+    def _record_audio(
+        self, preprocessor: StreamingPreprocessor | None = None
+    ) -> tuple[bytes, float]:
         cfg = self.config
-        stream = self.pa.open(
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=SAMPLE_RATE,
-            input=True,
-            frames_per_buffer=CHUNK,
-        )
+        stream = self._start_input_stream()
 
-        frames = []
-        silence_counter = 0
-        max_silence_frames = int((cfg["silence_duration"] * SAMPLE_RATE) / CHUNK)
+        # Silence and the take length are counted in samples, not chunks,
+        # because the read size changes with speech activity below.
+        silence_samples = 0
+        max_silence_samples = (
+            int((cfg["silence_duration"] * SAMPLE_RATE) / CHUNK) * CHUNK
+        )
         max_chunks = int((cfg["max_record_seconds"] * SAMPLE_RATE) / CHUNK)
+        max_samples = max_chunks * CHUNK
+        # With a preprocessor the chunks are only streamed into it and the
+        # raw take is not kept, as in the backend recorder. Otherwise they go
+        # into one preallocated int16 buffer, as in the CLI recorder.
+        take = take_bytes = None
+        if preprocessor is None:
+            take = np.empty(max_samples, dtype=np.int16)
+            take_bytes = memoryview(take).cast("B")
+        captured = 0
         fallback_threshold = int(cfg["silence_threshold"])
         min_threshold = int(cfg["audio"].get("min_silence_threshold", 200))
         adaptive_multiplier = float(
@@ -429,39 +524,158 @@ class VoicePasteApp:
         )
         calibration_values = []
         calibrated_threshold = fallback_threshold
+        # Only chunks near the fallback threshold count as ambient noise.
+        calibration_ceiling = fallback_threshold * 1.2
+        # No threshold lets a chunk below this count as speech; see below.
+        calibration_floor = min(min_threshold, fallback_threshold)
+        rms_scratch = np.empty(SPEECH_CHUNK, dtype=np.float32)
 
         has_speech = False
+        speech_run = 0
+        read_size = CHUNK
+        idx = 0
+        # Bound once: the loop runs every few dozen ms for the whole take.
+        get = self._in_q.get
+        is_set = self.stop_requested.is_set
+        frombuffer = np.frombuffer
+        stopped = False
         try:
-            for idx in range(max_chunks):
-                if self.stop_requested.is_set():
+            while captured < max_samples and not stopped:
+                if is_set():
                     break
-                data = stream.read(CHUNK, exception_on_overflow=False)
-                frames.append(data)
-                rms = get_rms(np.frombuffer(data, dtype=np.int16))
+                # PortAudio's thread queues TAIL_CHUNK buffers as they arrive;
+                # a block of read_size samples is gathered from them, so only
+                # the RMS and silence bookkeeping below run per block.
+                block_start = captured
+                block_end = min(captured + read_size, max_samples)
+                # A SPEECH_CHUNK block is judged as two CHUNK halves below.
+                block_split = block_start + CHUNK
+                sum_squares = tail_squares = 0.0
+                tail_n = 0
+                while captured < block_end:
+                    try:
+                        data = get(timeout=CAPTURE_TIMEOUT_SEC)
+                    except queue.Empty:
+                        data = None
+                    if data is None:
+                        stopped = True
+                        break
+                    n = min(len(data) // 2, max_samples - captured)
+                    if take is None:
+                        samples = frombuffer(data, dtype=np.int16, count=n)
+                        preprocessor.process_chunk(samples)
+                        squares = get_rms(samples, rms_scratch) ** 2 * n
+                        if captured < block_split:
+                            sum_squares += squares
+                        else:
+                            tail_squares += squares
+                            tail_n += n
+                    else:
+                        take_bytes[captured * 2 : (captured + n) * 2] = (
+                            data if n * 2 == len(data) else data[: n * 2]
+                        )
+                    captured += n
+                if captured == block_start:
+                    break
+                head_n = captured - block_start - tail_n
+                if take is None:
+                    rms = math.sqrt(sum_squares / head_n)
+                    if tail_n:
+                        tail_rms = math.sqrt(tail_squares / tail_n)
+                else:
+                    if captured > block_split:
+                        tail_n = captured - block_split
+                        head_n = CHUNK
+                        tail_rms = get_rms(take[block_split:captured], rms_scratch)
+                    rms = get_rms(take[block_start : block_start + head_n], rms_scratch)
 
                 # Calibrate threshold from low-energy ambient chunks only.
                 if idx < calibration_chunks and not has_speech:
-                    if rms < fallback_threshold * 1.2:
+                    if rms < calibration_ceiling:
                         calibration_values.append(rms)
-                    if calibration_values:
-                        ambient = float(np.percentile(calibration_values, 90))
+                    # The percentile is only needed where the threshold decides a
+                    # chunk: one loud enough to be speech, which ends calibration
+                    # early, and the chunk that closes the window. Quieter chunks are
+                    # silence under any threshold, so skipping them changes nothing.
+                    if calibration_values and (
+                        rms >= calibration_floor or idx == calibration_chunks - 1
+                    ):
+                        ambient = fast_percentile(calibration_values, 90)
                         calibrated_threshold = int(
                             max(min_threshold, ambient * adaptive_multiplier)
                         )
-
-                if rms > calibrated_threshold:
-                    silence_counter = 0
-                    has_speech = True
-                else:
-                    silence_counter += 1
-
-                if has_speech and silence_counter >= max_silence_frames:
+                idx += 1
+
+                # Calibration runs before any speech, so it always sees CHUNK
+                # sized reads; only the read size after speech starts adapts.
+                # A SPEECH_CHUNK block that straddles the end of speech must
+                # not read as speech as a whole: its quiet second half starts
+                # the silence count and the drop to TAIL_CHUNK, as a CHUNK
+                # read would have.
+                halves = (
+                    ((rms, head_n), (tail_rms, tail_n)) if tail_n else ((rms, head_n),)
+                )
+                for rms, n in halves:
+                    if rms > calibrated_threshold:
+                        silence_samples = 0
+                        has_speech = True
+                        speech_run += 1
+                        if speech_run >= 3:
+                            read_size = SPEECH_CHUNK
+                    else:
+                        silence_samples += n
+                        speech_run = 0
+                        if has_speech:
+                            read_size = TAIL_CHUNK
+
+                if has_speech and silence_samples >= max_silence_samples:
                     break
         finally:
             stream.stop_stream()
-            stream.close()
 
-        return b"".join(frames)
+        raw = take[:captured].tobytes() if take is not None else b""
+        return raw, captured / float(SAMPLE_RATE * CHANNELS)
+
+    def _start_input_stream(self):
+        # The device is opened once and only started/stopped per take, as in
+        # the CLI and backend recorders; a stream that no longer starts (e.g.
+        # the device went away) is reopened once.
+        # Buffers the callback queued after the last take's final read, and
+        # a stop sentinel nobody consumed, belong to no take.
+        while True:
+            try:
+                self._in_q.get_nowait()
+            except queue.Empty:
+                break
+        with self._stream_lock:
+            if self._stream is None:
+                self._stream = self._open_input_stream()
+            try:
+                self._stream.start_stream()
+            except Exception:
+                self._stream.close()
+                self._stream = self._open_input_stream()
+                self._stream.start_stream()
+            return self._stream
+
+    def _open_input_stream(self):
+        if self.pa is None:
+            self.pa = pyaudio.PyAudio()
+        return self.pa.open(
+            format=FORMAT,
+            channels=CHANNELS,
+            rate=SAMPLE_RATE,
+            input=True,
+            frames_per_buffer=TAIL_CHUNK,
+            start=False,
+            stream_callback=self._pa_cb,
+        )
+
+    def _pa_cb(self, in_data, frame_count, time_info, status):
+        # Runs on PortAudio's thread: hand the buffer over and return, so
+        # capture never waits on the worker's RMS or preprocessing.
+        self._in_q.put_nowait(in_data)
+        return None, pyaudio.paContinue
 
     def toggle_listening(self):
         now = time.time()
@@ -475,6 +689,8 @@ class VoicePasteApp:
 
         if self.is_listening:
             self.stop_requested.set()
+            # Wake _record_audio now instead of after the next buffer.
+            self._in_q.put_nowait(None)
             self._set_status("Stopping...", THEME["warn"])
             return
 
@@ -483,44 +699,66 @@ class VoicePasteApp:
         self._set_status("Listening...", THEME["danger"])
         self.result_label.config(text="Speak now...")
         self._draw_mic_button(THEME["danger"], text="STOP")
-        threading.Thread(target=self._listen_worker, daemon=True).start()
+        self._set_tray("rec")
+        self._start_listen_thread()
+        self._listen_requests.put(None)
+
+    def _start_listen_thread(self):
+        if self._listen_thread is not None:
+            return
+        self._listen_thread = threading.Thread(
+            target=self._listen_loop, name="voice-paste-listen", daemon=True
+        )
+        self._listen_thread.start()
+
+    def _listen_loop(self):
+        while True:
+            self._listen_requests.get()
+            self._listen_worker()
 
     def _listen_worker(self):
         cfg = self.config
         try:
+            # The last take's result beep may still be sounding on the beeper
+            # thread: let it finish so it neither overlaps the ready cue nor
+            # is recorded. The ready cue itself stays blocking for the same
+            # reason, as the stream starts right after it.
+            self._beeps.join()
             if cfg["beep_on_ready"]:
                 winsound.Beep(850, 130)
 
-            audio_bytes = self._record_audio()
-            duration = len(audio_bytes) / float(SAMPLE_RATE * CHANNELS * 2)
-            if duration < max(0.12, float(cfg["min_record_seconds"])):
-                self.root.after(0, lambda: self._set_status("Too short", THEME["warn"]))
-                self.root.after(
-                    0, lambda: self.result_label.config(text="Recording too short")
-                )
-                winsound.Beep(420, 180)
-                return
-
-            self.root.after(
-                0, lambda: self._set_status("Transcribing...", THEME["warn"])
-            )
-
-            processed = preprocess_audio_bytes(
-                audio_bytes=audio_bytes,
+            preprocessor = StreamingPreprocessor(
                 sample_rate=SAMPLE_RATE,
                 highpass_hz=float(cfg["audio"]["highpass_hz"]),
                 normalize_target_dbfs=float(cfg["audio"]["normalize_target_dbfs"]),
                 noise_suppression=bool(cfg["audio"]["noise_suppression"]),
+                highpass_order=int(cfg["audio"].get("highpass_order", 1)),
             )
+            _, duration = self._record_audio(preprocessor)
+            if duration < max(0.12, float(cfg["min_record_seconds"])):
+                self._post_state(
+                    status="Too short",
+                    status_color=THEME["warn"],
+                    result="Recording too short",
+                )
+                self._beep(420, 180)
+                return
+
+            self._post_state(status="Transcribing...", status_color=THEME["warn"])
+
+            # The highpass already ran chunk by chunk while recording, so only
+            # the whole-take gating and normalisation are left here.
+            processed = preprocessor.finish()
 
             result = self.stt.transcribe_audio_bytes(processed, cfg)
 
             if not result.text:
-                self.root.after(0, lambda: self._set_status("No speech", THEME["warn"]))
-                self.root.after(
-                    0, lambda: self.result_label.config(text="No speech detected")
+                self._post_state(
+                    status="No speech",
+                    status_color=THEME["warn"],
+                    result="No speech detected",
                 )
-                winsound.Beep(420, 230)
+                self._beep(420, 230)
                 return
 
             low_conf_allowed = bool(cfg["stt"].get("allow_low_confidence_paste", True))
@@ -528,91 +766,107 @@ class VoicePasteApp:
             if not result.accepted and (
                 not low_conf_allowed or result.confidence < low_conf_floor
             ):
-                self.root.after(
-                    0, lambda: self._set_status("Low confidence", THEME["warn"])
-                )
-                self.root.after(
-                    0, lambda: self.result_label.config(text=result.warning)
-                )
-                self.root.after(
-                    0,
-                    lambda: self.metrics_label.config(
-                        text=(
-                            f"conf={result.confidence:.2f}"
-                            f" logprob={result.avg_logprob:.2f}"
-                        )
+                self._post_state(
+                    status="Low confidence",
+                    status_color=THEME["warn"],
+                    result=result.warning,
+                    metrics=(
+                        f"conf={result.confidence:.2f}"
+                        f" logprob={result.avg_logprob:.2f}"
                     ),
                 )
-                winsound.Beep(420, 230)
+                self._beep(420, 230)
                 return
 
             text = self._post_process_text(result.text)
             ok, paste_message = self._paste_text(text, cfg)
             if not ok:
-                self.root.after(
-                    0, lambda: self._set_status("Paste warning", THEME["warn"])
-                )
-                self.root.after(
-                    0, lambda: self.metrics_label.config(text=paste_message)
-                )
-
-            winsound.Beep(1200, 100)
-            display = text if len(text) <= 130 else text[:127] + "..."
-            self.root.after(0, lambda: self.result_label.config(text=display))
-            if ok:
+                status, status_color = "Paste warning", THEME["warn"]
+                metrics = paste_message
+            else:
                 if result.accepted:
-                    self.root.after(0, lambda: self._set_status("Ready", THEME["ok"]))
+                    status, status_color = "Ready", THEME["ok"]
                 else:
-                    self.root.after(
-                        0, lambda: self._set_status("Pasted (low conf)", THEME["warn"])
-                    )
-                self.root.after(
-                    0,
-                    lambda: self.metrics_label.config(
-                        text=(
-                            f"{result.device}/{result.model}"
-                            f"  latency={result.latency_sec:.2f}s"
-                            f"  conf={result.confidence:.2f}"
-                        )
-                    ),
+                    status, status_color = "Pasted (low conf)", THEME["warn"]
+                metrics = (
+                    f"{result.device}/{result.model}"
+                    f"  latency={result.latency_sec:.2f}s"
+                    f"  conf={result.confidence:.2f}"
                 )
 
+            self._beep(1200, 100)
+            display = text if len(text) <= 130 else text[:127] + "..."
+            self._post_state(
+                status=status,
+                status_color=status_color,
+                result=display,
+                metrics=metrics,
+            )
+
         except Exception as exc:
             error_message = str(exc)
             self._log_runtime_error(exc)
-            self.root.after(0, lambda: self._set_status("Error", THEME["danger"]))
-            self.root.after(
-                0, lambda: self.result_label.config(text=f"Error: {error_message}")
+            self._post_state(
+                status="Error",
+                status_color=THEME["danger"],
+                result=f"Error: {error_message}",
             )
-            winsound.Beep(420, 260)
+            self._beep(420, 260)
         finally:
             self.is_listening = False
-            self.root.after(
-                0,
-                lambda: self._draw_mic_button(
-                    THEME["accent"], text="MIC" if self.model_ready else "WAIT"
-                ),
+            self._post_state(
+                mic_color=THEME["accent"],
+                mic_text="MIC" if self.model_ready else "WAIT",
+                tray="idle",
+            )
+
+    def _beep(self, freq, duration_ms):
+        # winsound.Beep blocks for the whole tone, and PlaySound cannot play
+        # from memory asynchronously, so result beeps go to a beeper thread
+        # and the take finishes (is_listening clears) while the tone sounds.
+        if self._beep_thread is None:
+            self._beep_thread = threading.Thread(
+                target=self._beep_loop, name="voice-paste-beep", daemon=True
             )
+            self._beep_thread.start()
+        self._beeps.put((freq, duration_ms))
+
+    def _beep_loop(self):
+        while True:
+            freq, duration_ms = self._beeps.get()
+            try:
+                winsound.Beep(freq, duration_ms)
+            except RuntimeError:
+                pass
+            finally:
+                self._beeps.task_done()
 
     def _paste_text(self, text: str, cfg: dict) -> tuple[bool, str]:
         try:
             pyperclip.copy(text)
-            time.sleep(cfg["paste_delay"])
+            _wait_for_modifier_release(cfg["paste_delay"])
         except Exception as exc:
             return False, f"Clipboard error: {exc}"
 
         try:
-            pyautogui.hotkey("ctrl", "v")
+            keyboard.send("ctrl+v")
             if cfg["auto_enter"]:
                 time.sleep(0.08)
-                pyautogui.press("enter")
+                keyboard.send("enter")
             return True, ""
         except Exception as exc:
             try:
-                keyboard.send("ctrl+v")
+                # Imported only when keyboard.send fails: pyautogui pulls in
+                # pyscreeze and PIL, which startup would otherwise pay for.
+                import pyautogui
+
+                # The paste path times its own gaps; PAUSE would add 0.1 s
+                # after each call.
+                pyautogui.PAUSE = 0
+                pyautogui.hotkey("ctrl", "v")
                 if cfg["auto_enter"]:
-                    keyboard.send("enter")
-                return True, f"PyAutoGUI failed, keyboard fallback used: {exc}"
+                    pyautogui.press("enter")
+                return True, f"keyboard failed, PyAutoGUI fallback used: {exc}"
             except Exception as fallback_exc:
                 return False, f"Paste failed: {exc}; fallback failed: {fallback_exc}"
 
@@ -628,26 +882,68 @@ class VoicePasteApp:
             pass
 
     def _post_process_text(self, text: str, language: str = "tr") -> str:
-        import re
-
-        text = " ".join(text.split()).strip()
+        # split()/join() rather than a \s+ substitution: it is 3-6x faster
+        # on dictation-length text (see benchmark_regex.py).
+        text = " ".join(text.split())
         if language == "tr":
-            for pattern, replacement in _TR_CORRECTIONS.items():
-                text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+            text = _TR_CORRECTIONS_RE.sub(lambda m: _TR_REPLACEMENTS[m.lastindex], text)
         return text
 
     def _set_status(self, text, color):
-        self.status_dot.delete("all")
-        self.status_dot.create_oval(1, 1, 9, 9, fill=color, outline="")
+        self.status_dot.itemconfig(self._status_dot_item, fill=color)
         self.status_label.config(text=text, fg=color)
 
+    def _post_state(self, **updates):
+        # Called from worker threads. Updates that arrive before Tk has run
+        # the pending flush are merged into it, later values winning, so
+        # back-to-back transitions (a take's result, then the mic reset in
+        # its finally) cost one scheduler hop and one redraw.
+        with self._state_lock:
+            schedule = not self._pending_state
+            self._pending_state.update(updates)
+        if schedule:
+            self.root.after(0, self._flush_state)
+
+    def _flush_state(self):
+        with self._state_lock:
+            updates, self._pending_state = self._pending_state, {}
+        self._apply_state(**updates)
+
+    def _apply_state(
+        self,
+        *,
+        status=None,
+        status_color=None,
+        result=None,
+        metrics=None,
+        mic_color=None,
+        mic_text="MIC",
+        tray=None,
+    ):
+        # Worker threads post one of these per transition instead of one
+        # root.after per widget, so each transition is a single Tk event.
+        if status is not None:
+            self._set_status(status, status_color)
+        if result is not None:
+            self.result_label.config(text=result)
+        if metrics is not None:
+            self.metrics_label.config(text=metrics)
+        if mic_color is not None:
+            self._draw_mic_button(mic_color, text=mic_text)
+        if tray is not None:
+            self._set_tray(tray)
+
     def _draw_mic_button(self, color, text="MIC"):
-        c = self.mic_btn
-        c.delete("all")
-        c.create_oval(4, 4, 104, 104, fill=color, outline="")
-        c.create_text(54, 54, text=text, fill="#ffffff", font=("Segoe UI", 11, "bold"))
+        self.mic_btn.itemconfig(self._mic_oval, fill=color)
+        self.mic_btn.itemconfig(self._mic_label, text=text)
 
     def on_model_change(self, event=None):
+        if self.model_loading:
+            # One loader at a time: put the old choice back instead of
+            # starting a second one that would race the first.
+            self.model_var.set(self.config["stt"]["model_cpu"])
+            self._set_status("Model still loading", THEME["warn"])
+            return
         self.config["stt"]["model_cpu"] = self.model_var.get()
         _cm.save_config(self.config)
         self.model_ready = False
@@ -681,17 +977,30 @@ class VoicePasteApp:
         h = self.root.winfo_height()
         self.root.geometry(f"+{sw - w - 20}+{sh - h - 60}")
 
-    def _create_tray_image(self):
+    def _create_tray_image(self, color=THEME["accent"]):
+        from PIL import Image, ImageDraw
+
         size = 64
         img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
         draw = ImageDraw.Draw(img)
-        draw.ellipse([2, 2, size - 2, size - 2], fill=THEME["accent"])
+        draw.ellipse([2, 2, size - 2, size - 2], fill=color)
         draw.rectangle([28, 15, 36, 44], fill="white")
         draw.rectangle([24, 44, 40, 50], fill="white")
         return img
 
     def _setup_tray(self):
-        image = self._create_tray_image()
+        # One icon and one pystray loop per session; a second call must not
+        # start another event loop thread.
+        if self.tray_icon is not None:
+            return
+        import pystray
+
+        # Draw every state's icon once up front; state changes then only swap
+        # the Image instead of re-running the Pillow draw calls.
+        self._tray_img_idle = self._create_tray_image(THEME["accent"])
+        self._tray_img_rec = self._create_tray_image(THEME["danger"])
+        self._tray_img_err = self._create_tray_image(THEME["muted"])
+        image = self._tray_img_idle
         menu = pystray.Menu(
             pystray.MenuItem("Show", self._tray_show, default=True),
             pystray.MenuItem("Listen", self._tray_listen),
@@ -701,6 +1010,15 @@ class VoicePasteApp:
         self.tray_icon = pystray.Icon("VoicePaste", image, "Voice Paste Studio", menu)
         threading.Thread(target=self.tray_icon.run, daemon=True).start()
 
+    def _set_tray(self, state):
+        if self.tray_icon is None:
+            return
+        self.tray_icon.icon = {
+            "idle": self._tray_img_idle,
+            "rec": self._tray_img_rec,
+            "err": self._tray_img_err,
+        }[state]
+
     def _setup_hotkey(self):
         keyboard.add_hotkey(
             self.config["hotkey"], lambda: self.root.after(0, self.toggle_listening)
@@ -736,7 +1054,10 @@ class VoicePasteApp:
             except Exception:
                 pass
         try:
-            self.pa.terminate()
+            if self._stream is not None:
+                self._stream.close()
+            if self.pa is not None:
+                self.pa.terminate()
         except Exception:
             pass
         self.root.destroy()